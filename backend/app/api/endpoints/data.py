@@ -10,35 +10,41 @@ from app.services.data_processor import (
     process_historical_data,
     initialize_database
 )
+from app.utils.data_fetcher import get_feed_stats
 
 router = APIRouter()
 
 @router.post("/initialize", status_code=202)
-async def initialize_data(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    """Initialize database with data from APIs"""
-    background_tasks.add_task(initialize_database, db)
+async def initialize_data(background_tasks: BackgroundTasks, force: bool = False, db: Session = Depends(get_db)):
+    """Initialize database with data from APIs, skipping feeds unchanged since they were last processed unless forced"""
+    background_tasks.add_task(initialize_database, db, force=force)
     return {"message": "Data initialization started in background"}
 
 @router.post("/refresh/teams", status_code=202)
-async def refresh_team_data(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def refresh_team_data(background_tasks: BackgroundTasks, force: bool = False, db: Session = Depends(get_db)):
     """Refresh team data from API"""
-    background_tasks.add_task(process_team_data, db)
+    background_tasks.add_task(process_team_data, db, force=force)
     return {"message": "Team data refresh started in background"}
 
 @router.post("/refresh/players", status_code=202)
-async def refresh_player_data(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def refresh_player_data(background_tasks: BackgroundTasks, force: bool = False, db: Session = Depends(get_db)):
     """Refresh player data from API"""
-    background_tasks.add_task(process_player_data, db)
+    background_tasks.add_task(process_player_data, db, force=force)
     return {"message": "Player data refresh started in background"}
 
 @router.post("/refresh/matches", status_code=202)
-async def refresh_match_data(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+async def refresh_match_data(background_tasks: BackgroundTasks, force: bool = False, db: Session = Depends(get_db)):
     """Refresh match data from API"""
-    background_tasks.add_task(process_match_data, db)
+    background_tasks.add_task(process_match_data, db, force=force)
     return {"message": "Match data refresh started in background"}
 
 @router.post("/refresh/historical", status_code=202)
 async def refresh_historical_data(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Refresh historical data from Cricsheet"""
     background_tasks.add_task(process_historical_data, db)
-    return {"message": "Historical data refresh started in background"}
\ No newline at end of file
+    return {"message": "Historical data refresh started in background"}
+
+@router.get("/feeds/stats", response_model=Dict[str, Any])
+async def get_feed_cache_stats():
+    """Get changed and skipped feed counts and bytes saved by conditional requests in this worker"""
+    return get_feed_stats()
\ No newline at end of file
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 
 from app.db.database import get_db
 from app.db import models
-from app.services import match_service
+from app.services import match_service, win_probability_timeline
 
 router = APIRouter()
 
@@ -124,4 +124,18 @@ async def get_win_probability(match_id: int, db: Session = Depends(get_db)):
     if match.match_status != "Live":
         raise HTTPException(status_code=400, detail="Win probability only available for live matches")
     
-    return match_service.calculate_win_probability(match, db)
\ No newline at end of file
+    return match_service.calculate_win_probability(match, db)
+
+@router.get("/{match_id}/win-probability/timeline", response_model=Dict[str, Any])
+async def get_win_probability_timeline(match_id: int, db: Session = Depends(get_db)):
+    """Get the win probability after every delivery of a live or completed match"""
+    match = db.query(models.Match).filter(models.Match.id == match_id).first()
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found")
+    
+    if match.match_status not in ("Live", "Completed"):
+        raise HTTPException(status_code=400, detail="Win probability timeline only available for live and completed matches")
+    
+    # Live timelines are extended as match data is processed, so this only reads
+    timeline = db.get(models.WinProbabilityTimeline, match_id)
+    return win_probability_timeline.timeline_to_dict(match, timeline)
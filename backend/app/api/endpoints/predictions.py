@@ -1,13 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
+import json
 
 from app.db.database import get_db
 from app.db import models
-from app.services import prediction_service
+from app.services import prediction_service, result_cache, season_simulator
 
 router = APIRouter()
 
+# Largest simulation count and worker pool a single request may ask for
+MAX_SIMULATIONS = 100000
+MAX_WORKERS = 16
+
+# Scenario base samples are cached per worker, so they are kept well below MAX_SIMULATIONS
+MAX_SCENARIO_SIMULATIONS = 20000
+
+class ForcedOutcome(BaseModel):
+    """A match result fixed for a what-if scenario"""
+    match_id: int
+    winner_id: int
+    run_margin: Optional[int] = Field(None, ge=1)  # Winner batted first and won by this many runs
+    balls_remaining: Optional[int] = Field(None, ge=0, le=season_simulator.BALLS_PER_INNINGS - 1)  # Winner chased with this many balls to spare
+
+class ScenarioRequest(BaseModel):
+    """What-if scenario over the remaining fixtures"""
+    outcomes: List[ForcedOutcome]
+    simulations: int = Field(10000, ge=1, le=MAX_SCENARIO_SIMULATIONS)
+    seed: Optional[int] = Field(None, ge=0)
+
 @router.get("/match/{match_id}", response_model=Dict[str, Any])
 async def predict_match_outcome(match_id: int, db: Session = Depends(get_db)):
     """Predict outcome for an upcoming match"""
@@ -20,29 +43,135 @@ async def predict_match_outcome(match_id: int, db: Session = Depends(get_db)):
     
     return await prediction_service.predict_match_outcome(match, db)
 
+@router.get("/match/{match_id}/squads", response_model=Dict[str, Any])
+async def predict_squads(
+    match_id: int,
+    noise: bool = False,
+    seed: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Predict performance for every player of both teams in a match
+    
+    Args:
+        match_id: Match ID
+        noise: Add seeded random variation to the predictions
+        seed: Seed of the variation, random if not given
+    """
+    match = db.query(models.Match).filter(models.Match.id == match_id).first()
+    if not match:
+        raise HTTPException(status_code=404, detail="Match not found")
+    
+    return await prediction_service.predict_squads(db, match, noise=noise, seed=seed)
+
+@router.get("/matches", response_model=Dict[str, Any])
+async def predict_matches(match_ids: Optional[List[int]] = Query(None), db: Session = Depends(get_db)):
+    """
+    Predict outcomes for several upcoming matches in one request
+    
+    Args:
+        match_ids: Matches to predict, every scheduled match if not given
+    """
+    try:
+        return await prediction_service.predict_matches(db, match_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/playoffs", response_model=Dict[str, Any])
 async def predict_playoff_chances(db: Session = Depends(get_db)):
     """Predict playoff chances for all teams"""
     return await prediction_service.predict_playoff_chances(db)
 
 @router.get("/simulate-season", response_model=Dict[str, Any])
-async def simulate_season(simulations: int = 1000, db: Session = Depends(get_db)):
+async def simulate_season(
+    simulations: int = Query(1000, ge=1, le=MAX_SIMULATIONS),
+    workers: int = Query(1, ge=1, le=MAX_WORKERS),
+    seed: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db)
+):
     """
     Simulate the remainder of the season
     
     Args:
         simulations: Number of simulations to run
+        workers: Number of worker processes to spread the simulations over
+        seed: Seed for reproducible results, random if not given
+    """
+    return await prediction_service.simulate_season(simulations, db, workers=workers, seed=seed)
+
+@router.get("/simulate-season/stream")
+async def stream_season_simulation(
+    tolerance: float = 0.02,
+    max_simulations: int = Query(MAX_SIMULATIONS, ge=1, le=MAX_SIMULATIONS),
+    seed: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Simulate the remainder of the season until every probability is precise enough,
+    streaming partial estimates as Server-Sent Events
+    
+    Args:
+        tolerance: Largest acceptable width of any 95% confidence interval, as a probability
+        max_simulations: Upper bound on the number of simulations
+        seed: Seed for reproducible results, random if not given
+    """
+    if not 0 < tolerance < 1:
+        raise HTTPException(status_code=400, detail="Tolerance must be between 0 and 1")
+    
+    # Load the season while the request's session is still open
+    stream = prediction_service.stream_season_simulation(
+        db, tolerance=tolerance, max_simulations=max_simulations, seed=seed
+    )
+    
+    async def events():
+        async for partial_result in stream:
+            yield f"data: {json.dumps(partial_result)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/cache-stats", response_model=Dict[str, Any])
+async def get_cache_stats():
+    """Hit, miss and coalesced request counts of the season prediction result cache"""
+    return result_cache.get_stats()
+
+@router.post("/scenario", response_model=Dict[str, Any])
+async def simulate_scenario(scenario: ScenarioRequest, db: Session = Depends(get_db)):
+    """
+    Simulate the remainder of the season with some match results forced
+    
+    Args:
+        scenario: Forced results plus simulation count and seed of the base simulation
     """
-    return await prediction_service.simulate_season(simulations, db)
+    try:
+        return await prediction_service.simulate_scenario(
+            [outcome.model_dump() for outcome in scenario.outcomes],
+            db,
+            simulations=scenario.simulations,
+            seed=scenario.seed
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/player-performance/{player_id}", response_model=Dict[str, Any])
-async def predict_player_performance(player_id: int, match_id: Optional[int] = None, db: Session = Depends(get_db)):
+async def predict_player_performance(
+    player_id: int,
+    match_id: Optional[int] = None,
+    noise: bool = False,
+    seed: Optional[int] = Query(None, ge=0),
+    db: Session = Depends(get_db)
+):
     """
     Predict performance for a player
     
     Args:
         player_id: Player ID
         match_id: Optional match ID for context-specific prediction
+        noise: Add seeded random variation to the prediction
+        seed: Seed of the variation, random if not given
     """
     player = db.query(models.Player).filter(models.Player.id == player_id).first()
     if not player:
@@ -54,4 +183,4 @@ async def predict_player_performance(player_id: int, match_id: Optional[int] = N
         if not match:
             raise HTTPException(status_code=404, detail="Match not found")
     
-    return await prediction_service.predict_player_performance(player, match, db)
\ No newline at end of file
+    return await prediction_service.predict_player_performance(player, match, db, noise=noise, seed=seed)
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -17,6 +18,24 @@ class Settings(BaseSettings):
     # Cricsheet data URL
     CRICSHEET_IPL_URL: str = "https://cricsheet.org/downloads/ipl.zip"
     
+    # Processes parsing the Cricsheet archive (one per CPU if unset). The JSON archive,
+    # https://cricsheet.org/downloads/ipl_json.zip, parses much faster than the YAML one.
+    CRICSHEET_PARSE_WORKERS: Optional[int] = None
+    
+    # Shared HTTP client: pooled keep-alive connections and timeouts for the data sources
+    HTTP_MAX_CONNECTIONS: int = 32
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 8
+    HTTP_KEEPALIVE_SECONDS: float = 60.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    HTTP_READ_TIMEOUT_SECONDS: float = 60.0
+    
+    # Last processed copy of each data feed, for conditional requests
+    FEED_CACHE_DIR: str = "data/feeds"
+    
+    # Trained model artifacts, and the match-outcome model version to serve (latest if unset)
+    MODEL_REGISTRY_DIR: str = "models"
+    MATCH_MODEL_VERSION: Optional[int] = None
+    
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,97 @@
+from typing import Dict, Any, List, Sequence
+import io
+from sqlalchemy import Table, func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# Dialects with INSERT ... ON CONFLICT, and their insert constructs
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def insert_rows(db: Session, table: Table, rows: List[Dict[str, Any]]) -> None:
+    """
+    Insert many rows in as few statements as the driver allows
+
+    Args:
+        db: Database session
+        table: Table to insert into
+        rows: Column values of each row, all with the same keys
+    """
+    if rows:
+        db.execute(table.insert(), rows)
+
+def _csv_value(value: Any) -> str:
+    """CSV field for COPY: strings quoted, None left empty and unquoted so it reads as NULL"""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+def copy_rows(db: Session, table: Table, rows: List[Dict[str, Any]]) -> None:
+    """
+    Load many rows with PostgreSQL's COPY, or with insert_rows on other databases
+
+    The rows are streamed as CSV through the session's own connection, so they
+    are part of its transaction.
+
+    Args:
+        db: Database session
+        table: Table to load into
+        rows: Column values of each row, all with the same keys
+    """
+    if not rows:
+        return
+    if db.get_bind().dialect.name != "postgresql":
+        insert_rows(db, table, rows)
+        return
+
+    columns = list(rows[0])
+    quote = db.get_bind().dialect.identifier_preparer.quote
+    buffer = io.StringIO("".join(
+        ",".join(_csv_value(row[column]) for column in columns) + "\n" for row in rows
+    ))
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {quote(table.name)} ({', '.join(quote(column) for column in columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+def upsert_rows(
+    db: Session,
+    table: Table,
+    rows: List[Dict[str, Any]],
+    key_columns: Sequence[str],
+    update_columns: Sequence[str]
+) -> None:
+    """
+    Insert many rows, updating the existing row instead wherever a key is already taken
+
+    Issued as batched INSERT ... ON CONFLICT DO UPDATE statements. Column
+    onupdate values such as updated_at are not applied by ON CONFLICT, so an
+    updated_at column is set explicitly.
+
+    Args:
+        db: Database session
+        table: Table to upsert into
+        rows: Column values of each row, all with the same keys and no key twice
+        key_columns: Columns of the unique constraint that identifies a row
+        update_columns: Columns overwritten with the new values on conflict
+
+    Raises:
+        ValueError: If the database does not support ON CONFLICT
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect not in _INSERTS:
+        raise ValueError(f"Upserts are not supported on {dialect}")
+
+    statement = _INSERTS[dialect](table)
+    updates = {column: statement.excluded[column] for column in update_columns}
+    if "updated_at" in table.c and "updated_at" not in updates:
+        updates["updated_at"] = func.now()
+    db.execute(statement.on_conflict_do_update(index_elements=list(key_columns), set_=updates), rows)
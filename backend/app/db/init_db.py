@@ -1,8 +1,8 @@
-import asyncio
 from sqlalchemy.orm import Session
 from app.db.database import SessionLocal, engine
 from app.models import *  # Import all models so Base sees them
 from app.services.data_processor import initialize_database
+from app.utils.data_fetcher import run_with_session
 from app.db.database import Base
 
 async def init() -> None:
@@ -14,13 +14,13 @@ async def init() -> None:
     # 👇 Now proceed with any initial data insertion
     db = SessionLocal()
     try:
-        await initialize_database(db)
+        await initialize_database(db, force=True)
     finally:
         db.close()
 
 def init_db() -> None:
     """Run database initialization"""
-    asyncio.run(init())
+    run_with_session(init())
 
 if __name__ == "__main__":
     init_db()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, LargeBinary, Table
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -242,4 +242,73 @@ class Commentary(Base):
     # Relationships
     match = relationship("Match", back_populates="commentary")
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class CricsheetPerson(Base):
+    __tablename__ = "cricsheet_people"
+
+    identifier = Column(String, primary_key=True)  # Cricsheet registry ID of the person
+    name = Column(String)  # Name as written in the Cricsheet data, e.g. "V Kohli"
+    player_id = Column(Integer, ForeignKey("players.id"), index=True)
+
+    # Relationships
+    player = relationship("Player")
+
+# Feature store, maintained incrementally as matches complete
+
+class TeamFeature(Base):
+    __tablename__ = "team_features"
+
+    team_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    matches_played = Column(Integer, default=0)
+    matches_won = Column(Integer, default=0)
+    recent_results = Column(String, default="")  # Latest results last, e.g. "WLWWT"
+
+    key_batsman_id = Column(Integer, ForeignKey("players.id"), nullable=True)
+    key_bowler_id = Column(Integer, ForeignKey("players.id"), nullable=True)
+
+    # Relationships
+    team = relationship("Team")
+    key_batsman = relationship("Player", foreign_keys=[key_batsman_id])
+    key_bowler = relationship("Player", foreign_keys=[key_bowler_id])
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class HeadToHead(Base):
+    __tablename__ = "head_to_head"
+
+    team_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    opponent_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    matches = Column(Integer, default=0)
+    wins = Column(Integer, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class TeamVenueRecord(Base):
+    __tablename__ = "team_venue_records"
+
+    team_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    venue = Column(String, primary_key=True)
+    matches = Column(Integer, default=0)
+    wins = Column(Integer, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class VenueFeature(Base):
+    __tablename__ = "venue_features"
+
+    venue = Column(String, primary_key=True)
+    matches = Column(Integer, default=0)
+    toss_winner_won = Column(Integer, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class WinProbabilityTimeline(Base):
+    __tablename__ = "win_probability_timelines"
+
+    match_id = Column(Integer, ForeignKey("matches.id"), primary_key=True)
+    points = Column(LargeBinary, default=b"")  # Packed per-delivery records, see win_probability_timeline
+    deliveries = Column(Integer, default=0)
+    last_commentary_id = Column(Integer, default=0)  # Commentary already folded into the timeline
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,13 +1,30 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.endpoints import data, teams, players, matches, predictions
 from app.core.config import settings
+from app.services import match_model, win_probability, innings_simulator, season_simulator
+from app.utils import data_fetcher
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the match-outcome model, win-probability table and innings simulator once per worker
+    match_model.load_active_model()
+    win_probability.load_table()
+    innings_simulator.load_model()
+    # Pooled HTTP session for the data feeds, shared by every refresh in this worker
+    await data_fetcher.open_session()
+    yield
+    await data_fetcher.close_session()
+    # Worker processes of parallel season simulations, if any request started them
+    season_simulator.shutdown_pool()
 
 app = FastAPI(
     title="IPL 2025 Analytics API",
     description="Backend API for IPL 2025 Cricket Analytics Platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
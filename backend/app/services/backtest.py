@@ -0,0 +1,305 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import argparse
+import asyncio
+import json
+import os
+import time
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db import models
+from app.services import feature_store, innings_simulator, match_model, match_service, prediction_service, win_probability
+
+# Predictors that can be backtested:
+#   match_outcome   - predict_match_outcome without a trained model
+#   match_model     - predict_match_outcome with a model trained on the seasons before
+#   win_probability - calculate_win_probability at the innings break
+PREDICTORS = ("match_outcome", "match_model", "win_probability")
+
+# Number of equal-width probability bins in the calibration curves
+CALIBRATION_BINS = 10
+
+# Probabilities are clipped this far from 0 and 1 for log-loss
+PROBABILITY_EPSILON = 1e-6
+
+# Match columns known before the match starts, and those filled in as it is played
+FIXTURE_FIELDS = [
+    "id", "match_code", "season", "date", "venue", "city",
+    "home_team_id", "away_team_id", "toss_winner_id", "toss_decision"
+]
+RESULT_FIELDS = [
+    "winner_id", "win_margin", "win_type",
+    "first_innings_score", "first_innings_wickets", "first_innings_overs",
+    "second_innings_score", "second_innings_wickets", "second_innings_overs"
+]
+TEAM_FIELDS = ["id", "team_code", "name", "short_name"]
+
+# One scored prediction: probability of a home win, whether the home side won, latency in seconds
+Prediction = Tuple[float, int, float]
+
+def load_history(db: Session) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Load teams and completed matches as plain rows that can be sent to worker processes
+
+    Args:
+        db: Database session
+
+    Returns:
+        Tuple of team rows and match rows, matches in schedule order
+    """
+    teams = [{field: getattr(team, field) for field in TEAM_FIELDS} for team in db.query(models.Team).all()]
+    matches = db.query(models.Match).filter(
+        models.Match.match_status == "Completed",
+        models.Match.home_team_id.isnot(None),
+        models.Match.away_team_id.isnot(None)
+    ).order_by(models.Match.date, models.Match.id).all()
+    rows = [{field: getattr(match, field) for field in FIXTURE_FIELDS + RESULT_FIELDS} for match in matches]
+    return teams, rows
+
+def _replay_session(teams: List[Dict[str, Any]]) -> Session:
+    """Session on a fresh in-memory database holding only the teams"""
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    db.add_all(models.Team(**team, points=0) for team in teams)
+    db.commit()
+    return db
+
+def _home_result(row: Dict[str, Any]) -> Optional[int]:
+    """1 if the home side won, 0 if the away side won, None without a winner"""
+    if row["winner_id"] == row["home_team_id"]:
+        return 1
+    if row["winner_id"] == row["away_team_id"]:
+        return 0
+    return None
+
+def _complete_match(db: Session, match: models.Match, row: Dict[str, Any]) -> None:
+    """Apply a match's result and fold it into the feature store and points table"""
+    for field in RESULT_FIELDS:
+        setattr(match, field, row[field])
+    match.match_status = "Completed"
+    db.flush()
+    feature_store.record_completed_match(db, match)
+
+    if match.winner_id in (match.home_team_id, match.away_team_id):
+        db.get(models.Team, match.winner_id).points += 2
+    else:
+        for team_id in (match.home_team_id, match.away_team_id):
+            db.get(models.Team, team_id).points += 1
+    db.commit()
+
+async def _replay_season(
+    season: str,
+    teams: List[Dict[str, Any]],
+    matches: List[Dict[str, Any]],
+    predictors: Sequence[str]
+) -> Dict[str, Any]:
+    """
+    Replay one season in order, predicting each match before its result is known
+
+    The replay database starts with every match played before the season, and
+    each match of the season is added as scheduled, predicted with the service
+    functions, then completed, so no prediction sees its own or a later result.
+    """
+    season_matches = [row for row in matches if row["season"] == season]
+    start = season_matches[0]["date"]
+
+    db = _replay_session(teams)
+    previous_model = match_model.get_active_model()
+    try:
+        db.add_all(
+            models.Match(**row, match_status="Completed")
+            for row in matches if row["date"] < start
+        )
+        db.flush()
+        feature_store.rebuild(db)
+        db.commit()
+
+        trained_model = None
+        if "match_model" in predictors:
+            try:
+                model, metadata = match_model.train_model(db)
+                trained_model = match_model.LoadedModel(0, model, metadata)
+            except ValueError:
+                pass
+
+        predictions: Dict[str, List[Prediction]] = {name: [] for name in predictors}
+        for row in season_matches:
+            match = models.Match(**{field: row[field] for field in FIXTURE_FIELDS}, match_status="Scheduled")
+            db.add(match)
+            db.commit()
+            home_won = _home_result(row)
+
+            for name, active_model in (("match_outcome", None), ("match_model", trained_model)):
+                if name not in predictors or home_won is None or (name == "match_model" and active_model is None):
+                    continue
+                match_model._active_model = active_model
+                started = time.perf_counter()
+                prediction = await prediction_service.predict_match_outcome(match, db)
+                latency = time.perf_counter() - started
+                predictions[name].append((prediction["teams"]["home"]["win_probability"], home_won, latency))
+
+            if "win_probability" in predictors and home_won is not None and \
+                    row["first_innings_score"] is not None and row["second_innings_score"] is not None:
+                # State at the innings break: first innings complete, chase not started
+                match.match_status = "Live"
+                match.first_innings_score = row["first_innings_score"]
+                match.first_innings_wickets = row["first_innings_wickets"]
+                match.first_innings_overs = row["first_innings_overs"]
+                match.second_innings_score, match.second_innings_wickets, match.second_innings_overs = 0, 0, 0.0
+                started = time.perf_counter()
+                probability = match_service.calculate_win_probability(match, db)["home_team_probability"]
+                latency = time.perf_counter() - started
+                predictions["win_probability"].append((probability, home_won, latency))
+
+            _complete_match(db, match, row)
+    finally:
+        match_model._active_model = previous_model
+        db.close()
+
+    return {
+        "season": season,
+        "matches": len(season_matches),
+        "model_trained": trained_model is not None if "match_model" in predictors else None,
+        "predictions": predictions
+    }
+
+def _backtest_season(args: Tuple[str, List[Dict[str, Any]], List[Dict[str, Any]], Sequence[str]]) -> Dict[str, Any]:
+    """Replay one season (process pool entry point)"""
+    # Spawned workers don't inherit the tables and models loaded by the parent
+    if win_probability.get_table() is None:
+        win_probability.load_table()
+    if innings_simulator.get_model() is None:
+        innings_simulator.load_model()
+    return asyncio.run(_replay_season(*args))
+
+def score_predictions(predictions: List[Prediction]) -> Dict[str, Any]:
+    """
+    Accuracy, calibration and latency of a set of predictions
+
+    Args:
+        predictions: (home win probability, home won, latency in seconds) of each prediction
+
+    Returns:
+        Dictionary with Brier score, log-loss, accuracy, the calibration curve and latency percentiles
+    """
+    if not predictions:
+        return {"predictions": 0}
+
+    probabilities = np.clip(np.array([p for p, _, _ in predictions], dtype=float), 0.0, 1.0)
+    outcomes = np.array([outcome for _, outcome, _ in predictions], dtype=float)
+    latencies_ms = np.array([latency for _, _, latency in predictions]) * 1000
+
+    clipped = np.clip(probabilities, PROBABILITY_EPSILON, 1 - PROBABILITY_EPSILON)
+    bins = np.minimum((probabilities * CALIBRATION_BINS).astype(int), CALIBRATION_BINS - 1)
+    calibration = []
+    for b in range(CALIBRATION_BINS):
+        in_bin = bins == b
+        if in_bin.any():
+            calibration.append({
+                "lower": b / CALIBRATION_BINS,
+                "upper": (b + 1) / CALIBRATION_BINS,
+                "predictions": int(in_bin.sum()),
+                "mean_predicted": float(probabilities[in_bin].mean()),
+                "observed_rate": float(outcomes[in_bin].mean())
+            })
+
+    return {
+        "predictions": len(predictions),
+        "brier_score": float(np.mean((probabilities - outcomes) ** 2)),
+        "log_loss": float(-np.mean(outcomes * np.log(clipped) + (1 - outcomes) * np.log(1 - clipped))),
+        "accuracy": float(np.mean((probabilities >= 0.5) == (outcomes == 1))),
+        "calibration": calibration,
+        "latency_ms": {
+            "mean": float(latencies_ms.mean()),
+            "p50": float(np.percentile(latencies_ms, 50)),
+            "p95": float(np.percentile(latencies_ms, 95)),
+            "max": float(latencies_ms.max())
+        }
+    }
+
+def run_backtest(
+    db: Session,
+    seasons: Optional[Sequence[str]] = None,
+    predictors: Sequence[str] = PREDICTORS,
+    workers: int = 1
+) -> Dict[str, Any]:
+    """
+    Backtest predictors by replaying historical seasons, one season per worker process
+
+    Args:
+        db: Database session to read the history from
+        seasons: Seasons to replay, every season with completed matches if not given
+        predictors: Names of the predictors to evaluate, from PREDICTORS
+        workers: Number of worker processes, 1 replays every season in-process
+
+    Returns:
+        Dictionary with overall and per-season scores of each predictor
+
+    Raises:
+        ValueError: If a predictor or season is unknown
+    """
+    unknown = [name for name in predictors if name not in PREDICTORS]
+    if unknown:
+        raise ValueError(f"Unknown predictors: {', '.join(unknown)}")
+
+    teams, matches = load_history(db)
+    available = list(dict.fromkeys(row["season"] for row in matches))
+    seasons = list(seasons) if seasons else available
+    missing = [season for season in seasons if season not in available]
+    if missing:
+        raise ValueError(f"No completed matches in seasons: {', '.join(missing)}")
+
+    tasks = [(season, teams, matches, tuple(predictors)) for season in seasons]
+    workers = max(1, min(workers, len(tasks), os.cpu_count() or 1))
+    started = time.perf_counter()
+    if workers == 1:
+        results = [_backtest_season(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_backtest_season, tasks))
+    elapsed = time.perf_counter() - started
+
+    report: Dict[str, Any] = {
+        "seasons": seasons,
+        "workers": workers,
+        "elapsed_seconds": elapsed,
+        "predictors": {}
+    }
+    for name in predictors:
+        report["predictors"][name] = {
+            "overall": score_predictions([p for result in results for p in result["predictions"][name]]),
+            "seasons": {
+                result["season"]: {
+                    **score_predictions(result["predictions"][name]),
+                    "matches": result["matches"],
+                    **({"model_trained": result["model_trained"]} if name == "match_model" else {})
+                }
+                for result in results
+            }
+        }
+    return report
+
+def main() -> None:
+    """Backtest predictors on the current database and print the report as JSON"""
+    from app.db.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Replay historical seasons to score match predictors")
+    parser.add_argument("--seasons", nargs="*", help="Seasons to replay, all by default")
+    parser.add_argument("--predictors", nargs="*", default=list(PREDICTORS), choices=PREDICTORS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    win_probability.load_table()
+    innings_simulator.load_model()
+    db = SessionLocal()
+    try:
+        report = run_backtest(db, args.seasons, args.predictors, args.workers)
+    finally:
+        db.close()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
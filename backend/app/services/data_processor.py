@@ -1,17 +1,46 @@
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
+from sqlalchemy import update
 from sqlalchemy.orm import Session
+import asyncio
 import pandas as pd
 import numpy as np
-from datetime import datetime, time, date
+from datetime import datetime, time
 
+from app.core.config import settings
 from app.db import models
+from app.db.bulk import insert_rows, upsert_rows
 from app.utils.data_fetcher import (
     fetch_match_schedule,
     fetch_team_standings,
     fetch_top_run_scorers,
     fetch_most_wickets,
-    download_cricsheet_data
+    download_cricsheet_data,
+    save_feeds
 )
+from app.services import result_cache, feature_store, win_probability_timeline
+from app.services.scorecards import (
+    InningsCard,
+    PlayerDirectory,
+    build_scorecard,
+    match_totals,
+    matches_with_deliveries,
+    reconcile_players,
+    remove_cricsheet_memberships,
+    write_scorecards
+)
+from app.services.team_resolver import TeamResolver
+
+# Historical matches written per batch and commit, with their innings, cards and deliveries
+HISTORICAL_BATCH_SIZE = 100
+
+# Columns each feed refreshes on existing rows
+TEAM_STANDING_COLUMNS = ["matches_played", "matches_won", "matches_lost", "matches_tied", "net_run_rate", "points"]
+BATTING_STAT_COLUMNS = [
+    "matches", "runs", "highest_score", "fifties", "hundreds", "fours", "sixes", "batting_average", "strike_rate"
+]
+BOWLING_STAT_COLUMNS = [
+    "matches", "wickets", "best_bowling_figures", "economy_rate", "bowling_average", "bowling_strike_rate"
+]
 
 def safe_float(value: Any, default: float = 0.0) -> float:
     """Safely convert value to float"""
@@ -47,165 +76,165 @@ def clean_match_code(match_id: Any) -> str:
         return ""
     return str(match_id).strip()
 
-async def process_team_data(db: Session) -> List[models.Team]:
+async def process_team_data(
+    db: Session,
+    team_data: Optional[Dict[Any, Any]] = None,
+    force: bool = False
+) -> List[models.Team]:
     """
     Process team data from the API and store in database
     
     Args:
         db: Database session
+        team_data: Team standings feed, fetched if not given
+        force: Process the feed even if it is unchanged since it was last processed
         
     Returns:
-        List of team models
+        List of team models, empty if the feed was unchanged
     """
-    # Fetch team standings data
-    team_data = await fetch_team_standings()
-    teams = []
-    
+    # Fetch team standings data, skipping processing if it is unchanged
+    if team_data is None:
+        team_data = await fetch_team_standings(only_if_changed=not force)
+        if team_data is None:
+            return []
+    # One row per team code, the last entry winning as when rows were applied one by one
+    rows = {}
     for team_info in team_data.get("Teams", []):
-        # Check if team already exists
-        team = db.query(models.Team).filter(models.Team.team_code == team_info["TeamCode"]).first()
-        
-        if not team:
-            # Create new team
-            team = models.Team(
-                team_code=team_info["TeamCode"],
-                name=team_info["TeamName"],
-                short_name=team_info["TeamCode"],
-                logo_url=team_info.get("TeamLogo", ""),
-                matches_played=int(team_info.get("Matches", 0)),
-                matches_won=int(team_info.get("Wins", 0)),
-                matches_lost=int(team_info.get("Loss", 0)),
-                matches_tied=int(team_info.get("Tied", 0)),
-                net_run_rate=float(team_info.get("NetRunRate", 0.0)),
-                points=int(team_info.get("Points", 0))
-            )
-            db.add(team)
-        else:
-            # Update existing team
-            team.matches_played = int(team_info.get("Matches", 0))
-            team.matches_won = int(team_info.get("Wins", 0))
-            team.matches_lost = int(team_info.get("Loss", 0))
-            team.matches_tied = int(team_info.get("Tied", 0))
-            team.net_run_rate = float(team_info.get("NetRunRate", 0.0))
-            team.points = int(team_info.get("Points", 0))
-        
-        teams.append(team)
+        rows[team_info["TeamCode"]] = {
+            "team_code": team_info["TeamCode"],
+            "name": team_info["TeamName"],
+            "short_name": team_info["TeamCode"],
+            "logo_url": team_info.get("TeamLogo", ""),
+            "matches_played": int(team_info.get("Matches", 0)),
+            "matches_won": int(team_info.get("Wins", 0)),
+            "matches_lost": int(team_info.get("Loss", 0)),
+            "matches_tied": int(team_info.get("Tied", 0)),
+            "net_run_rate": float(team_info.get("NetRunRate", 0.0)),
+            "points": int(team_info.get("Points", 0))
+        }
+    
+    # Insert new teams and update the standings of existing ones in one statement
+    upsert_rows(db, models.Team.__table__, list(rows.values()), ["team_code"], TEAM_STANDING_COLUMNS)
+    db.expire_all()
+    teams = db.query(models.Team).filter(models.Team.team_code.in_(list(rows))).all() if rows else []
     
     db.commit()
+    save_feeds(settings.TEAM_STANDINGS_URL)
+    await result_cache.invalidate()
     return teams
 
-async def process_player_data(db: Session) -> List[models.Player]:
-    """Process player data from the API and store in database"""
-    batsmen_data = await fetch_top_run_scorers()
-    bowlers_data = await fetch_most_wickets()
-    players = []
-    processed_codes = set()  # Track processed player codes
-    
-    # Process batsmen
+async def process_player_data(
+    db: Session,
+    batsmen_data: Optional[Dict[Any, Any]] = None,
+    bowlers_data: Optional[Dict[Any, Any]] = None,
+    force: bool = False,
+    resolver: Optional[TeamResolver] = None
+) -> List[models.Player]:
+    """
+    Process player data from the API and store in database, fetching whichever feed is not given
+    
+    Processing is skipped if neither feed changed since it was last processed, unless forced.
+    Players are written with batched upserts, so a refresh takes the same number of
+    statements however many players the feeds list. Teams are resolved through the
+    given resolver, loaded here if not given.
+    """
+    if batsmen_data is None and bowlers_data is None:
+        batsmen_data, bowlers_data = await asyncio.gather(
+            fetch_top_run_scorers(only_if_changed=not force),
+            fetch_most_wickets(only_if_changed=not force)
+        )
+        if batsmen_data is None and bowlers_data is None:
+            return []
+    # Players in both feeds are processed from the batting feed, so both are needed if either changed
+    if batsmen_data is None:
+        batsmen_data = await fetch_top_run_scorers()
+    if bowlers_data is None:
+        bowlers_data = await fetch_most_wickets()
+    
+    # Each player is processed once, from the first feed entry with their code
+    batsmen: Dict[str, Dict[str, Any]] = {}
+    bowlers: Dict[str, Dict[str, Any]] = {}
     for player_info in batsmen_data.get("Batsmen", []):
         player_code = clean_player_code(player_info.get("StrikerID"))
-        if not player_code or player_code in processed_codes:
-            continue
-        
-        processed_codes.add(player_code)
-        player = db.query(models.Player).filter(
-            models.Player.player_code == player_code
-        ).first()
-        
-        if not player:
-            player = models.Player(
-                player_code=player_code,
-                name=player_info["StrikerName"],
-                role="Batsman",
-                matches=safe_int(player_info.get("Matches")),
-                runs=safe_int(player_info.get("TotalRuns")),
-                highest_score=safe_int(player_info.get("HighestScore")),
-                fifties=safe_int(player_info.get("FiftyPlusRuns")),
-                hundreds=safe_int(player_info.get("Centuries")),
-                fours=safe_int(player_info.get("Fours")),
-                sixes=safe_int(player_info.get("Sixes")),
-                batting_average=safe_float(player_info.get("BattingAverage")),
-                strike_rate=safe_float(player_info.get("StrikeRate"))
-            )
-            
-            # Add player to team
-            team_name = player_info.get("TeamName")
-            if team_name:
-                team = db.query(models.Team).filter(models.Team.name == team_name).first()
-                if team:
-                    player.teams.append(team)
-            
-            db.add(player)
-            try:
-                db.flush()  # Try to flush changes without committing
-            except:
-                db.rollback()  # Rollback if there's an error
-                continue
-        else:
-            # Update existing player batting stats
-            player.matches = max(player.matches, safe_int(player_info.get("Matches")))
-            player.runs = safe_int(player_info.get("TotalRuns"))
-            player.highest_score = safe_int(player_info.get("HighestScore"))
-            player.fifties = safe_int(player_info.get("FiftyPlusRuns"))
-            player.hundreds = safe_int(player_info.get("Centuries"))
-            player.fours = safe_int(player_info.get("Fours"))
-            player.sixes = safe_int(player_info.get("Sixes"))
-            player.batting_average = safe_float(player_info.get("BattingAverage"))
-            player.strike_rate = safe_float(player_info.get("StrikeRate"))
-        
-        players.append(player)
-    
-    # Process bowlers
+        if player_code and player_code not in batsmen:
+            batsmen[player_code] = player_info
     for player_info in bowlers_data.get("Bowlers", []):
         player_code = clean_player_code(player_info.get("BowlerID"))
-        if not player_code or player_code in processed_codes:
-            continue
-            
-        processed_codes.add(player_code)
-        player = db.query(models.Player).filter(
-            models.Player.player_code == player_code
-        ).first()
-        
-        if not player:
-            player = models.Player(
-                player_code=player_code,
-                name=player_info["BowlerName"],
-                role="Bowler",
-                matches=safe_int(player_info.get("Matches")),
-                wickets=safe_int(player_info.get("Wickets")),
-                best_bowling_figures=player_info.get("BBIW", ""),
-                economy_rate=safe_float(player_info.get("EconomyRate")),
-                bowling_average=safe_float(player_info.get("BowlingAverage")),
-                bowling_strike_rate=safe_float(player_info.get("BowlingSR"))
-            )
-            
-            # Add player to team
-            team_name = player_info.get("TeamName")
-            if team_name:
-                team = db.query(models.Team).filter(models.Team.name == team_name).first()
-                if team:
-                    player.teams.append(team)
-            
-            db.add(player)
-            try:
-                db.flush()  # Try to flush changes without committing
-            except:
-                db.rollback()  # Rollback if there's an error
-                continue
-        else:
-            # Update existing player bowling stats
-            player.matches = max(player.matches, safe_int(player_info.get("Matches")))
-            player.wickets = safe_int(player_info.get("Wickets"))
-            player.best_bowling_figures = player_info.get("BBIW", "")
-            player.economy_rate = safe_float(player_info.get("EconomyRate"))
-            player.bowling_average = safe_float(player_info.get("BowlingAverage"))
-            player.bowling_strike_rate = safe_float(player_info.get("BowlingSR"))
-            
-            if player.role == "Batsman":
-                player.role = "All-rounder"
-        
-        if player not in players:
-            players.append(player)
+        if player_code and player_code not in batsmen and player_code not in bowlers:
+            bowlers[player_code] = player_info
+    codes = list(batsmen) + list(bowlers)
+    
+    # Existing players and all teams, one query each
+    resolver = resolver or TeamResolver.load(db)
+    existing = {
+        row.player_code: row
+        for row in db.query(models.Player.player_code, models.Player.matches, models.Player.role).filter(
+            models.Player.player_code.in_(codes)
+        )
+    }
+    
+    def matches_played(player_code: str, player_info: Dict[str, Any]) -> int:
+        previous = (existing[player_code].matches or 0) if player_code in existing else 0
+        return max(previous, safe_int(player_info.get("Matches")))
+    
+    batting_rows = [
+        {
+            "player_code": player_code,
+            "name": player_info["StrikerName"],
+            "role": "Batsman",
+            "matches": matches_played(player_code, player_info),
+            "runs": safe_int(player_info.get("TotalRuns")),
+            "highest_score": safe_int(player_info.get("HighestScore")),
+            "fifties": safe_int(player_info.get("FiftyPlusRuns")),
+            "hundreds": safe_int(player_info.get("Centuries")),
+            "fours": safe_int(player_info.get("Fours")),
+            "sixes": safe_int(player_info.get("Sixes")),
+            "batting_average": safe_float(player_info.get("BattingAverage")),
+            "strike_rate": safe_float(player_info.get("StrikeRate"))
+        }
+        for player_code, player_info in batsmen.items()
+    ]
+    bowling_rows = []
+    for player_code, player_info in bowlers.items():
+        # Existing batsmen who also appear among the wicket takers become all-rounders
+        role = existing[player_code].role if player_code in existing else "Bowler"
+        bowling_rows.append({
+            "player_code": player_code,
+            "name": player_info["BowlerName"],
+            "role": "All-rounder" if role == "Batsman" else role,
+            "matches": matches_played(player_code, player_info),
+            "wickets": safe_int(player_info.get("Wickets")),
+            "best_bowling_figures": player_info.get("BBIW", ""),
+            "economy_rate": safe_float(player_info.get("EconomyRate")),
+            "bowling_average": safe_float(player_info.get("BowlingAverage")),
+            "bowling_strike_rate": safe_float(player_info.get("BowlingSR"))
+        })
+    
+    # Upsert batting and bowling stats, one batched statement each
+    upsert_rows(db, models.Player.__table__, batting_rows, ["player_code"], BATTING_STAT_COLUMNS)
+    upsert_rows(db, models.Player.__table__, bowling_rows, ["player_code"], BOWLING_STAT_COLUMNS + ["role"])
+    db.expire_all()
+    
+    # Listed players belong to the team named in their feed entry, replacing any older
+    # membership, so squads only hold the players the feeds currently list for them
+    order = {player_code: index for index, player_code in enumerate(codes)}
+    players = sorted(
+        db.query(models.Player).filter(models.Player.player_code.in_(codes)).all(),
+        key=lambda player: order[player.player_code]
+    )
+    entries = {**bowlers, **batsmen}
+    player_teams = [
+        (player, resolver.resolve(entries[player.player_code].get("TeamName"))) for player in players
+    ]
+    player_teams = [(player, team) for player, team in player_teams if team is not None]
+    association = models.player_team_association
+    if player_teams:
+        db.execute(association.delete().where(
+            association.c.player_id.in_([player.id for player, _ in player_teams])
+        ))
+    insert_rows(db, association, [{"player_id": player.id, "team_id": team.id} for player, team in player_teams])
+    
+    feature_store.refresh_key_players(db)
     
     try:
         db.commit()
@@ -213,20 +242,75 @@ async def process_player_data(db: Session) -> List[models.Player]:
         db.rollback()
         raise
     
+    save_feeds(settings.TOP_SCORERS_URL, settings.MOST_WICKETS_URL)
     return players
 
-async def process_match_data(db: Session) -> List[models.Match]:
+def apply_match_result(db: Session, match: models.Match, match_info: Dict[str, Any], resolver: TeamResolver) -> None:
+    """
+    Copy the result and innings summaries of a schedule feed entry onto a match
+    
+    Args:
+        db: Database session
+        match: Match model
+        match_info: Match entry from the schedule feed
+        resolver: Team resolver of the ingestion run
+    """
+    # Add match result if completed
+    if match_info.get("Comments") and "Won by" in match_info["Comments"]:
+        winner_name = match_info["Comments"].split(" Won by")[0].strip()
+        winner = resolver.resolve(winner_name)
+
+        if winner:
+            match.winner_id = winner.id
+            comment_parts = match_info["Comments"].split(" Won by ")[1].split(" ")
+            match.win_margin = safe_int(comment_parts[0])
+            match.win_type = "Runs" if "Runs" in comment_parts[1] else "Wickets"
+
+    # Add innings info if available
+    if match_info.get("FirstBattingSummary"):
+        first_innings = match_info["FirstBattingSummary"].split(" - ")
+        if len(first_innings) == 2:
+            score, overs = first_innings
+            if "/" in score:
+                runs, wickets = score.split("/")
+                match.first_innings_score = safe_int(runs)
+                match.first_innings_wickets = safe_int(wickets)
+                match.first_innings_overs = safe_float(overs.replace(" Ovs", ""))
+
+    if match_info.get("SecondBattingSummary"):
+        second_innings = match_info["SecondBattingSummary"].split(" - ")
+        if len(second_innings) == 2:
+            score, overs = second_innings
+            if "/" in score:
+                runs, wickets = score.split("/")
+                match.second_innings_score = safe_int(runs)
+                match.second_innings_wickets = safe_int(wickets)
+                match.second_innings_overs = safe_float(overs.replace(" Ovs", ""))
+
+async def process_match_data(
+    db: Session,
+    match_data: Optional[Dict[Any, Any]] = None,
+    force: bool = False,
+    resolver: Optional[TeamResolver] = None
+) -> List[models.Match]:
     """
     Process match data from the API and store in database
     
     Args:
         db: Database session
+        match_data: Match schedule feed, fetched if not given
+        force: Process the feed even if it is unchanged since it was last processed
+        resolver: Team resolver of the ingestion run, loaded here if not given
         
     Returns:
-        List of match models
+        List of match models, empty if the feed was unchanged
     """
-    # Fetch match schedule data
-    match_data = await fetch_match_schedule()
+    # Fetch match schedule data, skipping processing if it is unchanged
+    if match_data is None:
+        match_data = await fetch_match_schedule(only_if_changed=not force)
+        if match_data is None:
+            return []
+    resolver = resolver or TeamResolver.load(db)
     matches = []
     
     for match_info in match_data.get("Matches", []):
@@ -238,8 +322,8 @@ async def process_match_data(db: Session) -> List[models.Match]:
         
         if not match:
             # Get team references by team names
-            home_team = db.query(models.Team).filter(models.Team.name == match_info["HomeTeamName"]).first()
-            away_team = db.query(models.Team).filter(models.Team.name == match_info["AwayTeamName"]).first()
+            home_team = resolver.resolve(match_info["HomeTeamName"])
+            away_team = resolver.resolve(match_info["AwayTeamName"])
             
             if not home_team or not away_team:
                 continue  # Skip if teams not found
@@ -262,37 +346,7 @@ async def process_match_data(db: Session) -> List[models.Match]:
             )
 
             try:
-                # Add match result if completed
-                if match_info.get("Comments") and "Won by" in match_info["Comments"]:
-                    winner_name = match_info["Comments"].split(" Won by")[0].strip()
-                    winner = db.query(models.Team).filter(models.Team.name == winner_name).first()
-                    
-                    if winner:
-                        match.winner_id = winner.id
-                        comment_parts = match_info["Comments"].split(" Won by ")[1].split(" ")
-                        match.win_margin = safe_int(comment_parts[0])
-                        match.win_type = "Runs" if "Runs" in comment_parts[1] else "Wickets"
-                
-                # Add innings info if available
-                if match_info.get("FirstBattingSummary"):
-                    first_innings = match_info["FirstBattingSummary"].split(" - ")
-                    if len(first_innings) == 2:
-                        score, overs = first_innings
-                        if "/" in score:
-                            runs, wickets = score.split("/")
-                            match.first_innings_score = safe_int(runs)
-                            match.first_innings_wickets = safe_int(wickets)
-                            match.first_innings_overs = safe_float(overs.replace(" Ovs", ""))
-                
-                if match_info.get("SecondBattingSummary"):
-                    second_innings = match_info["SecondBattingSummary"].split(" - ")
-                    if len(second_innings) == 2:
-                        score, overs = second_innings
-                        if "/" in score:
-                            runs, wickets = score.split("/")
-                            match.second_innings_score = safe_int(runs)
-                            match.second_innings_wickets = safe_int(wickets)
-                            match.second_innings_overs = safe_float(overs.replace(" Ovs", ""))
+                apply_match_result(db, match, match_info, resolver)
                 
                 db.add(match)
                 db.flush()
@@ -300,6 +354,20 @@ async def process_match_data(db: Session) -> List[models.Match]:
                 print(f"Error processing match {match_code}: {str(e)}")
                 db.rollback()
                 continue
+            
+            if match.match_status == "Completed":
+                feature_store.record_completed_match(db, match)
+        else:
+            # Fold the result into the feature store when a match moves to Completed
+            previous_status = match.match_status
+            match.match_status = match_info.get("MatchStatus", previous_status)
+            if match.match_status == "Completed" and previous_status != "Completed":
+                apply_match_result(db, match, match_info, resolver)
+                feature_store.record_completed_match(db, match)
+            
+            # Extend the win-probability timeline with the latest deliveries
+            if match.match_status == "Live" or previous_status == "Live":
+                win_probability_timeline.append_deliveries(db, match)
                 
         matches.append(match)
     
@@ -309,56 +377,109 @@ async def process_match_data(db: Session) -> List[models.Match]:
         db.rollback()
         raise
     
+    save_feeds(settings.MATCH_SCHEDULE_URL)
+    await result_cache.invalidate()
     return matches
 
-async def process_historical_data(db: Session) -> None:
+def _write_historical_batch(
+    db: Session,
+    batch: List[Dict[str, Any]],
+    scorecards: List[Tuple[str, Optional[int], Dict[str, int], List[InningsCard]]],
+    players: PlayerDirectory
+) -> None:
+    """
+    Insert a batch of historical matches and write the scorecards of new and backfilled matches
+
+    Args:
+        db: Database session
+        batch: Rows of the new matches
+        scorecards: Match code, ID of a stored match (None for a new one), team IDs by name and innings cards
+        players: Player directory of the import
+    """
+    insert_rows(db, models.Match.__table__, batch)
+    new_ids = dict(db.query(models.Match.match_code, models.Match.id).filter(
+        models.Match.match_code.in_([row["match_code"] for row in batch])
+    )) if batch else {}
+    
+    # Stored matches take the innings totals of their deliveries
+    totals = [
+        {"id": match_id, **match_totals(cards)}
+        for _, match_id, _, cards in scorecards if match_id is not None and cards
+    ]
+    if totals:
+        db.execute(update(models.Match), totals)
+    
+    write_scorecards(db, [
+        (match_id if match_id is not None else new_ids[match_code], team_ids, cards)
+        for match_code, match_id, team_ids, cards in scorecards
+    ], players)
+
+async def process_historical_data(db: Session, resolver: Optional[TeamResolver] = None) -> None:
     """
-    Process historical data from Cricsheet
+    Process historical data from Cricsheet, down to every delivery
+    
+    Matches already in the database are recognised from a set of (date, team, team)
+    keys and HIST- match codes loaded with one query. Each new match is aggregated
+    in memory into its innings totals, batting and bowling cards and deliveries,
+    which are written in batches of HISTORICAL_BATCH_SIZE matches, committed one
+    batch at a time. Stored matches without deliveries get their scorecards too.
+    Players are identified by their Cricsheet registry ID, and those created from
+    Cricsheet names are merged into the feed players they turn out to be.
     
     Args:
         db: Database session
+        resolver: Team resolver of the ingestion run, loaded here if not given
     """
-    # Download and extract Cricsheet data
+    # Download Cricsheet data; matches are parsed one at a time as the loop reaches them
     match_data = await download_cricsheet_data()
+    resolver = resolver or TeamResolver.load(db)
+    players = PlayerDirectory.load(db)
     
+    # Historical players belong to no current squad; drop the memberships earlier imports gave them
+    remove_cricsheet_memberships(db)
+    
+    # Date and teams of every stored match with its ID, and every match code
+    known_matches: Dict[Tuple[datetime, frozenset], Optional[int]] = {}
+    known_codes = set()
+    for match_id, match_date, home_team_id, away_team_id, match_code in db.query(
+        models.Match.id, models.Match.date, models.Match.home_team_id, models.Match.away_team_id, models.Match.match_code
+    ):
+        known_matches[(match_date, frozenset((home_team_id, away_team_id)))] = match_id
+        known_codes.add(match_code)
+    with_deliveries = matches_with_deliveries(db)
+    
+    batch: List[Dict[str, Any]] = []
+    scorecards: List[Tuple[str, Optional[int], Dict[str, int], List[InningsCard]]] = []
     for match in match_data:
+        # Write a full batch first, whether it holds new matches or stored ones gaining deliveries
+        if len(scorecards) >= HISTORICAL_BATCH_SIZE:
+            _write_historical_batch(db, batch, scorecards, players)
+            db.commit()
+            batch, scorecards = [], []
+        
         # Process each historical match
         # This is a simplified version - in a real implementation, you'd need to map
         # the Cricsheet data format to your database models
         
-        info = match.get("info", {})   
-
-        raw_date = info.get("dates", [""])[0]
-        match_date = datetime.combine(raw_date, time.min) if isinstance(raw_date, date) else datetime.strptime(raw_date, "%Y-%m-%d")
-
-        teams = info.get("teams", [])
+        match_date = datetime.combine(match.date, time.min)
+        teams = match.teams
         
         if len(teams) != 2:
             continue
         
-        # Look for existing match on this date between these teams
-        existing_matches = db.query(models.Match).filter(
-            models.Match.date == match_date
-        ).all()
+        team1 = resolver.resolve(teams[0])
+        team2 = resolver.resolve(teams[1])
         
-        found = False
-        for existing in existing_matches:
-            home_team = db.query(models.Team).filter(models.Team.id == existing.home_team_id).first()
-            away_team = db.query(models.Team).filter(models.Team.id == existing.away_team_id).first()
-            
-            if not home_team or not away_team:
-                continue
-                
-            if (home_team.name in teams[0] and away_team.name in teams[1]) or \
-               (home_team.name in teams[1] and away_team.name in teams[0]):
-                found = True
-                break
-        
-        if found:
-            continue  # Skip if match already exists
+        # Skip if a match between these teams on this date is already stored or queued,
+        # only adding the deliveries of a stored match that has none
+        if team1 and team2 and (match_date, frozenset((team1.id, team2.id))) in known_matches:
+            match_id = known_matches[(match_date, frozenset((team1.id, team2.id)))]
+            if match_id is not None and match_id not in with_deliveries:
+                with_deliveries.add(match_id)
+                scorecards.append((None, match_id, {teams[0]: team1.id, teams[1]: team2.id}, build_scorecard(match)))
+            continue
         
         # Create teams if they don't exist
-        team1 = db.query(models.Team).filter(models.Team.name.like(f"%{ teams[0]}%")).first()
         if not team1:
             team1 = models.Team(
                 team_code=teams[0].replace(" ", "").upper(),
@@ -367,8 +488,8 @@ async def process_historical_data(db: Session) -> None:
             )
             db.add(team1)
             db.flush()
+            resolver.add(team1)
         
-        team2 = db.query(models.Team).filter(models.Team.name.like(f"%{teams[1]}%")).first()
         if not team2:
             team2 = models.Team(
                 team_code=teams[1].replace(" ", "").upper(),
@@ -377,61 +498,104 @@ async def process_historical_data(db: Session) -> None:
             )
             db.add(team2)
             db.flush()
+            resolver.add(team2)
         
-        # Create match record
-        new_match = models.Match(
-            match_code=f"HIST-{match_date.strftime('%Y%m%d')}-{team1.team_code}-{team2.team_code}",
-            season=str(match_date.year),
-            date=match_date,
-            venue=info.get("venue", ""),
-            city=info.get("city", ""),
-            home_team_id=team1.id,
-            away_team_id=team2.id,
-            match_status="Completed"
-        )
+        match_code = f"HIST-{match_date.strftime('%Y%m%d')}-{team1.team_code}-{team2.team_code}"
+        if match_code in known_codes:
+            continue
+        known_matches[(match_date, frozenset((team1.id, team2.id)))] = None
+        known_codes.add(match_code)
+        
+        # Create match record, with the innings totals from its deliveries
+        cards = build_scorecard(match)
+        new_match = {
+            "match_code": match_code,
+            "season": str(match_date.year),
+            "date": match_date,
+            "venue": match.venue,
+            "city": match.city,
+            "home_team_id": team1.id,
+            "away_team_id": team2.id,
+            "match_status": "Completed",
+            "toss_winner_id": None,
+            "toss_decision": None,
+            "winner_id": None,
+            "win_type": None,
+            "win_margin": None,
+            "first_innings_score": None,
+            "first_innings_wickets": None,
+            "first_innings_overs": None,
+            "second_innings_score": None,
+            "second_innings_wickets": None,
+            "second_innings_overs": None,
+            **match_totals(cards)
+        }
         
         # Add toss info
-        toss = info.get("toss", {})
-        if toss:
-            toss_winner = team1 if toss.get("winner") == teams[0] else team2
-            new_match.toss_winner_id = toss_winner.id
-            new_match.toss_decision = toss.get("decision", "")
+        if match.toss_winner or match.toss_decision:
+            toss_winner = team1 if match.toss_winner == teams[0] else team2
+            new_match["toss_winner_id"] = toss_winner.id
+            new_match["toss_decision"] = match.toss_decision or ""
         
         # Add result info
-        outcome = info.get("outcome", {})
-        if "winner" in outcome:
-            winner = team1 if outcome["winner"] == teams[0] else team2
-            new_match.winner_id = winner.id
+        if match.winner:
+            winner = team1 if match.winner == teams[0] else team2
+            new_match["winner_id"] = winner.id
             
-            if "runs" in outcome.get("by", {}):
-                new_match.win_type = "Runs"
-                new_match.win_margin = outcome["by"]["runs"]
-            elif "wickets" in outcome.get("by", {}):
-                new_match.win_type = "Wickets"
-                new_match.win_margin = outcome["by"]["wickets"]
+            if match.win_type:
+                new_match["win_type"] = match.win_type.capitalize()
+                new_match["win_margin"] = match.win_margin
         
-        db.add(new_match)
+        batch.append(new_match)
+        scorecards.append((match_code, None, {teams[0]: team1.id, teams[1]: team2.id}, cards))
+    
+    _write_historical_batch(db, batch, scorecards, players)
     
+    # Fold players created from Cricsheet names into the feed players they turn out to be
+    reconcile_players(db)
+    db.flush()
+    feature_store.rebuild(db)
     db.commit()
 
-async def initialize_database(db: Session) -> None:
+async def initialize_database(db: Session, force: bool = False) -> None:
     """
     Initialize database with data from APIs
     
     Args:
         db: Database session
+        force: Process every feed, including those unchanged since they were last processed
     """
     # Create tables if they don't exist
     models.Base.metadata.create_all(bind=db.bind)
     
+    # Fetch all four feeds at once over the shared session; processing stays
+    # sequential since teams must exist before matches refer to them.
+    # Unchanged feeds come back as None and their processing is skipped.
+    match_data, team_data, batsmen_data, bowlers_data = await asyncio.gather(
+        fetch_match_schedule(only_if_changed=not force),
+        fetch_team_standings(only_if_changed=not force),
+        fetch_top_run_scorers(only_if_changed=not force),
+        fetch_most_wickets(only_if_changed=not force)
+    )
+    
     # Process team data
-    await process_team_data(db)
+    if team_data is not None:
+        await process_team_data(db, team_data)
+    
+    # Every later stage resolves team names through the same in-memory team map
+    resolver = TeamResolver.load(db)
     
     # Process player data
-    await process_player_data(db)
+    if batsmen_data is not None or bowlers_data is not None:
+        await process_player_data(db, batsmen_data, bowlers_data, resolver=resolver)
     
     # Process match data
-    await process_match_data(db)
+    if match_data is not None:
+        await process_match_data(db, match_data, resolver=resolver)
     
     # Process historical data
-    await process_historical_data(db)
\ No newline at end of file
+    await process_historical_data(db, resolver)
+    
+    # Backfill the feature store when it is still empty, as in databases filled before it existed
+    if feature_store.ensure_built(db):
+        db.commit()
\ No newline at end of file
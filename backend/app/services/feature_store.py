@@ -0,0 +1,272 @@
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from collections import defaultdict
+from sqlalchemy.orm import Session, joinedload
+
+from app.db import models
+
+# Number of latest results kept per team for recent form
+RECENT_FORM_MATCHES = 5
+
+def _result_for(match: models.Match, team_id: int) -> str:
+    """W, L or T (tie or no result) for one side of a completed match"""
+    if match.winner_id == team_id:
+        return "W"
+    if match.winner_id in (match.home_team_id, match.away_team_id):
+        return "L"
+    return "T"
+
+def _get_or_create(db: Session, model: Any, **key: Any) -> Any:
+    """Fetch a feature row by primary key, creating an empty one if missing"""
+    row = db.get(model, tuple(key.values()) if len(key) > 1 else next(iter(key.values())))
+    if row is None:
+        row = model(**key)
+        db.add(row)
+        # Flushing applies the column defaults, and makes the row visible to later
+        # lookups of the same key since the session does not autoflush
+        db.flush()
+    return row
+
+def record_completed_match(db: Session, match: models.Match) -> None:
+    """
+    Fold one newly completed match into the feature store
+
+    Must be called exactly once per match, when it moves to Completed.
+
+    Args:
+        db: Database session
+        match: Completed match
+    """
+    if not match.home_team_id or not match.away_team_id:
+        return
+
+    venue = match.venue or ""
+    for team_id, opponent_id in ((match.home_team_id, match.away_team_id), (match.away_team_id, match.home_team_id)):
+        result = _result_for(match, team_id)
+        won = int(result == "W")
+
+        feature = _get_or_create(db, models.TeamFeature, team_id=team_id)
+        feature.matches_played += 1
+        feature.matches_won += won
+        feature.recent_results = (feature.recent_results + result)[-RECENT_FORM_MATCHES:]
+
+        head_to_head = _get_or_create(db, models.HeadToHead, team_id=team_id, opponent_id=opponent_id)
+        head_to_head.matches += 1
+        head_to_head.wins += won
+
+        venue_record = _get_or_create(db, models.TeamVenueRecord, team_id=team_id, venue=venue)
+        venue_record.matches += 1
+        venue_record.wins += won
+
+    venue_feature = _get_or_create(db, models.VenueFeature, venue=venue)
+    venue_feature.matches += 1
+    venue_feature.toss_winner_won += int(match.toss_winner_id is not None and match.toss_winner_id == match.winner_id)
+
+def refresh_key_players(db: Session, team_ids: Optional[Iterable[int]] = None) -> None:
+    """
+    Store each team's leading run scorer and wicket taker
+
+    Args:
+        db: Database session
+        team_ids: Teams to refresh, all teams if not given
+    """
+    query = db.query(models.player_team_association.c.team_id, models.Player).join(
+        models.Player, models.Player.id == models.player_team_association.c.player_id
+    )
+    if team_ids is not None:
+        query = query.filter(models.player_team_association.c.team_id.in_(list(team_ids)))
+
+    key_batsmen: Dict[int, models.Player] = {}
+    key_bowlers: Dict[int, models.Player] = {}
+    for team_id, player in query.all():
+        if team_id not in key_batsmen or (player.runs or 0) > (key_batsmen[team_id].runs or 0):
+            key_batsmen[team_id] = player
+        if team_id not in key_bowlers or (player.wickets or 0) > (key_bowlers[team_id].wickets or 0):
+            key_bowlers[team_id] = player
+
+    for team_id in set(key_batsmen) | set(key_bowlers):
+        feature = _get_or_create(db, models.TeamFeature, team_id=team_id)
+        feature.key_batsman_id = key_batsmen[team_id].id if team_id in key_batsmen else None
+        feature.key_bowler_id = key_bowlers[team_id].id if team_id in key_bowlers else None
+
+def rebuild(db: Session) -> None:
+    """
+    Recompute the whole feature store from the completed matches
+
+    Used after bulk imports, where folding matches in one at a time would be slow.
+
+    Args:
+        db: Database session
+    """
+    completed_matches = db.query(models.Match).filter(
+        models.Match.match_status == "Completed",
+        models.Match.home_team_id.isnot(None),
+        models.Match.away_team_id.isnot(None)
+    ).order_by(models.Match.date, models.Match.id).all()
+
+    team_stats: Dict[int, List[Any]] = defaultdict(lambda: [0, 0, ""])
+    pair_stats: Dict[Tuple[int, int], List[int]] = defaultdict(lambda: [0, 0])
+    venue_stats: Dict[Tuple[int, str], List[int]] = defaultdict(lambda: [0, 0])
+    toss_stats: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+
+    for match in completed_matches:
+        venue = match.venue or ""
+        for team_id, opponent_id in ((match.home_team_id, match.away_team_id), (match.away_team_id, match.home_team_id)):
+            result = _result_for(match, team_id)
+            won = int(result == "W")
+            stats = team_stats[team_id]
+            stats[0] += 1
+            stats[1] += won
+            stats[2] = (stats[2] + result)[-RECENT_FORM_MATCHES:]
+            pair_stats[(team_id, opponent_id)][0] += 1
+            pair_stats[(team_id, opponent_id)][1] += won
+            venue_stats[(team_id, venue)][0] += 1
+            venue_stats[(team_id, venue)][1] += won
+        toss_stats[venue][0] += 1
+        toss_stats[venue][1] += int(match.toss_winner_id is not None and match.toss_winner_id == match.winner_id)
+
+    for model in (models.TeamFeature, models.HeadToHead, models.TeamVenueRecord, models.VenueFeature):
+        db.query(model).delete()
+
+    db.add_all(
+        models.TeamFeature(team_id=team_id, matches_played=played, matches_won=won, recent_results=recent)
+        for team_id, (played, won, recent) in team_stats.items()
+    )
+    db.add_all(
+        models.HeadToHead(team_id=team_id, opponent_id=opponent_id, matches=played, wins=won)
+        for (team_id, opponent_id), (played, won) in pair_stats.items()
+    )
+    db.add_all(
+        models.TeamVenueRecord(team_id=team_id, venue=venue, matches=played, wins=won)
+        for (team_id, venue), (played, won) in venue_stats.items()
+    )
+    db.add_all(
+        models.VenueFeature(venue=venue, matches=played, toss_winner_won=won)
+        for venue, (played, won) in toss_stats.items()
+    )
+    db.flush()
+
+    refresh_key_players(db)
+
+def ensure_built(db: Session) -> bool:
+    """
+    Rebuild the feature store if it is empty while completed matches exist
+
+    Databases filled before the feature store existed, or whose historical
+    import was skipped, are backfilled this way.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Whether the feature store was rebuilt
+    """
+    if db.query(models.TeamFeature.team_id).first() is not None:
+        return False
+    if db.query(models.Match.id).filter(models.Match.match_status == "Completed").first() is None:
+        return False
+    rebuild(db)
+    return True
+
+def get_match_features(db: Session, home_team_id: int, away_team_id: int, venue: Optional[str]) -> Dict[str, Any]:
+    """
+    Read everything predict_match_outcome needs about a fixture from the feature store
+
+    Args:
+        db: Database session
+        home_team_id: Home team ID
+        away_team_id: Away team ID
+        venue: Venue of the fixture
+
+    Returns:
+        Dictionary with per-side form, head-to-head, venue records and key players,
+        plus the venue's toss-winner win rate
+    """
+    return get_fixtures_features(db, [(home_team_id, away_team_id, venue)])[0]
+
+def get_fixtures_features(db: Session, fixtures: List[Tuple[int, int, Optional[str]]]) -> List[Dict[str, Any]]:
+    """
+    Read the feature-store features of many fixtures with one query per table
+
+    Args:
+        db: Database session
+        fixtures: (home team ID, away team ID, venue) of each fixture
+
+    Returns:
+        Features of each fixture, in the same order, as returned by get_match_features
+    """
+    if not fixtures:
+        return []
+
+    team_ids = {team_id for home_team_id, away_team_id, _ in fixtures for team_id in (home_team_id, away_team_id)}
+    venues = {venue or "" for _, _, venue in fixtures}
+
+    features = {
+        feature.team_id: feature
+        for feature in db.query(models.TeamFeature).options(
+            joinedload(models.TeamFeature.key_batsman),
+            joinedload(models.TeamFeature.key_bowler)
+        ).filter(models.TeamFeature.team_id.in_(team_ids))
+    }
+    head_to_head = {
+        (row.team_id, row.opponent_id): row
+        for row in db.query(models.HeadToHead).filter(
+            models.HeadToHead.team_id.in_(team_ids),
+            models.HeadToHead.opponent_id.in_(team_ids)
+        )
+    }
+    venue_records = {
+        (row.team_id, row.venue): row
+        for row in db.query(models.TeamVenueRecord).filter(
+            models.TeamVenueRecord.team_id.in_(team_ids),
+            models.TeamVenueRecord.venue.in_(venues)
+        )
+    }
+    venue_features = {
+        row.venue: row
+        for row in db.query(models.VenueFeature).filter(models.VenueFeature.venue.in_(venues))
+    }
+
+    def side(team_id: int, opponent_id: int, venue: str) -> Dict[str, Any]:
+        feature = features.get(team_id)
+        recent = feature.recent_results if feature else ""
+        pair = head_to_head.get((team_id, opponent_id))
+        venue_record = venue_records.get((team_id, venue))
+        return {
+            "recent_matches": len(recent),
+            "recent_wins": recent.count("W"),
+            "head_to_head_matches": pair.matches if pair else 0,
+            "head_to_head_wins": pair.wins if pair else 0,
+            "venue_matches": venue_record.matches if venue_record else 0,
+            "venue_wins": venue_record.wins if venue_record else 0,
+            "key_batsman": feature.key_batsman if feature else None,
+            "key_bowler": feature.key_bowler if feature else None
+        }
+
+    results = []
+    for home_team_id, away_team_id, venue in fixtures:
+        venue = venue or ""
+        venue_feature = venue_features.get(venue)
+        results.append({
+            "home": side(home_team_id, away_team_id, venue),
+            "away": side(away_team_id, home_team_id, venue),
+            "toss_win_match_win_percentage": (
+                venue_feature.toss_winner_won / venue_feature.matches
+                if venue_feature and venue_feature.matches else 0.5
+            )
+        })
+    return results
+
+def main() -> None:
+    """Rebuild the feature store from the completed matches in the database"""
+    from app.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rebuild(db)
+        db.commit()
+        print(f"Feature store rebuilt: {db.query(models.TeamFeature).count()} teams, {db.query(models.VenueFeature).count()} venues")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
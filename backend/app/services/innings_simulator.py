@@ -0,0 +1,257 @@
+from typing import Dict, Any, Iterable, NamedTuple, Optional, Tuple
+from pathlib import Path
+import json
+import numpy as np
+
+from app.core.config import settings
+from app.utils.cricsheet import CricsheetDelivery, CricsheetMatch
+
+# Ball outcomes of the transition model. Wides and no-balls add a run without using up a ball.
+OUTCOMES = ["dot", "1", "2", "3", "4", "5", "6", "wide", "wicket"]
+OUTCOME_RUNS = np.array([0, 1, 2, 3, 4, 5, 6, 1, 0])
+OUTCOME_BALLS = np.array([1, 1, 1, 1, 1, 1, 1, 0, 1])
+OUTCOME_WICKETS = np.array([0, 0, 0, 0, 0, 0, 0, 0, 1])
+SCORING_OUTCOMES = slice(1, 7)
+WIDE, WICKET = 7, 8
+
+# Transition states: over of the innings and wickets lost
+OVERS_PER_INNINGS = 20
+BALLS_PER_INNINGS = OVERS_PER_INNINGS * 6
+MAX_WICKETS = 10
+
+# Pseudo-count of balls that pulls sparse states towards the outcome mix of their over
+OUTCOME_PRIOR_BALLS = 200
+
+# Run factors outside this range would push the dot-ball probability out of [0, 1].
+# Factors are rounded to RUN_FACTOR_STEP, one precomputed sampling table per step.
+MIN_RUN_FACTOR = 0.5
+MAX_RUN_FACTOR = 1.5
+RUN_FACTOR_STEP = 0.025
+
+# Ball outcomes are sampled from inverse-CDF tables with this many equally likely slots
+# per state, so outcome probabilities are resolved to 1/SAMPLING_SLOTS
+SAMPLING_SLOTS = 1024
+
+# Percentiles reported for simulated totals
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Name of the transition model directory in the model registry
+MODEL_NAME = "innings_simulator"
+
+class TransitionModel(NamedTuple):
+    """Ball-outcome probabilities per innings state, with their sampling tables"""
+    probabilities: np.ndarray  # (over, wickets lost, outcome)
+    sampling: np.ndarray       # Flattened (run factor step, over, wickets lost, slot) outcome indices
+
+class InningsSample(NamedTuple):
+    """Final state of each simulated innings"""
+    runs: np.ndarray
+    wickets: np.ndarray
+    balls: np.ndarray
+    deliveries: int  # Deliveries simulated across all innings, including wides
+
+# Transition model loaded once per worker at startup
+_model: Optional[TransitionModel] = None
+
+def _delivery_outcome(delivery: CricsheetDelivery) -> int:
+    """Index into OUTCOMES of one Cricsheet delivery"""
+    if not delivery.legal:
+        return WIDE
+    if delivery.is_wicket:
+        return WICKET
+    return min(delivery.runs, 6)
+
+def count_transitions(matches: Iterable[CricsheetMatch]) -> np.ndarray:
+    """
+    Count ball outcomes per innings state in historical Cricsheet matches
+
+    Args:
+        matches: Historical Cricsheet match records
+
+    Returns:
+        Counts of shape (over, wickets lost, outcome)
+    """
+    counts = np.zeros((OVERS_PER_INNINGS, MAX_WICKETS, len(OUTCOMES)))
+    for match in matches:
+        # Shortened and rain-affected matches would distort the full-length model
+        if match.overs != 20 or match.method:
+            continue
+
+        for innings in match.innings[:2]:
+            balls, wickets = 0, 0
+            for delivery in innings.deliveries:
+                if balls >= BALLS_PER_INNINGS or wickets >= MAX_WICKETS:
+                    break
+                outcome = _delivery_outcome(delivery)
+                counts[balls // 6, wickets, outcome] += 1
+                balls += OUTCOME_BALLS[outcome]
+                wickets += OUTCOME_WICKETS[outcome]
+    return counts
+
+def _run_factor_grid() -> np.ndarray:
+    steps = int(round((MAX_RUN_FACTOR - MIN_RUN_FACTOR) / RUN_FACTOR_STEP))
+    return MIN_RUN_FACTOR + RUN_FACTOR_STEP * np.arange(steps + 1)
+
+def tilt(probabilities: np.ndarray, run_factor: float) -> np.ndarray:
+    """
+    Scale the probabilities of scoring shots by a run factor, balancing with dot balls
+
+    Expected runs per ball scale by roughly the same factor.
+    """
+    tilted = probabilities.copy()
+    scoring = probabilities[..., SCORING_OUTCOMES]
+    tilted[..., SCORING_OUTCOMES] = scoring * run_factor
+    tilted[..., 0] = np.maximum(probabilities[..., 0] - scoring.sum(axis=-1) * (run_factor - 1), 0)
+    return tilted / tilted.sum(axis=-1, keepdims=True)
+
+def _sampling_tables(probabilities: np.ndarray) -> np.ndarray:
+    """Inverse-CDF lookup of the outcome for each slot, state and run factor step"""
+    slots = (np.arange(SAMPLING_SLOTS) + 0.5) / SAMPLING_SLOTS
+    tables = []
+    for run_factor in _run_factor_grid():
+        cumulative = np.cumsum(tilt(probabilities, run_factor), axis=-1)
+        table = (slots[None, None, None, :] >= cumulative[..., :-1, None]).sum(axis=-2)
+        tables.append(table.astype(np.uint8))
+    return np.stack(tables).ravel()
+
+def make_model(probabilities: np.ndarray) -> TransitionModel:
+    """Transition model from outcome probabilities of shape (over, wickets lost, outcome)"""
+    return TransitionModel(probabilities, _sampling_tables(probabilities))
+
+def fit_model(matches: Iterable[CricsheetMatch]) -> TransitionModel:
+    """
+    Fit ball-outcome probabilities per over and wickets lost
+
+    Args:
+        matches: Historical Cricsheet match records
+
+    Returns:
+        Fitted transition model
+    """
+    counts = count_transitions(matches)
+    if counts.sum() == 0:
+        raise ValueError("No usable deliveries to fit the innings simulator to")
+    per_over = counts.sum(axis=1, keepdims=True)
+    per_over_share = per_over / np.maximum(per_over.sum(axis=2, keepdims=True), 1)
+    smoothed = counts + OUTCOME_PRIOR_BALLS * per_over_share
+    return make_model(smoothed / np.maximum(smoothed.sum(axis=2, keepdims=True), 1e-12))
+
+def simulate_innings(
+    model: TransitionModel,
+    run_factors: np.ndarray,
+    rng: np.random.Generator,
+    targets: Optional[np.ndarray] = None
+) -> InningsSample:
+    """
+    Simulate many innings in parallel, one ball for every unfinished innings per step
+
+    Each innings can be made stronger or weaker than the league by a run factor,
+    see tilt. Every step is a handful of array operations over the unfinished
+    innings: the outcome of each ball is a single lookup into the sampling tables.
+
+    Args:
+        model: Transition model
+        run_factors: Run factor of each innings, 1 for a league-average matchup
+        rng: Random generator
+        targets: Runs needed to win each innings, for chases
+
+    Returns:
+        Final runs, wickets and legal balls of each innings
+    """
+    run_factors = np.clip(np.asarray(run_factors, dtype=float), MIN_RUN_FACTOR, MAX_RUN_FACTOR)
+    n = len(run_factors)
+    targets = np.full(n, np.iinfo(np.int64).max) if targets is None else np.asarray(targets, dtype=np.int64)
+
+    # Offset of each innings' sampling table within the flattened tables
+    states = OVERS_PER_INNINGS * MAX_WICKETS
+    table_offsets = np.rint((run_factors - MIN_RUN_FACTOR) / RUN_FACTOR_STEP).astype(np.int64) * states * SAMPLING_SLOTS
+
+    runs = np.zeros(n, dtype=np.int64)
+    wickets = np.zeros(n, dtype=np.int64)
+    balls = np.zeros(n, dtype=np.int64)
+    live = np.arange(n)
+    deliveries = 0
+
+    while len(live):
+        live_balls = balls[live]
+        states_live = (live_balls // 6) * MAX_WICKETS + wickets[live]
+        slots = rng.integers(0, SAMPLING_SLOTS, len(live))
+        outcomes = model.sampling[table_offsets[live] + states_live * SAMPLING_SLOTS + slots]
+
+        runs[live] += OUTCOME_RUNS[outcomes]
+        balls[live] = live_balls + OUTCOME_BALLS[outcomes]
+        wickets[live] += OUTCOME_WICKETS[outcomes]
+        deliveries += len(live)
+
+        live = live[(balls[live] < BALLS_PER_INNINGS) & (wickets[live] < MAX_WICKETS) & (runs[live] < targets[live])]
+
+    return InningsSample(runs, wickets, balls, deliveries)
+
+def simulate_matches(
+    model: TransitionModel,
+    first_factors: np.ndarray,
+    second_factors: np.ndarray,
+    rng: np.random.Generator
+) -> Tuple[InningsSample, InningsSample]:
+    """
+    Simulate many matches, each chase aiming at its own simulated first innings
+
+    Args:
+        model: Transition model
+        first_factors: Run factor of the side batting first in each match
+        second_factors: Run factor of the side batting second in each match
+        rng: Random generator
+
+    Returns:
+        Tuple of first-innings and second-innings samples
+    """
+    first = simulate_innings(model, first_factors, rng)
+    second = simulate_innings(model, second_factors, rng, targets=first.runs + 1)
+    return first, second
+
+def percentiles(values: np.ndarray) -> Dict[str, float]:
+    """PERCENTILES of simulated values, keyed p10, p25 and so on"""
+    if len(values) == 0:
+        return {}
+    return {f"p{q}": float(value) for q, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+def _model_dir() -> Path:
+    return Path(settings.MODEL_REGISTRY_DIR) / MODEL_NAME
+
+def save_model(model: TransitionModel) -> Path:
+    """
+    Write the transition probabilities to the model registry
+
+    Args:
+        model: Transition model
+
+    Returns:
+        Directory the model was written to
+    """
+    directory = _model_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    np.save(directory / "transitions.npy", model.probabilities)
+    (directory / "outcomes.json").write_text(json.dumps(OUTCOMES))
+    return directory
+
+def load_model() -> Optional[TransitionModel]:
+    """Load the transition model from the registry for this worker, None if it was never fitted"""
+    global _model
+    path = _model_dir() / "transitions.npy"
+    _model = make_model(np.load(path)) if path.exists() else None
+    return _model
+
+def get_model() -> Optional[TransitionModel]:
+    """Transition model loaded at startup, None if it was never fitted"""
+    return _model
+
+def main() -> None:
+    """Fit the transition model to the Cricsheet archive and write it to the registry"""
+    from app.utils.data_fetcher import download_cricsheet_data, run_with_session
+
+    matches = run_with_session(download_cricsheet_data())
+    directory = save_model(fit_model(matches))
+    print(f"Saved {MODEL_NAME} model to {directory}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+from datetime import datetime
+from pathlib import Path
+import json
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.metrics import accuracy_score, brier_score_loss, log_loss
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import models
+
+# Name of the model in the artifact registry
+MODEL_NAME = "match_outcome"
+
+# Pre-match features, all computed only from matches completed before the one predicted
+FEATURE_NAMES = [
+    "home_win_rate",
+    "away_win_rate",
+    "home_form",
+    "away_form",
+    "head_to_head",
+    "head_to_head_matches",
+    "home_venue_win_rate",
+    "away_venue_win_rate"
+]
+
+# Recent form is the win rate over this many completed matches
+FORM_MATCHES = 5
+
+# Pseudo-count that pulls win rates from few matches towards 50%
+RATE_PRIOR_MATCHES = 2
+
+# Share of the most recent matches held out to evaluate a trained model
+HOLDOUT_FRACTION = 0.2
+
+class LoadedModel(NamedTuple):
+    """A model artifact loaded from the registry"""
+    version: int
+    model: Any
+    metadata: Dict[str, Any]
+
+# Model loaded once per worker at startup
+_active_model: Optional[LoadedModel] = None
+
+# Batched predictions for the scheduled matches, keyed on model version and data version
+_scheduled_predictions: Dict[str, Any] = {"key": None, "probabilities": {}}
+
+def load_match_frame(db: Session) -> pd.DataFrame:
+    """
+    Load completed and scheduled matches as a data frame in schedule order
+
+    Args:
+        db: Database session
+
+    Returns:
+        Data frame with one row per match
+    """
+    rows = db.query(
+        models.Match.id,
+        models.Match.date,
+        models.Match.venue,
+        models.Match.home_team_id,
+        models.Match.away_team_id,
+        models.Match.winner_id,
+        models.Match.match_status
+    ).filter(
+        models.Match.match_status.in_(["Completed", "Scheduled"]),
+        models.Match.home_team_id.isnot(None),
+        models.Match.away_team_id.isnot(None)
+    ).all()
+
+    frame = pd.DataFrame(
+        rows,
+        columns=["id", "date", "venue", "home_team_id", "away_team_id", "winner_id", "match_status"]
+    )
+    frame["venue"] = frame["venue"].fillna("")
+    frame["completed"] = frame["match_status"] == "Completed"
+    return frame.sort_values(["date", "id"], kind="stable").reset_index(drop=True)
+
+def build_features(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build the pre-match feature matrix for every match in one pass
+
+    Each match is split into one row per side. Cumulative sums over groups of
+    those rows give every side's record before the match, so completed and
+    scheduled matches get consistent features without any per-match queries.
+
+    Args:
+        frame: Matches in schedule order, as returned by load_match_frame
+
+    Returns:
+        Data frame of FEATURE_NAMES columns, aligned with frame
+    """
+    n_matches = len(frame)
+    no_result = frame["completed"] & frame["winner_id"].isna()
+    sides = []
+    for side, team, opponent in (("home", "home_team_id", "away_team_id"), ("away", "away_team_id", "home_team_id")):
+        won = (frame["winner_id"] == frame[team]).astype(float)
+        sides.append(pd.DataFrame({
+            "match": np.arange(n_matches),
+            "side": side,
+            "team": frame[team].to_numpy(),
+            "opponent": frame[opponent].to_numpy(),
+            "venue": frame["venue"].to_numpy(),
+            "completed": frame["completed"].astype(float).to_numpy(),
+            # Ties and no results count as half a win, scheduled matches as nothing
+            "won": np.where(no_result, 0.5, won.where(frame["completed"], 0.0))
+        }))
+    long = pd.concat(sides).sort_values(["match", "side"], kind="stable").reset_index(drop=True)
+
+    def prior_rate(keys: List[str]) -> Tuple[pd.Series, pd.Series]:
+        groups = long.groupby(keys, sort=False)
+        played = groups["completed"].cumsum() - long["completed"]
+        wins = groups["won"].cumsum() - long["won"]
+        return (wins + RATE_PRIOR_MATCHES / 2) / (played + RATE_PRIOR_MATCHES), played
+
+    long["win_rate"], _ = prior_rate(["team"])
+    long["head_to_head"], long["head_to_head_matches"] = prior_rate(["team", "opponent"])
+    long["venue_win_rate"], _ = prior_rate(["team", "venue"])
+
+    # Form after each completed match, carried forward to the side's next match
+    completed = long[long["completed"] > 0]
+    long["form_after"] = completed.groupby("team")["won"].transform(
+        lambda won: won.rolling(FORM_MATCHES, min_periods=1).mean()
+    )
+    teams = long.groupby("team", sort=False)
+    long["form"] = teams["form_after"].shift().groupby(long["team"]).ffill().fillna(0.5)
+
+    home = long[long["side"] == "home"].set_index("match")
+    away = long[long["side"] == "away"].set_index("match")
+    features = pd.DataFrame({
+        "home_win_rate": home["win_rate"],
+        "away_win_rate": away["win_rate"],
+        "home_form": home["form"],
+        "away_form": away["form"],
+        "head_to_head": home["head_to_head"],
+        "head_to_head_matches": home["head_to_head_matches"],
+        "home_venue_win_rate": home["venue_win_rate"],
+        "away_venue_win_rate": away["venue_win_rate"]
+    })
+    features.index = frame.index
+    return features[FEATURE_NAMES]
+
+def _training_set(frame: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Features and home-win labels of completed matches won by either side"""
+    features = build_features(frame)
+    decided = frame["completed"] & (
+        (frame["winner_id"] == frame["home_team_id"]) | (frame["winner_id"] == frame["away_team_id"])
+    )
+    labels = (frame.loc[decided, "winner_id"] == frame.loc[decided, "home_team_id"]).to_numpy().astype(int)
+    return features[decided], labels
+
+def _new_classifier() -> GradientBoostingClassifier:
+    return GradientBoostingClassifier(n_estimators=200, learning_rate=0.05, max_depth=3, subsample=0.8, random_state=0)
+
+def train_model(db: Session) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Train the match-outcome model on all completed matches
+
+    The most recent HOLDOUT_FRACTION of matches is held out to report
+    log-loss, Brier score and accuracy, then the model is refit on every match.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Tuple of the trained model and its metadata
+    """
+    features, labels = _training_set(load_match_frame(db))
+    if len(labels) < 20 or len(set(labels)) < 2:
+        raise ValueError(f"Not enough completed matches to train on ({len(labels)})")
+
+    split = int(len(labels) * (1 - HOLDOUT_FRACTION))
+    holdout = _new_classifier().fit(features.iloc[:split], labels[:split])
+    probabilities = holdout.predict_proba(features.iloc[split:])[:, 1]
+
+    model = _new_classifier().fit(features, labels)
+    metadata = {
+        "name": MODEL_NAME,
+        "features": FEATURE_NAMES,
+        "trained_at": datetime.utcnow().isoformat(),
+        "training_matches": len(labels),
+        "holdout_matches": len(labels) - split,
+        "holdout_log_loss": float(log_loss(labels[split:], probabilities, labels=[0, 1])),
+        "holdout_brier_score": float(brier_score_loss(labels[split:], probabilities)),
+        "holdout_accuracy": float(accuracy_score(labels[split:], probabilities >= 0.5))
+    }
+    return model, metadata
+
+def _registry_dir() -> Path:
+    return Path(settings.MODEL_REGISTRY_DIR) / MODEL_NAME
+
+def list_versions() -> List[int]:
+    """Versions of the match-outcome model in the registry, oldest first"""
+    directory = _registry_dir()
+    if not directory.is_dir():
+        return []
+    return sorted(int(path.stem[1:]) for path in directory.glob("v*.joblib") if path.stem[1:].isdigit())
+
+def save_model(model: Any, metadata: Dict[str, Any]) -> int:
+    """
+    Save a trained model as the next version in the registry
+
+    Args:
+        model: Trained classifier
+        metadata: Training metadata, written alongside the artifact
+
+    Returns:
+        Version number of the saved artifact
+    """
+    directory = _registry_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    version = max(list_versions(), default=0) + 1
+    metadata = {**metadata, "version": version}
+    joblib.dump({"model": model, "metadata": metadata}, directory / f"v{version}.joblib")
+    (directory / f"v{version}.json").write_text(json.dumps(metadata, indent=2))
+    return version
+
+def load_model(version: Optional[int] = None) -> Optional[LoadedModel]:
+    """
+    Load a model artifact from the registry
+
+    Args:
+        version: Version to load, the latest if not given
+
+    Returns:
+        Loaded model, or None if the registry has no such version
+    """
+    versions = list_versions()
+    if version is None:
+        version = versions[-1] if versions else None
+    if version is None or version not in versions:
+        return None
+    artifact = joblib.load(_registry_dir() / f"v{version}.joblib")
+    return LoadedModel(version, artifact["model"], artifact["metadata"])
+
+def load_active_model() -> Optional[LoadedModel]:
+    """Load the configured model version, or the latest one, for this worker"""
+    global _active_model
+    _active_model = load_model(settings.MATCH_MODEL_VERSION)
+    _scheduled_predictions["key"] = None
+    return _active_model
+
+def get_active_model() -> Optional[LoadedModel]:
+    """Model loaded at startup, None if the registry was empty"""
+    return _active_model
+
+def data_version(db: Session) -> Tuple[Any, ...]:
+    """Cheap summary of the matches table that changes whenever features could change"""
+    return tuple(db.query(
+        func.count(models.Match.id),
+        func.max(models.Match.id),
+        func.max(models.Match.updated_at),
+        func.count(models.Match.winner_id)
+    ).one())
+
+def scheduled_win_probabilities(db: Session) -> Dict[int, float]:
+    """
+    Home win probability of every scheduled match from the active model
+
+    All scheduled matches are scored with a single predict_proba call, and the
+    result is reused until the model or the matches change.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Dictionary mapping match ID to home win probability, empty without a model
+    """
+    if _active_model is None:
+        return {}
+
+    key = (_active_model.version, data_version(db))
+    if _scheduled_predictions["key"] != key:
+        frame = load_match_frame(db)
+        scheduled = frame["match_status"] == "Scheduled"
+        probabilities: Dict[int, float] = {}
+        if scheduled.any():
+            features = build_features(frame)[scheduled]
+            home_probs = _active_model.model.predict_proba(features)[:, 1]
+            probabilities = dict(zip(frame.loc[scheduled, "id"].tolist(), home_probs.tolist()))
+        _scheduled_predictions["key"] = key
+        _scheduled_predictions["probabilities"] = probabilities
+
+    return _scheduled_predictions["probabilities"]
+
+def main() -> None:
+    """Train a model on the current database and register it"""
+    from app.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        model, metadata = train_model(db)
+    finally:
+        db.close()
+    version = save_model(model, metadata)
+    print(f"Saved {MODEL_NAME} v{version}: {json.dumps(metadata, indent=2)}")
+
+if __name__ == "__main__":
+    main()
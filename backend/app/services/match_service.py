@@ -4,6 +4,7 @@ import numpy as np
 from sklearn.linear_model import LogisticRegression
 
 from app.db import models
+from app.services import win_probability
 
 def match_to_dict(
     match: models.Match, 
@@ -137,6 +138,52 @@ def commentary_to_dict(commentary: models.Commentary) -> Dict[str, Any]:
         "created_at": commentary.created_at.isoformat() if commentary.created_at else None
     }
 
+def batting_first_team_id(match: models.Match) -> int:
+    """Team batting first, from the toss, defaulting to the home team"""
+    if match.toss_winner_id and match.toss_decision:
+        if match.toss_decision.lower() == "bat":
+            return match.toss_winner_id
+        return match.away_team_id if match.toss_winner_id == match.home_team_id else match.home_team_id
+    return match.home_team_id
+
+def lookup_win_probability(match: models.Match, table: win_probability.WinProbabilityTable) -> Dict[str, Any]:
+    """
+    Win probability for a live match from the precomputed table, without database access
+    
+    Args:
+        match: Live match
+        table: Win-probability table loaded at startup
+        
+    Returns:
+        Dictionary with home and away win probabilities
+    """
+    batting_first_id = batting_first_team_id(match)
+    
+    if match.second_innings_score is None:
+        innings = 1
+        batting_team_id = batting_first_id
+        balls_remaining = win_probability.BALLS_PER_INNINGS - win_probability.overs_to_balls(match.first_innings_overs or 0)
+        wickets = match.first_innings_wickets or 0
+        runs = match.first_innings_score or 0
+        message = "First innings in progress"
+    else:
+        innings = 2
+        batting_team_id = match.away_team_id if batting_first_id == match.home_team_id else match.home_team_id
+        balls_remaining = win_probability.BALLS_PER_INNINGS - win_probability.overs_to_balls(match.second_innings_overs or 0)
+        wickets = match.second_innings_wickets or 0
+        runs = (match.first_innings_score or 0) + 1 - match.second_innings_score
+        message = "Second innings in progress"
+    
+    batting_team_prob = win_probability.batting_side_probability(
+        table, innings, balls_remaining, wickets, runs, match.venue
+    )
+    
+    return {
+        "home_team_probability": batting_team_prob if batting_team_id == match.home_team_id else 1 - batting_team_prob,
+        "away_team_probability": batting_team_prob if batting_team_id == match.away_team_id else 1 - batting_team_prob,
+        "message": message
+    }
+
 def calculate_win_probability(match: models.Match, db: Session) -> Dict[str, Any]:
     """Calculate win probability for a live match"""
     if match.match_status != "Live":
@@ -146,6 +193,11 @@ def calculate_win_probability(match: models.Match, db: Session) -> Dict[str, Any
             "message": "Match is not live"
         }
     
+    # Constant-time lookup when the table has been built
+    table = win_probability.get_table()
+    if table is not None:
+        return lookup_win_probability(match, table)
+    
     # Get current match state
     current_innings = 1 if match.first_innings_score is not None and match.second_innings_score is None else 2
     
@@ -0,0 +1,199 @@
+from typing import Optional, Tuple
+import numpy as np
+
+from app.services.season_simulator import PLAYOFF_SPOTS, fixture_matrices
+
+# Teams finishing in the top two get a second chance through Qualifier 2
+TOP_TWO = 2
+
+# Above this many remaining fixtures, or live points states, the exact engine
+# gives way to sampling
+MAX_EXACT_FIXTURES = 24
+MAX_STATES = 250000
+
+# Number of sampled seasons used when the state space is too large
+FALLBACK_SIMULATIONS = 20000
+
+def tiebreak_order(nrr: np.ndarray) -> np.ndarray:
+    """
+    Tie-break value per team, higher is better
+
+    Future net run rates are unknown, so teams level on points are separated by
+    their current net run rate.
+    """
+    order = np.argsort(-nrr, kind="stable")
+    tiebreak = np.empty(len(nrr), dtype=np.int64)
+    tiebreak[order] = np.arange(len(nrr) - 1, -1, -1)
+    return tiebreak
+
+def _rank_buckets(rank: np.ndarray) -> np.ndarray:
+    """0 for a top-two finish, 1 for third or fourth, 2 for missing the playoffs"""
+    return (rank > TOP_TWO).astype(np.int8) + (rank > PLAYOFF_SPOTS)
+
+def _rank_bounds(
+    points: np.ndarray,
+    remaining: np.ndarray,
+    tiebreak: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Best and worst possible final rank of every team in every state
+
+    Args:
+        points: (states x teams) points so far
+        remaining: Matches still to play per team
+        tiebreak: Tie-break value per team
+
+    Returns:
+        Tuple of (states x teams) best and worst possible ranks
+    """
+    n_teams = points.shape[1]
+    min_score = points * n_teams + tiebreak
+    max_score = (points + 2 * remaining) * n_teams + tiebreak
+
+    # Scores are small integers, so narrow types keep the comparisons cheap
+    score_type = np.int16 if max_score.size == 0 or max_score.max() < np.iinfo(np.int16).max else np.int32
+    min_score = min_score.astype(score_type)
+    max_score = max_score.astype(score_type)
+
+    # Count teams certain to finish above each team, and teams that could finish above it.
+    # Looping over the (small) team axis avoids a (states x teams x teams) temporary.
+    above_for_sure = np.zeros(points.shape, dtype=np.int16)
+    could_be_above = np.zeros(points.shape, dtype=np.int16)
+    for j in range(n_teams):
+        above_for_sure += min_score[:, j:j + 1] > max_score
+        could_be_above += max_score[:, j:j + 1] > min_score
+    could_be_above -= remaining > 0
+    return 1 + above_for_sure, 1 + could_be_above
+
+def sample_qualification(
+    points: np.ndarray,
+    nrr: np.ndarray,
+    home_idx: np.ndarray,
+    away_idx: np.ndarray,
+    home_probs: np.ndarray,
+    simulations: int = FALLBACK_SIMULATIONS,
+    seed: Optional[int] = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Estimate qualification and top-two probabilities by sampling the remaining fixtures
+
+    Args:
+        points: Current points per team
+        nrr: Current net run rate per team
+        home_idx: Team index of the home side of each fixture
+        away_idx: Team index of the away side of each fixture
+        home_probs: Probability that the home side wins each fixture
+        simulations: Number of seasons to sample
+        seed: Seed for the sampler
+
+    Returns:
+        Tuple of qualification and top-two probabilities per team
+    """
+    n_teams = len(points)
+    rng = np.random.default_rng(seed)
+    home, away = fixture_matrices(home_idx, away_idx, n_teams)
+    home_wins = (rng.random((simulations, len(home_idx))) < home_probs).astype(float)
+
+    final_points = points + 2 * (home_wins @ home + (1 - home_wins) @ away)
+    score = final_points * n_teams + tiebreak_order(nrr)
+    ranking = np.argsort(-score, axis=1)
+
+    qualify = np.bincount(ranking[:, :PLAYOFF_SPOTS].ravel(), minlength=n_teams) / simulations
+    top_two = np.bincount(ranking[:, :TOP_TWO].ravel(), minlength=n_teams) / simulations
+    return qualify, top_two
+
+def qualification_probabilities(
+    points: np.ndarray,
+    nrr: np.ndarray,
+    home_idx: np.ndarray,
+    away_idx: np.ndarray,
+    home_probs: np.ndarray,
+    max_states: int = MAX_STATES
+) -> Tuple[np.ndarray, np.ndarray, str]:
+    """
+    Exact qualification and top-two probabilities over the joint outcomes of all fixtures
+
+    Fixtures are resolved one at a time. Each live state is the vector of wins
+    gained so far, and states reaching the same points vector are merged through a
+    mixed-radix key. Two kinds of pruning keep the state space small:
+
+    - a state is retired as soon as no remaining result can move any team between
+      the top two, the rest of the top four and the others;
+    - a team that misses the top four in every live state can no longer change who
+      finishes there, so it is dropped from the state, merging states that differ
+      only in its wins.
+
+    Long schedules, or a number of live states above max_states, fall back to sampling.
+
+    Args:
+        points: Current points per team
+        nrr: Current net run rate per team
+        home_idx: Team index of the home side of each fixture, in schedule order
+        away_idx: Team index of the away side of each fixture, in schedule order
+        home_probs: Probability that the home side wins each fixture
+        max_states: Maximum number of live states before falling back to sampling
+
+    Returns:
+        Tuple of qualification probabilities, top-two probabilities and the method used
+        ("exact" or "sampled")
+    """
+    n_teams, n_matches = len(points), len(home_idx)
+    tiebreak = tiebreak_order(nrr)
+
+    # Matches left per team before each fixture, and after the last one
+    played = np.zeros((n_matches + 1, n_teams), dtype=np.int64)
+    played[np.arange(n_matches), home_idx] += 1
+    played[np.arange(n_matches), away_idx] += 1
+    remaining = played[::-1].cumsum(axis=0)[::-1]
+
+    radix = remaining[0] + 1
+    if n_matches > MAX_EXACT_FIXTURES or np.prod(radix.astype(float)) >= 2 ** 62:
+        return (*sample_qualification(points, nrr, home_idx, away_idx, home_probs), "sampled")
+    stride = np.concatenate(([1], np.cumprod(radix[:-1]))).astype(np.int64)
+
+    wins = np.zeros((1, n_teams), dtype=np.int16)
+    probs = np.ones(1)
+    active = np.ones(n_teams, dtype=bool)
+    qualify = np.zeros(n_teams)
+    top_two = np.zeros(n_teams)
+
+    for k in range(n_matches + 1):
+        # Retire states whose top-two / top-four split is already settled
+        state_points = points[active].astype(np.int64) + 2 * wins[:, active]
+        best, worst = _rank_bounds(state_points, remaining[k][active], tiebreak[active])
+        settled = (_rank_buckets(best) == _rank_buckets(worst)).all(axis=1)
+        qualify[active] += probs[settled] @ (worst[settled] <= PLAYOFF_SPOTS)
+        top_two[active] += probs[settled] @ (worst[settled] <= TOP_TWO)
+        wins, probs = wins[~settled], probs[~settled]
+
+        if k == n_matches or len(probs) == 0:
+            break
+
+        # Drop teams that are out of the top four in every live state
+        eliminated = (best[~settled] > PLAYOFF_SPOTS).all(axis=0)
+        if eliminated.any():
+            teams = np.flatnonzero(active)[eliminated]
+            wins[:, teams] = 0
+            active[teams] = False
+
+        # Branch on the next fixture and merge states with equal points vectors.
+        # Dropped teams' wins stay at zero, so states differing only in them merge.
+        n_states = len(probs)
+        p = home_probs[k]
+        wins = np.concatenate((wins, wins))
+        if active[home_idx[k]]:
+            wins[:n_states, home_idx[k]] += 1
+        if active[away_idx[k]]:
+            wins[n_states:, away_idx[k]] += 1
+        probs = np.concatenate((probs * p, probs * (1 - p)))
+        live = probs > 0
+        wins, probs = wins[live], probs[live]
+
+        _, first, inverse = np.unique(wins @ stride, return_index=True, return_inverse=True)
+        wins = wins[first]
+        probs = np.bincount(inverse, weights=probs)
+
+        if len(probs) > max_states:
+            return (*sample_qualification(points, nrr, home_idx, away_idx, home_probs), "sampled")
+
+    return qualify, top_two, "exact"
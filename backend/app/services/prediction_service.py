@@ -1,11 +1,39 @@
-from typing import Dict, Any, List, Optional, Tuple
-from sqlalchemy.orm import Session
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+from collections import OrderedDict
+from functools import partial
+import asyncio
+import hashlib
+import secrets
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
 import numpy as np
 from sklearn.ensemble import GradientBoostingClassifier
 import pandas as pd
 from datetime import datetime
 
 from app.db import models
+from app.services import season_simulator, playoff_odds, result_cache, match_model, feature_store, innings_simulator
+
+# Base simulations re-used by what-if scenarios, keyed on season fingerprint and parameters
+SCENARIO_CACHE_SIZE = 8
+_scenario_bases: "OrderedDict[Tuple[str, int, Optional[int]], Dict[str, Any]]" = OrderedDict()
+_scenario_sampling: Dict[Tuple[str, int, Optional[int]], "asyncio.Task[Dict[str, Any]]"] = {}
+
+# Season state scenarios are resolved against, keyed on the season fingerprint
+_scenario_state: Dict[str, Any] = {"key": None, "state": None}
+
+# Innings simulated per fixture, half with each side batting first, and per player projection
+FIXTURE_SIMULATIONS = 1000
+PLAYER_SIMULATIONS = 2000
+
+# Number of latest batting and bowling performances player predictions are based on
+RECENT_PERFORMANCES = 10
+
+# Projections of every scheduled match, keyed on the simulator and the matches' data version
+_scheduled_projections: Dict[str, Any] = {"key": None, "projections": {}}
+
+# Innings model behind the run factors, keyed on the teams and the matches' data version
+_run_factor_fit: Dict[str, Any] = {"key": None, "fit": None}
 
 async def predict_match_outcome(match: models.Match, db: Session) -> Dict[str, Any]:
     """
@@ -27,116 +55,162 @@ async def predict_match_outcome(match: models.Match, db: Session) -> Dict[str, A
             "error": "Team data not found"
         }
     
-    # Get historical matches between these teams
-    historical_matches = db.query(models.Match).filter(
-        ((models.Match.home_team_id == match.home_team_id) & (models.Match.away_team_id == match.away_team_id)) |
-        ((models.Match.home_team_id == match.away_team_id) & (models.Match.away_team_id == match.home_team_id)),
-        models.Match.match_status == "Completed"
-    ).all()
-    
-    # Calculate head-to-head stats
-    home_wins = sum(1 for m in historical_matches if m.winner_id == match.home_team_id)
-    away_wins = sum(1 for m in historical_matches if m.winner_id == match.away_team_id)
-    
-    # Get recent form (last 5 matches)
-    home_recent_matches = db.query(models.Match).filter(
-        (models.Match.home_team_id == match.home_team_id) | (models.Match.away_team_id == match.home_team_id),
-        models.Match.match_status == "Completed"
-    ).order_by(models.Match.date.desc()).limit(5).all()
-    
-    away_recent_matches = db.query(models.Match).filter(
-        (models.Match.home_team_id == match.away_team_id) | (models.Match.away_team_id == match.away_team_id),
-        models.Match.match_status == "Completed"
-    ).order_by(models.Match.date.desc()).limit(5).all()
-    
-    home_recent_wins = sum(1 for m in home_recent_matches if m.winner_id == match.home_team_id)
-    away_recent_wins = sum(1 for m in away_recent_matches if m.winner_id == match.away_team_id)
+    # Form, head-to-head, venue records and key players from the feature store
+    features = feature_store.get_match_features(db, match.home_team_id, match.away_team_id, match.venue)
     
-    # Get venue stats
-    venue_matches = db.query(models.Match).filter(
-        models.Match.venue == match.venue,
-        models.Match.match_status == "Completed"
-    ).all()
-    
-    home_venue_matches = [m for m in venue_matches if m.home_team_id == match.home_team_id]
-    home_venue_wins = sum(1 for m in home_venue_matches if m.winner_id == match.home_team_id)
-    
-    away_venue_matches = [m for m in venue_matches if m.home_team_id == match.away_team_id]
-    away_venue_wins = sum(1 for m in away_venue_matches if m.winner_id == match.away_team_id)
+    # Win probability from the trained model, batched over all scheduled matches
+    model_probability = match_model.scheduled_win_probabilities(db).get(match.id)
     
-    # Get toss stats
-    toss_win_match_win = sum(1 for m in venue_matches if m.toss_winner_id == m.winner_id)
-    toss_win_match_win_pct = toss_win_match_win / len(venue_matches) if venue_matches else 0.5
+    # Projected totals from the ball-by-ball innings simulator
+    projection = _fixture_projections(db, [match])[0]
     
-    # Calculate win probabilities
-    # This is a simplified model - in a real application, you'd use more features and proper ML
-    
-    # Base probability from team standings
-    home_points = home_team.points
-    away_points = away_team.points
-    total_points = home_points + away_points
-    
-    home_base_prob = home_points / total_points if total_points > 0 else 0.5
-    away_base_prob = away_points / total_points if total_points > 0 else 0.5
+    return _predict_from_features(match, home_team, away_team, features, model_probability, projection)
+
+async def predict_matches(db: Session, match_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+    """
+    Predict outcomes for many upcoming matches at once
     
-    # Adjust for head-to-head
-    total_h2h = home_wins + away_wins
-    h2h_factor = 0.2  # Weight for head-to-head
+    Teams, feature-store rows and model probabilities are loaded once for the
+    whole batch rather than once per match.
     
-    if total_h2h > 0:
-        home_prob = (1 - h2h_factor) * home_base_prob + h2h_factor * (home_wins / total_h2h)
-        away_prob = (1 - h2h_factor) * away_base_prob + h2h_factor * (away_wins / total_h2h)
+    Args:
+        db: Database session
+        match_ids: Matches to predict, every scheduled match if not given
+        
+    Returns:
+        Dictionary with one prediction per match, in schedule order
+        
+    Raises:
+        ValueError: If a requested match does not exist or is not scheduled
+    """
+    query = db.query(models.Match).options(
+        joinedload(models.Match.home_team),
+        joinedload(models.Match.away_team)
+    )
+    if match_ids is None:
+        matches = query.filter(models.Match.match_status == "Scheduled").order_by(models.Match.date, models.Match.id).all()
     else:
-        home_prob = home_base_prob
-        away_prob = away_base_prob
+        matches = query.filter(models.Match.id.in_(match_ids)).order_by(models.Match.date, models.Match.id).all()
+        found = {match.id: match for match in matches}
+        for match_id in match_ids:
+            if match_id not in found:
+                raise ValueError(f"Match {match_id} not found")
+            if found[match_id].match_status != "Scheduled":
+                raise ValueError(f"Predictions only available for scheduled matches, match {match_id} is not scheduled")
     
-    # Adjust for recent form
-    form_factor = 0.3  # Weight for recent form
-    
-    home_form = home_recent_wins / len(home_recent_matches) if home_recent_matches else 0.5
-    away_form = away_recent_wins / len(away_recent_matches) if away_recent_matches else 0.5
-    
-    home_prob = (1 - form_factor) * home_prob + form_factor * home_form
-    away_prob = (1 - form_factor) * away_prob + form_factor * away_form
+    matches = [match for match in matches if match.home_team and match.away_team]
+    fixture_features = feature_store.get_fixtures_features(
+        db, [(match.home_team_id, match.away_team_id, match.venue) for match in matches]
+    )
+    model_probabilities = match_model.scheduled_win_probabilities(db)
+    projections = _fixture_projections(db, matches)
     
-    # Adjust for venue advantage
-    venue_factor = 0.15  # Weight for venue advantage
+    return {
+        "predictions": [
+            _predict_from_features(
+                match, match.home_team, match.away_team, features, model_probabilities.get(match.id), projection
+            )
+            for match, features, projection in zip(matches, fixture_features, projections)
+        ]
+    }
+
+def _predict_from_features(
+    match: models.Match,
+    home_team: models.Team,
+    away_team: models.Team,
+    features: Dict[str, Any],
+    model_probability: Optional[float],
+    projection: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build a match prediction from feature-store features and the model probability
     
-    home_venue_win_rate = home_venue_wins / len(home_venue_matches) if home_venue_matches else 0.5
-    away_venue_win_rate = away_venue_wins / len(away_venue_matches) if away_venue_matches else 0.5
+    Args:
+        match: Match model
+        home_team: Home team model
+        away_team: Away team model
+        features: Fixture features from the feature store
+        model_probability: Home win probability from the trained model, None without a model
+        projection: Simulated totals from _project_fixtures, None without an innings simulator
+        
+    Returns:
+        Dictionary with prediction results
+    """
+    home_features, away_features = features["home"], features["away"]
     
-    home_prob = (1 - venue_factor) * home_prob + venue_factor * home_venue_win_rate
-    away_prob = (1 - venue_factor) * away_prob + venue_factor * away_venue_win_rate
+    # Head-to-head stats
+    home_wins = home_features["head_to_head_wins"]
+    away_wins = away_features["head_to_head_wins"]
+    head_to_head_matches = home_features["head_to_head_matches"]
     
-    # Normalize probabilities
-    total_prob = home_prob + away_prob
-    home_prob = home_prob / total_prob
-    away_prob = away_prob / total_prob
+    # Recent form (last 5 matches)
+    home_recent_matches = home_features["recent_matches"]
+    away_recent_matches = away_features["recent_matches"]
+    home_recent_wins = home_features["recent_wins"]
+    away_recent_wins = away_features["recent_wins"]
     
-    # Get key players
-    home_key_batsman = db.query(models.Player).join(
-        models.player_team_association
-    ).filter(
-        models.player_team_association.c.team_id == match.home_team_id
-    ).order_by(models.Player.runs.desc()).first()
+    # Venue stats
+    home_venue_matches = home_features["venue_matches"]
+    home_venue_wins = home_features["venue_wins"]
+    away_venue_matches = away_features["venue_matches"]
+    away_venue_wins = away_features["venue_wins"]
     
-    home_key_bowler = db.query(models.Player).join(
-        models.player_team_association
-    ).filter(
-        models.player_team_association.c.team_id == match.home_team_id
-    ).order_by(models.Player.wickets.desc()).first()
+    # Toss stats
+    toss_win_match_win_pct = features["toss_win_match_win_percentage"]
     
-    away_key_batsman = db.query(models.Player).join(
-        models.player_team_association
-    ).filter(
-        models.player_team_association.c.team_id == match.away_team_id
-    ).order_by(models.Player.runs.desc()).first()
+    if model_probability is not None:
+        home_prob = model_probability
+        away_prob = 1 - model_probability
+    else:
+        # No trained model yet, fall back to a weighted blend of the factors
+        
+        # Base probability from team standings
+        home_points = home_team.points
+        away_points = away_team.points
+        total_points = home_points + away_points
+        
+        home_base_prob = home_points / total_points if total_points > 0 else 0.5
+        away_base_prob = away_points / total_points if total_points > 0 else 0.5
+        
+        # Adjust for head-to-head
+        total_h2h = home_wins + away_wins
+        h2h_factor = 0.2  # Weight for head-to-head
+        
+        if total_h2h > 0:
+            home_prob = (1 - h2h_factor) * home_base_prob + h2h_factor * (home_wins / total_h2h)
+            away_prob = (1 - h2h_factor) * away_base_prob + h2h_factor * (away_wins / total_h2h)
+        else:
+            home_prob = home_base_prob
+            away_prob = away_base_prob
+        
+        # Adjust for recent form
+        form_factor = 0.3  # Weight for recent form
+        
+        home_form = home_recent_wins / home_recent_matches if home_recent_matches else 0.5
+        away_form = away_recent_wins / away_recent_matches if away_recent_matches else 0.5
+        
+        home_prob = (1 - form_factor) * home_prob + form_factor * home_form
+        away_prob = (1 - form_factor) * away_prob + form_factor * away_form
+        
+        # Adjust for venue advantage
+        venue_factor = 0.15  # Weight for venue advantage
+        
+        home_venue_win_rate = home_venue_wins / home_venue_matches if home_venue_matches else 0.5
+        away_venue_win_rate = away_venue_wins / away_venue_matches if away_venue_matches else 0.5
+        
+        home_prob = (1 - venue_factor) * home_prob + venue_factor * home_venue_win_rate
+        away_prob = (1 - venue_factor) * away_prob + venue_factor * away_venue_win_rate
+        
+        # Normalize probabilities
+        total_prob = home_prob + away_prob
+        home_prob = home_prob / total_prob
+        away_prob = away_prob / total_prob
     
-    away_key_bowler = db.query(models.Player).join(
-        models.player_team_association
-    ).filter(
-        models.player_team_association.c.team_id == match.away_team_id
-    ).order_by(models.Player.wickets.desc()).first()
+    # Key players
+    home_key_batsman = home_features["key_batsman"]
+    home_key_bowler = home_features["key_bowler"]
+    away_key_batsman = away_features["key_batsman"]
+    away_key_bowler = away_features["key_bowler"]
     
     return {
         "match": {
@@ -159,29 +233,34 @@ async def predict_match_outcome(match: models.Match, db: Session) -> Dict[str, A
                 "win_probability": away_prob
             }
         },
+        "model": {
+            "name": match_model.MODEL_NAME,
+            "version": match_model.get_active_model().version
+        } if model_probability is not None else None,
+        "projection": projection,
         "factors": {
             "head_to_head": {
-                "total_matches": len(historical_matches),
+                "total_matches": head_to_head_matches,
                 "home_wins": home_wins,
                 "away_wins": away_wins
             },
             "recent_form": {
                 "home": {
-                    "matches": len(home_recent_matches),
+                    "matches": home_recent_matches,
                     "wins": home_recent_wins
                 },
                 "away": {
-                    "matches": len(away_recent_matches),
+                    "matches": away_recent_matches,
                     "wins": away_recent_wins
                 }
             },
             "venue_advantage": {
                 "home": {
-                    "matches": len(home_venue_matches),
+                    "matches": home_venue_matches,
                     "wins": home_venue_wins
                 },
                 "away": {
-                    "matches": len(away_venue_matches),
+                    "matches": away_venue_matches,
                     "wins": away_venue_wins
                 },
                 "toss_win_match_win_percentage": toss_win_match_win_pct
@@ -223,97 +302,307 @@ async def predict_match_outcome(match: models.Match, db: Session) -> Dict[str, A
         }
     }
 
-async def predict_playoff_chances(db: Session) -> Dict[str, Any]:
+def _batting_first_team_id(match: models.Match) -> Optional[int]:
+    """Infer which side batted first from the result, falling back to the toss"""
+    if match.winner_id and match.win_type == "Runs":
+        return match.winner_id
+    if match.winner_id and match.win_type == "Wickets":
+        return match.away_team_id if match.winner_id == match.home_team_id else match.home_team_id
+    if match.toss_winner_id and match.toss_decision:
+        if match.toss_decision.lower() == "bat":
+            return match.toss_winner_id
+        return match.away_team_id if match.toss_winner_id == match.home_team_id else match.home_team_id
+    return None
+
+def _fit_innings_model(db: Session, team_index: Dict[int, int]) -> season_simulator.InningsModel:
     """
-    Predict playoff chances for all teams
+    Fit the simulator's innings model to completed matches with stored scores
+    
+    Matches whose first innings ended short of its overs without being bowled out
+    were shortened by the weather, and are left out so that their totals don't drag
+    down the fitted full-length totals.
     
     Args:
         db: Database session
+        team_index: Position of each team ID in the engine arrays
         
     Returns:
-        Dictionary with prediction results
+        Fitted innings model
+    """
+    completed_matches = db.query(models.Match).filter(
+        models.Match.match_status == "Completed",
+        models.Match.first_innings_score.isnot(None),
+        models.Match.second_innings_score.isnot(None),
+        models.Match.second_innings_overs.isnot(None)
+    ).all()
+    
+    batting_first, bowling_first, venues = [], [], []
+    first_scores, second_scores, second_overs, batting_first_won = [], [], [], []
+    for match in completed_matches:
+        batting_first_id = _batting_first_team_id(match)
+        if batting_first_id is None or match.home_team_id not in team_index or match.away_team_id not in team_index:
+            continue
+        if (
+            match.first_innings_overs is not None
+            and season_simulator.overs_to_decimal(match.first_innings_overs) < season_simulator.OVERS_PER_INNINGS
+            and (match.first_innings_wickets or 0) < 10
+        ):
+            continue
+        bowling_first_id = match.away_team_id if batting_first_id == match.home_team_id else match.home_team_id
+        batting_first.append(team_index[batting_first_id])
+        bowling_first.append(team_index[bowling_first_id])
+        venues.append(match.venue or "")
+        first_scores.append(match.first_innings_score)
+        second_scores.append(match.second_innings_score)
+        second_overs.append(season_simulator.overs_to_decimal(match.second_innings_overs))
+        batting_first_won.append(match.winner_id == batting_first_id)
+    
+    return season_simulator.fit_innings_model(
+        len(team_index), batting_first, bowling_first, venues,
+        first_scores, second_scores, second_overs, batting_first_won
+    )
+
+def _run_factor_model(db: Session) -> Tuple[season_simulator.InningsModel, Dict[int, int]]:
+    """Innings model for run factors, with the position of each team ID in its arrays"""
+    team_ids = tuple(team_id for (team_id,) in db.query(models.Team.id).all())
+    key = (team_ids, match_model.data_version(db))
+    if _run_factor_fit["key"] != key:
+        team_index = {team_id: i for i, team_id in enumerate(team_ids)}
+        _run_factor_fit["fit"] = (_fit_innings_model(db, team_index), team_index)
+        _run_factor_fit["key"] = key
+    return _run_factor_fit["fit"]
+
+def _run_factor(
+    innings_model: season_simulator.InningsModel,
+    team_index: Dict[int, int],
+    batting_team_id: Optional[int],
+    bowling_team_id: Optional[int],
+    venue: Optional[str]
+) -> float:
+    """Expected total of a matchup relative to the league mean, for the innings simulator"""
+    expected = innings_model.mean + innings_model.venues.get(venue or "", 0.0)
+    if batting_team_id in team_index:
+        expected += innings_model.batting[team_index[batting_team_id]]
+    if bowling_team_id in team_index:
+        expected += innings_model.bowling[team_index[bowling_team_id]]
+    return expected / innings_model.mean
+
+def _project_fixtures(db: Session, matches: List[models.Match]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Simulate every fixture ball by ball, all fixtures in one batch of innings
+    
+    Half of each fixture's simulations have the home side batting first. Team and
+    venue strengths enter through the run factors of the simulated innings.
+    
+    Args:
+        db: Database session
+        matches: Fixtures to project
+        
+    Returns:
+        Projected first-innings totals of each side and the simulated home win
+        probability, per fixture, or None for every fixture without an innings simulator
+    """
+    transitions = innings_simulator.get_model()
+    if transitions is None or not matches:
+        return [None] * len(matches)
+    
+    innings_model, team_index = _run_factor_model(db)
+    per_order = FIXTURE_SIMULATIONS // 2
+    home_factors = np.array([
+        _run_factor(innings_model, team_index, match.home_team_id, match.away_team_id, match.venue) for match in matches
+    ])
+    away_factors = np.array([
+        _run_factor(innings_model, team_index, match.away_team_id, match.home_team_id, match.venue) for match in matches
+    ])
+    
+    # Innings laid out as (fixture, batting order, simulation)
+    first_factors = np.repeat(np.stack([home_factors, away_factors], axis=1), per_order)
+    second_factors = np.repeat(np.stack([away_factors, home_factors], axis=1), per_order)
+    rng = np.random.default_rng([match.id for match in matches])
+    first, second = innings_simulator.simulate_matches(transitions, first_factors, second_factors, rng)
+    
+    shape = (len(matches), 2, per_order)
+    first_runs = first.runs.reshape(shape)
+    second_runs = second.runs.reshape(shape)
+    chase_result = np.where(second_runs > first_runs, 1.0, np.where(second_runs == first_runs, 0.5, 0.0))
+    home_wins = np.concatenate([1 - chase_result[:, 0], chase_result[:, 1]], axis=1)
+    
+    return [
+        {
+            "simulations": 2 * per_order,
+            "home_win_probability": float(home_wins[i].mean()),
+            "home": {
+                "mean_total": float(first_runs[i, 0].mean()),
+                "percentiles": innings_simulator.percentiles(first_runs[i, 0])
+            },
+            "away": {
+                "mean_total": float(first_runs[i, 1].mean()),
+                "percentiles": innings_simulator.percentiles(first_runs[i, 1])
+            }
+        }
+        for i in range(len(matches))
+    ]
+
+def _fixture_projections(db: Session, matches: List[models.Match]) -> List[Optional[Dict[str, Any]]]:
+    """
+    Projections of the given fixtures, simulating all scheduled matches at once
+    
+    The projections are reused until the simulator or the matches change, so
+    single and batch predictions agree and repeated requests cost no simulation.
+    
+    Args:
+        db: Database session
+        matches: Fixtures to project
+        
+    Returns:
+        Projection of each fixture, as returned by _project_fixtures
+    """
+    transitions = innings_simulator.get_model()
+    if transitions is None:
+        return [None] * len(matches)
+    
+    key = (id(transitions), match_model.data_version(db))
+    if _scheduled_projections["key"] != key:
+        scheduled = db.query(models.Match).filter(
+            models.Match.match_status == "Scheduled"
+        ).order_by(models.Match.date, models.Match.id).all()
+        _scheduled_projections["key"] = key
+        _scheduled_projections["projections"] = dict(zip(
+            [match.id for match in scheduled], _project_fixtures(db, scheduled)
+        ))
+    
+    projections = _scheduled_projections["projections"]
+    return [projections.get(match.id) or _project_fixtures(db, [match])[0] for match in matches]
+
+def _load_season_state(db: Session) -> Dict[str, Any]:
+    """
+    Load current standings and remaining fixtures as arrays for the season engines
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Dictionary with teams, remaining fixtures, table arrays and the simulator season
     """
     # Get all teams
     teams = db.query(models.Team).all()
+    team_index = {team.id: i for i, team in enumerate(teams)}
     
-    # Get remaining matches
+    # Get remaining matches in schedule order, skipping matches with unknown teams
     remaining_matches = db.query(models.Match).filter(
         models.Match.match_status == "Scheduled"
-    ).all()
+    ).order_by(models.Match.date, models.Match.id).all()
     
-    # Get completed matches
-    completed_matches = db.query(models.Match).filter(
-        models.Match.match_status == "Completed"
-    ).all()
+    fixtures = [
+        match for match in remaining_matches
+        if match.home_team_id in team_index and match.away_team_id in team_index
+    ]
     
-    # Calculate current standings
-    standings = {}
-    for team in teams:
-        standings[team.id] = {
-            "team": {
-                "id": team.id,
-                "name": team.name,
-                "short_name": team.short_name
-            },
-            "points": team.points,
-            "matches_played": team.matches_played,
-            "matches_won": team.matches_won,
-            "net_run_rate": team.net_run_rate,
-            "remaining_matches": sum(1 for m in remaining_matches if m.home_team_id == team.id or m.away_team_id == team.id),
-            "max_possible_points": team.points + (sum(1 for m in remaining_matches if m.home_team_id == team.id or m.away_team_id == team.id) * 2)
-        }
+    points = np.array([team.points or 0 for team in teams], dtype=float)
+    nrr = np.array([team.net_run_rate or 0.0 for team in teams], dtype=float)
+    home_idx = np.array([team_index[match.home_team_id] for match in fixtures], dtype=int)
+    away_idx = np.array([team_index[match.away_team_id] for match in fixtures], dtype=int)
     
-    # Sort by current points and NRR
-    sorted_standings = sorted(
-        standings.values(),
-        key=lambda x: (x["points"], x["net_run_rate"]),
-        reverse=True
+    season = season_simulator.build_season(
+        points,
+        nrr,
+        np.array([team.matches_played or 0 for team in teams], dtype=float),
+        home_idx,
+        away_idx,
+        [match.venue or "" for match in fixtures],
+        _fit_innings_model(db, team_index)
     )
     
-    # Calculate playoff cutoff (typically 4 teams make playoffs)
-    current_playoff_cutoff = sorted_standings[3]["points"] if len(sorted_standings) > 3 else 0
-    
-    # Calculate playoff scenarios
-    playoff_chances = {}
-    for team_id, team_standing in standings.items():
-        # Teams that have already qualified
-        if team_standing["points"] > current_playoff_cutoff + (team_standing["remaining_matches"] * 2):
-            playoff_chances[team_id] = 1.0
-            continue
-            
-        # Teams that are already eliminated
-        if team_standing["max_possible_points"] < current_playoff_cutoff:
-            playoff_chances[team_id] = 0.0
-            continue
+    return {
+        "teams": teams,
+        "fixtures": fixtures,
+        "points": points,
+        "nrr": nrr,
+        "home_idx": home_idx,
+        "away_idx": away_idx,
+        "season": season
+    }
+
+def _season_fingerprint(db: Session) -> str:
+    """
+    Hash of the standings, remaining fixtures and completed matches a season state is built from
+    
+    Only cheap summary queries are made, so a cached result can be looked up
+    without loading the season state or fitting the innings model.
+    
+    Args:
+        db: Database session
         
-        # For teams in contention, use a simple model based on current points and remaining matches
-        # In a real application, you'd simulate remaining matches with proper win probabilities
-        points_needed = current_playoff_cutoff + 2 - team_standing["points"]  # Add 2 to be safe
-        wins_needed = (points_needed + 1) // 2  # Ceiling division
+    Returns:
+        Fingerprint for season result cache keys
+    """
+    summary = (
+        [tuple(row) for row in db.query(
+            models.Team.id, models.Team.points, models.Team.net_run_rate, models.Team.matches_played
+        ).order_by(models.Team.id).all()],
+        [tuple(row) for row in db.query(models.Match.id, models.Match.updated_at).filter(
+            models.Match.match_status == "Scheduled"
+        ).order_by(models.Match.date, models.Match.id).all()],
+        match_model.data_version(db)
+    )
+    return hashlib.sha256(repr(summary).encode()).hexdigest()
+
+async def predict_playoff_chances(db: Session) -> Dict[str, Any]:
+    """
+    Predict playoff chances for all teams
+    
+    Qualification and top-two probabilities are exact over the joint outcomes of
+    the remaining fixtures, falling back to sampling for very large schedules.
+    
+    Args:
+        db: Database session
         
-        if wins_needed > team_standing["remaining_matches"]:
-            playoff_chances[team_id] = 0.0
-        else:
-            # Simple probability model: chance of winning exactly wins_needed out of remaining_matches
-            # This is a binomial probability with p=0.5 (assuming equal chance of winning each match)
-            remaining = team_standing["remaining_matches"]
-            needed = wins_needed
-            
-            # Use team's win rate as probability instead of 0.5
-            win_rate = team_standing["matches_won"] / team_standing["matches_played"] if team_standing["matches_played"] > 0 else 0.5
-            
-            # Calculate probability of winning at least wins_needed matches
-            prob = 0
-            for i in range(needed, remaining + 1):
-                # Binomial probability: nCr * p^r * (1-p)^(n-r)
-                n_choose_r = np.math.factorial(remaining) / (np.math.factorial(i) * np.math.factorial(remaining - i))
-                prob += n_choose_r * (win_rate ** i) * ((1 - win_rate) ** (remaining - i))
-            
-            playoff_chances[team_id] = prob
+    Returns:
+        Dictionary with prediction results
+    """
+    return await result_cache.get_or_compute(
+        result_cache.cache_key("playoffs", _season_fingerprint(db)),
+        partial(_compute_playoff_chances, db)
+    )
+
+async def _compute_playoff_chances(db: Session) -> Dict[str, Any]:
+    """
+    Load the season state and compute playoff chances from it
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Dictionary with prediction results
+    """
+    state = _load_season_state(db)
+    teams = state["teams"]
+    points, nrr = state["points"], state["nrr"]
+    home_idx, away_idx = state["home_idx"], state["away_idx"]
+    
+    # Per-match win probabilities from current standings
+    home_probs = season_simulator.home_win_probability(
+        points[home_idx] + nrr[home_idx],
+        points[away_idx] + nrr[away_idx]
+    )
+    
+    qualify, top_two, method = playoff_odds.qualification_probabilities(
+        points, nrr, home_idx, away_idx, home_probs
+    )
+    
+    remaining = np.bincount(np.concatenate((home_idx, away_idx)), minlength=len(teams))
+    
+    # Calculate playoff cutoff (typically 4 teams make playoffs)
+    sorted_points = sorted(
+        zip(points, nrr),
+        reverse=True
+    )
+    current_playoff_cutoff = int(sorted_points[3][0]) if len(sorted_points) > 3 else 0
     
     # Format results
     results = []
-    for team in teams:
+    for i, team in enumerate(teams):
+        playoff_chance = float(qualify[i])
         results.append({
             "team": {
                 "id": team.id,
@@ -321,11 +610,12 @@ async def predict_playoff_chances(db: Session) -> Dict[str, Any]:
                 "short_name": team.short_name
             },
             "current_points": team.points,
-            "max_possible_points": standings[team.id]["max_possible_points"],
-            "remaining_matches": standings[team.id]["remaining_matches"],
-            "playoff_chance": playoff_chances.get(team.id, 0.0),
-            "status": "Qualified" if playoff_chances.get(team.id, 0.0) >= 0.99 else
-                     "Eliminated" if playoff_chances.get(team.id, 0.0) <= 0.01 else
+            "max_possible_points": (team.points or 0) + int(remaining[i]) * 2,
+            "remaining_matches": int(remaining[i]),
+            "playoff_chance": playoff_chance,
+            "top_two_chance": float(top_two[i]),
+            "status": "Qualified" if playoff_chance >= 0.99 else
+                     "Eliminated" if playoff_chance <= 0.01 else
                      "In Contention"
         })
     
@@ -334,113 +624,73 @@ async def predict_playoff_chances(db: Session) -> Dict[str, Any]:
     
     return {
         "playoff_cutoff": current_playoff_cutoff,
+        "method": method,
         "teams": results
     }
 
-async def simulate_season(simulations: int, db: Session) -> Dict[str, Any]:
+async def simulate_season(
+    simulations: int,
+    db: Session,
+    workers: int = 1,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
     """
     Simulate the remainder of the season
     
+    Results are cached per standings, remaining fixtures and parameters, so an
+    unseeded request returns the seed of the cached run. Concurrent identical
+    requests share a single computation.
+    
     Args:
         simulations: Number of simulations to run
         db: Database session
+        workers: Number of worker processes to spread the simulations over
+        seed: Seed for reproducible results, random if not given
         
     Returns:
         Dictionary with simulation results
     """
-    # Get all teams
-    teams = db.query(models.Team).all()
-    team_dict = {team.id: team for team in teams}
-    
-    # Get remaining matches
-    remaining_matches = db.query(models.Match).filter(
-        models.Match.match_status == "Scheduled"
-    ).all()
+    # Worker count does not change seeded results, so it is left out of the key
+    return await result_cache.get_or_compute(
+        result_cache.cache_key("simulate-season", _season_fingerprint(db), simulations=simulations, seed=seed),
+        partial(_compute_season_simulation, db, simulations, workers, seed)
+    )
+
+async def _compute_season_simulation(
+    db: Session,
+    simulations: int,
+    workers: int,
+    seed: Optional[int]
+) -> Dict[str, Any]:
+    """
+    Load the season state and run the season simulations for it
     
-    # Initialize counters for playoff appearances and championships
-    playoff_appearances = {team.id: 0 for team in teams}
-    championships = {team.id: 0 for team in teams}
-    
-    # Run simulations
-    for _ in range(simulations):
-        # Copy current standings
-        sim_standings = {}
-        for team in teams:
-            sim_standings[team.id] = {
-                "points": team.points,
-                "net_run_rate": team.net_run_rate
-            }
+    Args:
+        db: Database session
+        simulations: Number of simulations to run
+        workers: Number of worker processes to spread the simulations over
+        seed: Seed for reproducible results, random if not given
         
-        # Simulate remaining matches
-        for match in remaining_matches:
-            home_team = team_dict.get(match.home_team_id)
-            away_team = team_dict.get(match.away_team_id)
-            
-            if not home_team or not away_team:
-                continue
-                
-            # Simple win probability model based on current points and NRR
-            home_strength = sim_standings[home_team.id]["points"] + sim_standings[home_team.id]["net_run_rate"]
-            away_strength = sim_standings[away_team.id]["points"] + sim_standings[away_team.id]["net_run_rate"]
-            
-            total_strength = home_strength + away_strength
-            home_win_prob = home_strength / total_strength if total_strength > 0 else 0.5
-            
-            # Add home advantage
-            home_win_prob = min(max(home_win_prob + 0.1, 0.2), 0.8)
-            
-            # Simulate match outcome
-            if np.random.random() < home_win_prob:
-                # Home team wins
-                sim_standings[home_team.id]["points"] += 2
-                # Adjust NRR slightly
-                sim_standings[home_team.id]["net_run_rate"] += np.random.uniform(0.05, 0.2)
-                sim_standings[away_team.id]["net_run_rate"] -= np.random.uniform(0.05, 0.2)
-            else:
-                # Away team wins
-                sim_standings[away_team.id]["points"] += 2
-                # Adjust NRR slightly
-                sim_standings[away_team.id]["net_run_rate"] += np.random.uniform(0.05, 0.2)
-                sim_standings[home_team.id]["net_run_rate"] -= np.random.uniform(0.05, 0.2)
-        
-        # Determine playoff teams (top 4)
-        playoff_teams = sorted(
-            sim_standings.items(),
-            key=lambda x: (x[1]["points"], x[1]["net_run_rate"]),
-            reverse=True
-        )[:4]
-        
-        for team_id, _ in playoff_teams:
-            playoff_appearances[team_id] += 1
-        
-        # Simulate playoffs (simplified)
-        # Qualifier 1: 1st vs 2nd
-        # Eliminator: 3rd vs 4th
-        # Qualifier 2: Loser of Q1 vs Winner of Eliminator
-        # Final: Winner of Q1 vs Winner of Q2
-        
-        team1_id = playoff_teams[0][0]
-        team2_id = playoff_teams[1][0]
-        team3_id = playoff_teams[2][0]
-        team4_id = playoff_teams[3][0]
-        
-        # Qualifier 1
-        q1_winner = simulate_match(team1_id, team2_id, sim_standings)
-        q1_loser = team1_id if q1_winner == team2_id else team2_id
-        
-        # Eliminator
-        eliminator_winner = simulate_match(team3_id, team4_id, sim_standings)
-        
-        # Qualifier 2
-        q2_winner = simulate_match(q1_loser, eliminator_winner, sim_standings)
-        
-        # Final
-        champion = simulate_match(q1_winner, q2_winner, sim_standings)
-        championships[champion] += 1
+    Returns:
+        Dictionary with simulation results
+    """
+    state = _load_season_state(db)
+    teams = state["teams"]
+    
+    # Run all simulations as array operations, off the event loop
+    loop = asyncio.get_running_loop()
+    playoff_counts, championship_counts, seed = await loop.run_in_executor(
+        None,
+        partial(
+            season_simulator.run_parallel_simulations,
+            state["season"], simulations,
+            workers=workers, seed=seed
+        )
+    )
     
     # Calculate percentages
-    playoff_percentages = {team_id: count / simulations * 100 for team_id, count in playoff_appearances.items()}
-    championship_percentages = {team_id: count / simulations * 100 for team_id, count in championships.items()}
+    playoff_percentages = {team.id: float(playoff_counts[i]) / simulations * 100 for i, team in enumerate(teams)}
+    championship_percentages = {team.id: float(championship_counts[i]) / simulations * 100 for i, team in enumerate(teams)}
     
     # Format results
     results = []
@@ -460,9 +710,93 @@ async def simulate_season(simulations: int, db: Session) -> Dict[str, Any]:
     
     return {
         "simulations": simulations,
+        "seed": seed,
         "teams": results
     }
 
+def stream_season_simulation(
+    db: Session,
+    tolerance: float = 0.02,
+    max_simulations: int = 100000,
+    seed: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Simulate the remainder of the season until the estimates are precise enough,
+    yielding the running estimates after every batch
+    
+    The season state is loaded before returning, so the stream does not use the
+    session once the response has started.
+    
+    Args:
+        db: Database session
+        tolerance: Largest acceptable width of any 95% interval, as a probability
+        max_simulations: Upper bound on the number of simulations
+        seed: Seed for reproducible results, random if not given
+        
+    Returns:
+        Async iterator of partial simulation results with Wilson confidence
+        intervals, the last one has done set
+    """
+    state = _load_season_state(db)
+    seed = seed if seed is not None else secrets.randbits(32)
+    return _stream_simulation(state, tolerance, max_simulations, seed)
+
+async def _stream_simulation(
+    state: Dict[str, Any],
+    tolerance: float,
+    max_simulations: int,
+    seed: int
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run adaptive season simulation batches for a loaded season state
+    
+    Args:
+        state: Season state from _load_season_state
+        tolerance: Largest acceptable width of any 95% interval, as a probability
+        max_simulations: Upper bound on the number of simulations
+        seed: Seed of the simulations
+        
+    Yields:
+        Partial simulation results, the last one has done set
+    """
+    teams = state["teams"]
+    batches = season_simulator.iter_adaptive_simulations(state["season"], tolerance, max_simulations, seed)
+    
+    loop = asyncio.get_running_loop()
+    while True:
+        # Each batch runs off the event loop
+        progress = await loop.run_in_executor(None, next, batches, None)
+        if progress is None:
+            return
+        
+        simulations = progress.simulations
+        playoff_low, playoff_high = season_simulator.wilson_interval(progress.playoff_counts, simulations)
+        championship_low, championship_high = season_simulator.wilson_interval(progress.championship_counts, simulations)
+        
+        results = []
+        for i, team in enumerate(teams):
+            results.append({
+                "team": {
+                    "id": team.id,
+                    "name": team.name,
+                    "short_name": team.short_name
+                },
+                "playoff_percentage": float(progress.playoff_counts[i]) / simulations * 100,
+                "championship_percentage": float(progress.championship_counts[i]) / simulations * 100,
+                "playoff_interval": [float(playoff_low[i]) * 100, float(playoff_high[i]) * 100],
+                "championship_interval": [float(championship_low[i]) * 100, float(championship_high[i]) * 100]
+            })
+        results.sort(key=lambda x: x["championship_percentage"], reverse=True)
+        
+        yield {
+            "simulations": simulations,
+            "seed": seed,
+            "tolerance": tolerance,
+            "converged": progress.converged,
+            "done": progress.converged or simulations >= max_simulations,
+            "teams": results
+        }
+
 def simulate_match(team1_id: int, team2_id: int, standings: Dict[int, Dict[str, float]]) -> int:
     """
     Simulate a match between two teams
@@ -489,7 +823,9 @@ def simulate_match(team1_id: int, team2_id: int, standings: Dict[int, Dict[str,
 async def predict_player_performance(
     player: models.Player, 
     match: Optional[models.Match] = None,
-    db: Session = None
+    db: Session = None,
+    noise: bool = False,
+    seed: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Predict performance for a player
@@ -498,129 +834,553 @@ async def predict_player_performance(
         player: Player model
         match: Optional match model for context-specific prediction
         db: Database session
+        noise: Whether to add random variation to the predicted runs and wickets
+        seed: Seed of the noise, random if not given
         
     Returns:
         Dictionary with prediction results
     """
-    # Get player's recent performances
-    batting_performances = db.query(models.BattingPerformance).filter(
-        models.BattingPerformance.player_id == player.id
-    ).order_by(models.BattingPerformance.id.desc()).limit(10).all()
-    
-    bowling_performances = db.query(models.BowlingPerformance).filter(
-        models.BowlingPerformance.player_id == player.id
-    ).order_by(models.BowlingPerformance.id.desc()).limit(10).all()
-    
-    # Calculate average recent performance
-    recent_runs = [perf.runs for perf in batting_performances]
-    recent_balls_faced = [perf.balls_faced for perf in batting_performances]
-    recent_wickets = [perf.wickets for perf in bowling_performances]
-    recent_economy = [perf.economy_rate for perf in bowling_performances]
-    
-    avg_runs = sum(recent_runs) / len(recent_runs) if recent_runs else player.batting_average
-    avg_balls_faced = sum(recent_balls_faced) / len(recent_balls_faced) if recent_balls_faced else 20
-    avg_wickets = sum(recent_wickets) / len(recent_wickets) if recent_wickets else player.wickets / player.matches if player.matches > 0 else 1
-    avg_economy = sum(recent_economy) / len(recent_economy) if recent_economy else player.economy_rate
-    
-    # Base prediction on recent averages
-    predicted_runs = avg_runs
-    predicted_balls_faced = avg_balls_faced
-    predicted_strike_rate = (predicted_runs / predicted_balls_faced * 100) if predicted_balls_faced > 0 else player.strike_rate
-    predicted_wickets = avg_wickets
-    predicted_economy = avg_economy
-    
-    # Adjust for match context if provided
+    team_id = player.teams[0].id if player.teams else None
+    if noise and seed is None:
+        seed = secrets.randbits(32)
+    return _predict_players(db, [(team_id, player)], match, noise, seed)[0]
+
+async def predict_squads(
+    db: Session,
+    match: models.Match,
+    noise: bool = False,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Predict performance for every player of both teams in a match
+    
+    Predictions are deterministic for given noise settings, and cached until
+    players, performances or matches change. Noisy predictions without a seed
+    get a fresh one and are not cached, since no later request can ask for it.
+    
+    Args:
+        db: Database session
+        match: Match model
+        noise: Whether to add random variation to the predicted runs and wickets
+        seed: Seed of the noise, random if not given
+        
+    Returns:
+        Dictionary with the predictions of each squad and the seed used
+    """
+    seed_generated = noise and seed is None
+    if seed_generated:
+        seed = secrets.randbits(32)
+    
+    async def compute() -> Dict[str, Any]:
+        squads = db.query(models.player_team_association.c.team_id, models.Player).join(
+            models.Player, models.Player.id == models.player_team_association.c.player_id
+        ).filter(
+            models.player_team_association.c.team_id.in_([match.home_team_id, match.away_team_id])
+        ).order_by(models.Player.name).all()
+        
+        predictions = _predict_players(db, squads, match, noise, seed)
+        return {
+            "match": {
+                "id": match.id,
+                "venue": match.venue,
+                "date": match.date.isoformat() if match.date else None
+            },
+            "home": [
+                prediction for (team_id, _), prediction in zip(squads, predictions) if team_id == match.home_team_id
+            ],
+            "away": [
+                prediction for (team_id, _), prediction in zip(squads, predictions) if team_id == match.away_team_id
+            ],
+            "noise": noise,
+            "seed": seed
+        }
+    
+    if seed_generated:
+        return await compute()
+    
+    key = result_cache.cache_key(
+        "squad-predictions", _player_data_fingerprint(db), match_id=match.id, noise=noise, seed=seed
+    )
+    return await result_cache.get_or_compute(key, compute)
+
+def _player_data_fingerprint(db: Session) -> str:
+    """Hash of summaries of the tables player predictions are computed from"""
+    summary = (
+        match_model.data_version(db),
+        db.query(func.count(models.Player.id), func.max(models.Player.updated_at)).one(),
+        db.query(func.count(models.BattingPerformance.id), func.max(models.BattingPerformance.id)).one(),
+        db.query(func.count(models.BowlingPerformance.id), func.max(models.BowlingPerformance.id)).one(),
+        innings_simulator.get_model() is not None
+    )
+    return hashlib.sha256(repr(summary).encode()).hexdigest()
+
+def _recent_performances(db: Session, model: Any, player_ids: List[int]) -> Dict[int, List[Any]]:
+    """
+    Latest RECENT_PERFORMANCES performances of each player, with innings and match loaded
+    
+    Args:
+        db: Database session
+        model: BattingPerformance or BowlingPerformance
+        player_ids: Players to load
+        
+    Returns:
+        Dictionary mapping player ID to performances, most recent first
+    """
+    ranked = db.query(
+        model.id,
+        func.row_number().over(partition_by=model.player_id, order_by=model.id.desc()).label("position")
+    ).filter(model.player_id.in_(player_ids)).subquery()
+    
+    performances = db.query(model).join(ranked, ranked.c.id == model.id).filter(
+        ranked.c.position <= RECENT_PERFORMANCES
+    ).options(
+        joinedload(model.innings).joinedload(models.Innings.match)
+    ).order_by(model.id.desc()).all()
+    
+    by_player: Dict[int, List[Any]] = {player_id: [] for player_id in player_ids}
+    for perf in performances:
+        by_player[perf.player_id].append(perf)
+    return by_player
+
+def _performance_frame(performances: Dict[int, List[Any]], value: str, opponent: str) -> pd.DataFrame:
+    """One row per performance with its value, venue and opposing team"""
+    return pd.DataFrame(
+        [
+            (
+                player_id,
+                getattr(perf, value),
+                perf.innings.match.venue if perf.innings and perf.innings.match else None,
+                getattr(perf.innings, opponent) if perf.innings else None
+            )
+            for player_id, player_performances in performances.items()
+            for perf in player_performances
+        ],
+        columns=["player_id", "value", "venue", "opponent"]
+    )
+
+def _context_averages(
+    frame: pd.DataFrame,
+    venue: Optional[str],
+    opposition: Dict[int, Optional[int]]
+) -> Tuple[pd.Series, pd.Series]:
+    """Per-player average at the venue and against the opposition, as grouped aggregates"""
+    if frame.empty:
+        return pd.Series(dtype=float), pd.Series(dtype=float)
+    at_venue = frame[frame["venue"].notna() & (frame["venue"] == venue)]
+    vs_opposition = frame[frame["opponent"].notna() & (frame["opponent"] == frame["player_id"].map(opposition))]
+    return (
+        at_venue.groupby("player_id")["value"].mean(),
+        vs_opposition.groupby("player_id")["value"].mean()
+    )
+
+def _predict_players(
+    db: Session,
+    entries: List[Tuple[Optional[int], models.Player]],
+    match: Optional[models.Match],
+    noise: bool,
+    seed: Optional[int]
+) -> List[Dict[str, Any]]:
+    """
+    Predict many players' performances with a fixed number of queries
+    
+    Recent performances are eager-loaded with their innings and matches for
+    all players at once, and the venue and opposition adjustments are grouped
+    aggregates over those performances.
+    
+    Args:
+        db: Database session
+        entries: (team ID, player) pairs, the team being the side the player plays for
+        match: Optional match model for context-specific prediction
+        noise: Whether to add random variation to the predicted runs and wickets
+        seed: Seed of the noise
+        
+    Returns:
+        Prediction of each player, in the same order
+    """
+    if not entries:
+        return []
+    
+    player_ids = [player.id for _, player in entries]
+    batting = _recent_performances(db, models.BattingPerformance, player_ids)
+    bowling = _recent_performances(db, models.BowlingPerformance, player_ids)
+    
+    # The opposition is whichever side of the match the player's team is not
+    opposition: Dict[int, Optional[int]] = {}
+    if match:
+        for team_id, player in entries:
+            opposition[player.id] = match.away_team_id if team_id == match.home_team_id else match.home_team_id
+    
+    venue_runs, opposition_runs = _context_averages(
+        _performance_frame(batting, "runs", "bowling_team_id"), match.venue if match else None, opposition
+    )
+    venue_wickets, opposition_wickets = _context_averages(
+        _performance_frame(bowling, "wickets", "batting_team_id"), match.venue if match else None, opposition
+    )
+    
+    innings_model, team_index = _run_factor_model(db) if innings_simulator.get_model() is not None else (None, {})
+    team_innings: Dict[Tuple[Any, ...], Tuple[innings_simulator.InningsSample, ...]] = {}
+    
+    predictions = []
+    for team_id, player in entries:
+        batting_performances = batting[player.id]
+        bowling_performances = bowling[player.id]
+        
+        # Calculate average recent performance
+        recent_runs = [perf.runs for perf in batting_performances]
+        recent_balls_faced = [perf.balls_faced for perf in batting_performances]
+        recent_wickets = [perf.wickets for perf in bowling_performances]
+        recent_economy = [perf.economy_rate for perf in bowling_performances]
+        
+        avg_runs = sum(recent_runs) / len(recent_runs) if recent_runs else player.batting_average
+        avg_balls_faced = sum(recent_balls_faced) / len(recent_balls_faced) if recent_balls_faced else 20
+        avg_wickets = sum(recent_wickets) / len(recent_wickets) if recent_wickets else player.wickets / player.matches if player.matches > 0 else 1
+        avg_economy = sum(recent_economy) / len(recent_economy) if recent_economy else player.economy_rate
+        
+        # Base prediction on recent averages
+        predicted_runs = avg_runs
+        predicted_balls_faced = avg_balls_faced
+        predicted_strike_rate = (predicted_runs / predicted_balls_faced * 100) if predicted_balls_faced > 0 else player.strike_rate
+        predicted_wickets = avg_wickets
+        predicted_economy = avg_economy
+        
+        # Adjust for venue and opposition if we have data
+        if match:
+            if player.id in venue_runs.index:
+                predicted_runs *= venue_runs[player.id] / avg_runs if avg_runs > 0 else 1
+            if player.id in venue_wickets.index:
+                predicted_wickets *= venue_wickets[player.id] / avg_wickets if avg_wickets > 0 else 1
+            if player.id in opposition_runs.index:
+                predicted_runs *= opposition_runs[player.id] / avg_runs if avg_runs > 0 else 1
+            if player.id in opposition_wickets.index:
+                predicted_wickets *= opposition_wickets[player.id] / avg_wickets if avg_wickets > 0 else 1
+        
+        # Run and wicket distributions from the ball-by-ball innings simulator
+        projection = _project_player(
+            innings_model, team_index, player, team_id, match,
+            batting_performances, bowling_performances, predicted_runs, predicted_wickets, team_innings
+        ) if innings_model is not None else None
+        
+        # Optional random variation, seeded per player so results are reproducible
+        if noise:
+            rng = np.random.default_rng([seed, player.id])
+            predicted_runs = max(0, rng.normal(predicted_runs, predicted_runs * 0.3))
+            predicted_wickets = max(0, rng.normal(predicted_wickets, 1))
+        
+        # Round to reasonable values
+        predicted_runs = round(predicted_runs)
+        predicted_balls_faced = round(predicted_balls_faced)
+        predicted_strike_rate = round(predicted_strike_rate, 1)
+        predicted_wickets = round(predicted_wickets, 1)
+        predicted_economy = round(predicted_economy, 1)
+        
+        predictions.append({
+            "player": {
+                "id": player.id,
+                "name": player.name,
+                "role": player.role
+            },
+            "match": {
+                "id": match.id,
+                "venue": match.venue,
+                "date": match.date.isoformat() if match.date else None,
+                "opposition": match.away_team.name if team_id == match.home_team_id else match.home_team.name
+            } if match else None,
+            "prediction": {
+                "batting": {
+                    "runs": predicted_runs,
+                    "balls_faced": predicted_balls_faced,
+                    "strike_rate": predicted_strike_rate,
+                    "boundary_percentage": round(player.fours + player.sixes) / player.balls_faced * 100 if player.balls_faced > 0 else 10
+                },
+                "bowling": {
+                    "wickets": predicted_wickets,
+                    "economy_rate": predicted_economy,
+                    "dot_ball_percentage": 100 - (predicted_economy * 100 / 6)  # Rough estimate
+                }
+            },
+            "projection": projection,
+            "confidence": {
+                "batting": min(len(recent_runs) / RECENT_PERFORMANCES, 1) * 100,
+                "bowling": min(len(recent_wickets) / RECENT_PERFORMANCES, 1) * 100
+            },
+            "seed": seed if noise else None
+        })
+    
+    return predictions
+
+def _project_player(
+    innings_model: season_simulator.InningsModel,
+    team_index: Dict[int, int],
+    player: models.Player,
+    team_id: Optional[int],
+    match: Optional[models.Match],
+    batting_performances: List[models.BattingPerformance],
+    bowling_performances: List[models.BowlingPerformance],
+    expected_runs: float,
+    expected_wickets: float,
+    team_innings: Dict[Tuple[Any, ...], Tuple[innings_simulator.InningsSample, ...]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Spread a player's expected runs and wickets over simulated team innings
+    
+    The player's team bats, and bowls at the opposition, in PLAYER_SIMULATIONS
+    simulated innings. The player's runs and wickets in each are the team's
+    total times the player's share of it. Shares are resampled from the
+    player's recent innings where recorded, and otherwise fixed to reproduce
+    the expected values on average.
+    
+    Args:
+        innings_model: Innings model for run factors
+        team_index: Position of each team ID in the innings model arrays
+        player: Player model
+        team_id: Team the player plays for
+        match: Optional match, for the opposition and venue
+        batting_performances: Recent batting performances of the player
+        bowling_performances: Recent bowling performances of the player
+        expected_runs: Expected runs before simulation
+        expected_wickets: Expected wickets before simulation
+        team_innings: Simulated team innings by matchup, shared across calls
+        
+    Returns:
+        Dictionary with team totals and player runs and wickets, mean and
+        percentiles, or None without an innings simulator or team
+    """
+    transitions = innings_simulator.get_model()
+    if transitions is None or team_id is None:
+        return None
+    
+    opposition_id, venue = None, None
     if match:
-        # Get venue stats
-        venue_batting_perfs = []
-        venue_bowling_perfs = []
-        
-        for perf in batting_performances:
-            innings = perf.innings
-            if innings and innings.match.venue == match.venue:
-                venue_batting_perfs.append(perf)
-        
-        for perf in bowling_performances:
-            innings = perf.innings
-            if innings and innings.match.venue == match.venue:
-                venue_bowling_perfs.append(perf)
-        
-        # Adjust for venue if we have data
-        if venue_batting_perfs:
-            venue_avg_runs = sum(perf.runs for perf in venue_batting_perfs) / len(venue_batting_perfs)
-            venue_factor = venue_avg_runs / avg_runs if avg_runs > 0 else 1
-            predicted_runs *= venue_factor
-        
-        if venue_bowling_perfs:
-            venue_avg_wickets = sum(perf.wickets for perf in venue_bowling_perfs) / len(venue_bowling_perfs)
-            venue_factor = venue_avg_wickets / avg_wickets if avg_wickets > 0 else 1
-            predicted_wickets *= venue_factor
-        
-        # Adjust for opposition
-        opposition_team_id = match.away_team_id if player.teams and player.teams[0].id == match.home_team_id else match.home_team_id
-        
-        opposition_batting_perfs = []
-        opposition_bowling_perfs = []
-        
-        for perf in batting_performances:
-            innings = perf.innings
-            if innings and innings.bowling_team_id == opposition_team_id:
-                opposition_batting_perfs.append(perf)
-        
-        for perf in bowling_performances:
-            innings = perf.innings
-            if innings and innings.batting_team_id == opposition_team_id:
-                opposition_bowling_perfs.append(perf)
-        
-        # Adjust for opposition if we have data
-        if opposition_batting_perfs:
-            opp_avg_runs = sum(perf.runs for perf in opposition_batting_perfs) / len(opposition_batting_perfs)
-            opp_factor = opp_avg_runs / avg_runs if avg_runs > 0 else 1
-            predicted_runs *= opp_factor
-        
-        if opposition_bowling_perfs:
-            opp_avg_wickets = sum(perf.wickets for perf in opposition_bowling_perfs) / len(opposition_bowling_perfs)
-            opp_factor = opp_avg_wickets / avg_wickets if avg_wickets > 0 else 1
-            predicted_wickets *= opp_factor
-    
-    # Add some randomness to predictions
-    predicted_runs = max(0, np.random.normal(predicted_runs, predicted_runs * 0.3))
-    predicted_wickets = max(0, np.random.normal(predicted_wickets, 1))
-    
-    # Round to reasonable values
-    predicted_runs = round(predicted_runs)
-    predicted_balls_faced = round(predicted_balls_faced)
-    predicted_strike_rate = round(predicted_strike_rate, 1)
-    predicted_wickets = round(predicted_wickets, 1)
-    predicted_economy = round(predicted_economy, 1)
+        opposition_id = match.away_team_id if team_id == match.home_team_id else match.home_team_id
+        venue = match.venue
+    
+    # Team innings are seeded by the matchup, so teammates share them
+    match_id = match.id if match else 0
+    key = (team_id, opposition_id, match_id)
+    if key not in team_innings:
+        team_rng = np.random.default_rng([team_id, opposition_id or 0, match_id])
+        team_innings[key] = tuple(
+            innings_simulator.simulate_innings(
+                transitions,
+                np.full(PLAYER_SIMULATIONS, _run_factor(innings_model, team_index, batting_id, bowling_id, venue)),
+                team_rng
+            )
+            for batting_id, bowling_id in ((team_id, opposition_id), (opposition_id, team_id))
+        )
+    batting, bowling = team_innings[key]
+    rng = np.random.default_rng([player.id, match_id])
+    
+    batting_innings = [perf for perf in batting_performances if perf.innings and perf.innings.total_runs]
+    bowling_innings = [perf for perf in bowling_performances if perf.innings and perf.innings.total_wickets]
+    if batting_innings:
+        run_share = rng.choice([perf.runs / perf.innings.total_runs for perf in batting_innings], PLAYER_SIMULATIONS)
+    else:
+        run_share = expected_runs / max(batting.runs.mean(), 1)
+    if bowling_innings:
+        wicket_share = rng.choice([perf.wickets / perf.innings.total_wickets for perf in bowling_innings], PLAYER_SIMULATIONS)
+    else:
+        wicket_share = expected_wickets / max(bowling.wickets.mean(), 1)
     
+    runs = batting.runs * run_share
+    wickets = bowling.wickets * wicket_share
     return {
-        "player": {
-            "id": player.id,
-            "name": player.name,
-            "role": player.role
+        "simulations": PLAYER_SIMULATIONS,
+        "team_total": {
+            "mean": float(batting.runs.mean()),
+            "percentiles": innings_simulator.percentiles(batting.runs)
         },
-        "match": {
-            "id": match.id,
-            "venue": match.venue,
-            "date": match.date.isoformat() if match.date else None,
-            "opposition": match.away_team.name if player.teams and player.teams[0].id == match.home_team_id else match.home_team.name
-        } if match else None,
-        "prediction": {
-            "batting": {
-                "runs": predicted_runs,
-                "balls_faced": predicted_balls_faced,
-                "strike_rate": predicted_strike_rate,
-                "boundary_percentage": round(player.fours + player.sixes) / player.balls_faced * 100 if player.balls_faced > 0 else 10
-            },
-            "bowling": {
-                "wickets": predicted_wickets,
-                "economy_rate": predicted_economy,
-                "dot_ball_percentage": 100 - (predicted_economy * 100 / 6)  # Rough estimate
-            }
+        "runs": {
+            "mean": float(runs.mean()),
+            "percentiles": innings_simulator.percentiles(runs)
         },
-        "confidence": {
-            "batting": min(len(recent_runs) / 10, 1) * 100,
-            "bowling": min(len(recent_wickets) / 10, 1) * 100
+        "wickets": {
+            "mean": float(wickets.mean()),
+            "percentiles": innings_simulator.percentiles(wickets)
         }
-    }
\ No newline at end of file
+    }
+
+def _get_scenario_state(db: Session, fingerprint: str) -> Dict[str, Any]:
+    """
+    Get the season state for scenarios, loading it only when the fingerprint changes
+    
+    Teams and fixtures are kept as plain values, so the cached state does not
+    depend on the session it was loaded with.
+    
+    Args:
+        db: Database session
+        fingerprint: Current season fingerprint, from _season_fingerprint
+        
+    Returns:
+        Season state as from _load_season_state
+    """
+    if _scenario_state["key"] != fingerprint:
+        state = _load_season_state(db)
+        state["teams"] = [
+            {"id": team.id, "name": team.name, "short_name": team.short_name}
+            for team in state["teams"]
+        ]
+        state["fixtures"] = [
+            {"id": match.id, "home_team_id": match.home_team_id, "away_team_id": match.away_team_id}
+            for match in state["fixtures"]
+        ]
+        _scenario_state["key"] = fingerprint
+        _scenario_state["state"] = state
+    
+    return _scenario_state["state"]
+
+async def _get_scenario_base(
+    state: Dict[str, Any],
+    fingerprint: str,
+    simulations: int,
+    seed: Optional[int]
+) -> Dict[str, Any]:
+    """
+    Get the cached base simulation for a season state, sampling it on first use
+    
+    Concurrent scenarios on the same base share one in-flight sampling.
+    
+    Args:
+        state: Season state from _get_scenario_state
+        fingerprint: Season fingerprint of the state, from _season_fingerprint
+        simulations: Number of simulations in the base sample
+        seed: Seed for the base sample, random if not given
+        
+    Returns:
+        Dictionary with the sampled season, its seed and its baseline counts
+    """
+    key = (fingerprint, simulations, seed)
+    base = _scenario_bases.get(key)
+    if base is not None:
+        _scenario_bases.move_to_end(key)
+        return base
+    
+    season = state["season"]
+    base_seed = seed if seed is not None else secrets.randbits(32)
+    
+    def sample() -> Dict[str, Any]:
+        rng = np.random.default_rng(base_seed)
+        season_sample = season_simulator.sample_season(season, simulations, rng)
+        playoff_counts, championship_counts = season_simulator.count_outcomes(season, season_sample)
+        return {
+            "sample": season_sample,
+            "seed": base_seed,
+            "playoff_counts": playoff_counts,
+            "championship_counts": championship_counts
+        }
+    
+    async def sample_and_store() -> Dict[str, Any]:
+        base = await asyncio.get_running_loop().run_in_executor(None, sample)
+        _scenario_bases[key] = base
+        if len(_scenario_bases) > SCENARIO_CACHE_SIZE:
+            _scenario_bases.popitem(last=False)
+        return base
+    
+    task = _scenario_sampling.get(key)
+    if task is None:
+        task = asyncio.ensure_future(sample_and_store())
+        _scenario_sampling[key] = task
+        task.add_done_callback(lambda _: _scenario_sampling.pop(key, None))
+    
+    # Shield the shared sampling from cancellation by any one client
+    return await asyncio.shield(task)
+
+async def simulate_scenario(
+    outcomes: List[Dict[str, Any]],
+    db: Session,
+    simulations: int = 10000,
+    seed: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Simulate the remainder of the season with some match results forced
+    
+    The sampled outcomes of a cached base simulation are re-used for every match
+    that is not forced, so a scenario only re-tabulates standings and playoffs.
+    Playoff chances are computed exactly with the forced results fixed.
+    
+    Args:
+        outcomes: Forced results, each with match_id, winner_id and optionally
+            run_margin or balls_remaining
+        db: Database session
+        simulations: Number of simulations in the base sample
+        seed: Seed for the base sample, random if not given
+        
+    Returns:
+        Dictionary with scenario and baseline results
+    """
+    fingerprint = _season_fingerprint(db)
+    state = _get_scenario_state(db, fingerprint)
+    teams = state["teams"]
+    points, nrr = state["points"], state["nrr"]
+    home_idx, away_idx = state["home_idx"], state["away_idx"]
+    column_of = {match["id"]: j for j, match in enumerate(state["fixtures"])}
+    
+    # Resolve forced results to fixture columns
+    columns, home_won, run_margins, balls_remaining = [], [], [], []
+    for outcome in outcomes:
+        column = column_of.get(outcome["match_id"])
+        if column is None:
+            raise ValueError(f"Match {outcome['match_id']} is not a remaining scheduled match")
+        
+        match = state["fixtures"][column]
+        if outcome["winner_id"] not in (match["home_team_id"], match["away_team_id"]):
+            raise ValueError(f"Team {outcome['winner_id']} does not play in match {match['id']}")
+        
+        columns.append(column)
+        home_won.append(outcome["winner_id"] == match["home_team_id"])
+        run_margins.append(outcome.get("run_margin") if outcome.get("run_margin") is not None else np.nan)
+        balls_remaining.append(outcome.get("balls_remaining") if outcome.get("balls_remaining") is not None else np.nan)
+    
+    base = await _get_scenario_base(state, fingerprint, simulations, seed)
+    
+    def tabulate() -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, str]:
+        # Re-use the base sample with the forced results applied
+        scenario = season_simulator.force_outcomes(
+            base["sample"],
+            np.array(columns, dtype=int),
+            np.array(home_won, dtype=bool),
+            np.array(run_margins, dtype=float),
+            np.array(balls_remaining, dtype=float)
+        )
+        playoff_counts, championship_counts = season_simulator.count_outcomes(state["season"], scenario)
+        
+        # Exact playoff chances with the forced results fixed
+        home_probs = season_simulator.home_win_probability(
+            points[home_idx] + nrr[home_idx],
+            points[away_idx] + nrr[away_idx]
+        )
+        home_probs[columns] = home_won
+        qualify, top_two, method = playoff_odds.qualification_probabilities(
+            points, nrr, home_idx, away_idx, home_probs
+        )
+        return playoff_counts, championship_counts, qualify, top_two, method
+    
+    # Tabulate off the event loop, like the season simulations
+    playoff_counts, championship_counts, qualify, top_two, method = await asyncio.get_running_loop().run_in_executor(
+        None, tabulate
+    )
+    
+    # Format results
+    results = []
+    for i, team in enumerate(teams):
+        results.append({
+            "team": dict(team),
+            "playoff_percentage": float(playoff_counts[i]) / simulations * 100,
+            "championship_percentage": float(championship_counts[i]) / simulations * 100,
+            "playoff_chance": float(qualify[i]),
+            "top_two_chance": float(top_two[i]),
+            "baseline": {
+                "playoff_percentage": float(base["playoff_counts"][i]) / simulations * 100,
+                "championship_percentage": float(base["championship_counts"][i]) / simulations * 100
+            }
+        })
+    
+    # Sort by championship percentage
+    results.sort(key=lambda x: x["championship_percentage"], reverse=True)
+    
+    return {
+        "simulations": simulations,
+        "seed": base["seed"],
+        "method": method,
+        "outcomes": outcomes,
+        "teams": results
+    }
@@ -0,0 +1,180 @@
+from typing import Dict, Any, Optional, Callable, Awaitable
+from collections import OrderedDict
+import asyncio
+import hashlib
+import json
+from redis.exceptions import RedisError
+
+from app.db.database import redis_client
+
+# Prefix of every prediction result key in Redis
+KEY_PREFIX = "predictions:"
+
+# Results expire on their own after a day, in case an invalidation is missed
+CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Number of results kept in process when Redis is unavailable
+LOCAL_CACHE_SIZE = 64
+
+# Prefix of the cross-worker computation locks in Redis
+LOCK_PREFIX = "predictions-lock:"
+
+# A lock holder that dies is assumed gone after this long, and workers stop
+# waiting for another worker's result after LOCK_WAIT_SECONDS
+LOCK_TIMEOUT_SECONDS = 120
+LOCK_WAIT_SECONDS = 60
+
+_local_cache: "OrderedDict[str, str]" = OrderedDict()
+_in_flight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+_stats = {"hits": 0, "misses": 0, "coalesced": 0, "invalidations": 0, "redis_errors": 0}
+
+def cache_key(name: str, fingerprint: str, **params: Any) -> str:
+    """
+    Build the key of a cached prediction result
+
+    Args:
+        name: Name of the cached computation
+        fingerprint: Hash of the standings and remaining fixtures the result depends on
+        **params: Parameters of the computation
+
+    Returns:
+        Cache key
+    """
+    param_hash = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+    return f"{KEY_PREFIX}{name}:{fingerprint}:{param_hash}"
+
+async def _read(key: str) -> Optional[Dict[str, Any]]:
+    """Read a cached result without touching the hit and miss counts"""
+    try:
+        value = await redis_client.get(key)
+    except (RedisError, OSError):
+        _stats["redis_errors"] += 1
+        value = _local_cache.get(key)
+        if value is not None:
+            _local_cache.move_to_end(key)
+    return json.loads(value) if value is not None else None
+
+async def get_result(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a cached result, in Redis first and in process if Redis is unavailable
+
+    Args:
+        key: Cache key
+
+    Returns:
+        Cached result, or None on a miss
+    """
+    result = await _read(key)
+    _stats["hits" if result is not None else "misses"] += 1
+    return result
+
+async def set_result(key: str, result: Dict[str, Any]) -> None:
+    """
+    Store a result in Redis, or in process if Redis is unavailable
+
+    Args:
+        key: Cache key
+        result: JSON-serializable result
+    """
+    value = json.dumps(result)
+    try:
+        await redis_client.set(key, value, ex=CACHE_TTL_SECONDS)
+    except (RedisError, OSError):
+        _stats["redis_errors"] += 1
+        _local_cache[key] = value
+        _local_cache.move_to_end(key)
+        while len(_local_cache) > LOCAL_CACHE_SIZE:
+            _local_cache.popitem(last=False)
+
+async def _compute_once(key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Compute and store a result while holding the key's Redis lock
+
+    Workers that find the lock taken wait for it, then pick up the result the
+    holder stored. If Redis is unavailable, or the wait runs out, the result is
+    computed without the lock.
+    """
+    lock = redis_client.lock(
+        f"{LOCK_PREFIX}{key}",
+        timeout=LOCK_TIMEOUT_SECONDS,
+        blocking_timeout=LOCK_WAIT_SECONDS
+    )
+    try:
+        acquired = await lock.acquire()
+    except (RedisError, OSError):
+        _stats["redis_errors"] += 1
+        acquired = False
+
+    try:
+        # Another worker may have finished the computation while we waited
+        result = await _read(key)
+        if result is not None:
+            _stats["coalesced"] += 1
+            return result
+
+        result = await compute()
+        await set_result(key, result)
+        return result
+    finally:
+        if acquired:
+            try:
+                await lock.release()
+            except (RedisError, OSError):
+                _stats["redis_errors"] += 1
+
+async def get_or_compute(key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Return the cached result for a key, computing it at most once across concurrent requests
+
+    Concurrent requests for the same key in this worker share one in-flight
+    computation, and workers share one through a Redis lock, so a burst of
+    identical requests costs a single computation. The key should come from cheap
+    queries, with compute loading its own inputs, so that hits and coalesced
+    requests cost no loading either.
+
+    Args:
+        key: Cache key
+        compute: Coroutine function producing the JSON-serializable result
+
+    Returns:
+        Cached or freshly computed result
+    """
+    result = await get_result(key)
+    if result is not None:
+        return result
+
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_compute_once(key, compute))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    else:
+        _stats["coalesced"] += 1
+
+    # Shield the shared computation from cancellation by any one client
+    return await asyncio.shield(task)
+
+async def invalidate() -> None:
+    """Drop every cached prediction result after standings or fixtures change"""
+    _stats["invalidations"] += 1
+    _local_cache.clear()
+    try:
+        keys = [key async for key in redis_client.scan_iter(match=f"{KEY_PREFIX}*")]
+        if keys:
+            await redis_client.delete(*keys)
+    except (RedisError, OSError):
+        _stats["redis_errors"] += 1
+
+def get_stats() -> Dict[str, Any]:
+    """
+    Hit, miss and coalesced request counts of this worker's result cache
+
+    Returns:
+        Dictionary with counts and the hit rate
+    """
+    lookups = _stats["hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": _stats["hits"] / lookups if lookups else 0.0,
+        "local_entries": len(_local_cache)
+    }
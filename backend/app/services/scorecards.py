@@ -0,0 +1,490 @@
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Set, Tuple
+from collections import Counter, defaultdict
+from sqlalchemy import bindparam
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.bulk import copy_rows, insert_rows
+from app.utils.cricsheet import CricsheetDelivery, CricsheetInnings, CricsheetMatch
+
+# Dismissals credited to the bowler, and ways of leaving the crease that aren't a wicket
+BOWLER_DISMISSALS = {"bowled", "caught", "caught and bowled", "lbw", "stumped", "hit wicket"}
+NOT_DISMISSALS = {"retired hurt", "retired not out"}
+
+# Prefix of the codes of players first seen in Cricsheet data
+PLAYER_CODE_PREFIX = "CS-"
+
+# Columns holding player IDs, repointed when a duplicate player is merged away
+PLAYER_REFERENCES = (
+    (models.BattingPerformance.__table__, "player_id"),
+    (models.BattingPerformance.__table__, "dismissal_bowler_id"),
+    (models.BattingPerformance.__table__, "dismissal_fielder_id"),
+    (models.BowlingPerformance.__table__, "player_id"),
+    (models.Commentary.__table__, "batsman_id"),
+    (models.Commentary.__table__, "bowler_id"),
+    (models.TeamFeature.__table__, "key_batsman_id"),
+    (models.TeamFeature.__table__, "key_bowler_id"),
+    (models.CricsheetPerson.__table__, "player_id")
+)
+
+class InningsCard(NamedTuple):
+    """
+    Totals, batting and bowling cards and deliveries of one innings
+
+    Players are named as in the Cricsheet data and only swapped for IDs when
+    the card is written, through their registry identifier where the match has one.
+    """
+    number: int
+    batting_team: str
+    bowling_team: str
+    totals: Dict[str, Any]        # Innings columns: total_runs, total_wickets, total_overs, extras
+    batting: List[Dict[str, Any]]
+    bowling: List[Dict[str, Any]]
+    deliveries: List[Dict[str, Any]]
+    people: Dict[str, str]        # Registry identifier of each person named in the match
+
+    def person(self, name: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Name and registry identifier of a player of the card, the key of PlayerDirectory.ensure"""
+        return name, self.people.get(name) if name else None
+
+def overs_notation(balls: int) -> float:
+    """Legal balls as overs and balls, e.g. 116 balls as 19.2"""
+    return balls // 6 + (balls % 6) / 10
+
+def _is_dismissal(delivery: CricsheetDelivery) -> bool:
+    return delivery.is_wicket and delivery.wicket_kind not in NOT_DISMISSALS
+
+def _describe(delivery: CricsheetDelivery) -> str:
+    """Short commentary line of a delivery"""
+    if delivery.wides:
+        outcome = "wide" if delivery.wides == 1 else f"{delivery.wides} wides"
+    elif delivery.batter_runs == 4:
+        outcome = "FOUR"
+    elif delivery.batter_runs == 6:
+        outcome = "SIX"
+    elif delivery.runs == 0:
+        outcome = "no run"
+    else:
+        outcome = f"{delivery.runs} run{'s' if delivery.runs != 1 else ''}"
+    if delivery.noballs:
+        outcome = f"no ball, {outcome}"
+    if _is_dismissal(delivery):
+        outcome = f"OUT, {delivery.player_out} {delivery.wicket_kind}" + (f", {outcome}" if delivery.runs else "")
+    return f"{delivery.bowler} to {delivery.batter}, {outcome}"
+
+def _innings_card(number: int, innings: CricsheetInnings, bowling_team: str, people: Dict[str, str]) -> InningsCard:
+    """Aggregate the deliveries of one innings into its totals and cards"""
+    batting: Dict[str, Dict[str, Any]] = {}
+    bowling: Dict[str, Dict[str, Any]] = {}
+    overs: Dict[Tuple[str, int], List[int]] = {}  # (bowler, over) -> [legal balls, runs conceded]
+    deliveries = []
+    runs = wickets = extras = legal_balls = 0
+    over_balls, current_over = 0, None
+
+    def batter(name: str) -> Dict[str, Any]:
+        if name not in batting:
+            batting[name] = {
+                "player": name, "runs": 0, "balls_faced": 0, "fours": 0, "sixes": 0,
+                "dismissal_type": None, "dismissal_bowler": None, "dismissal_fielder": None,
+                "batting_position": len(batting) + 1
+            }
+        return batting[name]
+
+    for delivery in innings.deliveries:
+        striker = batter(delivery.batter)
+        if delivery.non_striker:
+            batter(delivery.non_striker)
+        bowler = bowling.setdefault(
+            delivery.bowler, {"player": delivery.bowler, "balls": 0, "runs": 0, "wickets": 0, "dot_balls": 0}
+        )
+
+        if delivery.over != current_over:
+            current_over, over_balls = delivery.over, 0
+        # Byes and leg byes aren't charged to the bowler
+        conceded = delivery.batter_runs + delivery.wides + delivery.noballs
+        runs += delivery.runs
+        extras += delivery.extras
+        striker["runs"] += delivery.batter_runs
+        striker["fours"] += delivery.batter_runs == 4
+        striker["sixes"] += delivery.batter_runs == 6
+        if not delivery.wides:
+            striker["balls_faced"] += 1
+        bowler["runs"] += conceded
+        spell = overs.setdefault((delivery.bowler, delivery.over), [0, 0])
+        spell[1] += conceded
+        if delivery.legal:
+            legal_balls += 1
+            over_balls += 1
+            bowler["balls"] += 1
+            bowler["dot_balls"] += conceded == 0
+            spell[0] += 1
+
+        dismissal = _is_dismissal(delivery)
+        if dismissal:
+            wickets += 1
+            out = batter(delivery.player_out)
+            out["dismissal_type"] = delivery.wicket_kind
+            if delivery.wicket_kind in BOWLER_DISMISSALS:
+                out["dismissal_bowler"] = delivery.bowler
+                bowler["wickets"] += 1
+            out["dismissal_fielder"] = delivery.fielder
+
+        deliveries.append({
+            "innings_number": number,
+            "over_number": float(delivery.over),
+            "ball_number": over_balls,
+            "commentary_text": _describe(delivery),
+            "runs_scored": delivery.runs,
+            "is_wicket": dismissal,
+            "is_boundary": delivery.batter_runs in (4, 6),
+            "batsman": delivery.batter,
+            "bowler": delivery.bowler
+        })
+
+    for card in batting.values():
+        card["strike_rate"] = round(card["runs"] / card["balls_faced"] * 100, 2) if card["balls_faced"] else 0.0
+    maidens: Dict[str, int] = {}
+    for (name, _), (balls, conceded) in overs.items():
+        maidens[name] = maidens.get(name, 0) + (balls == 6 and conceded == 0)
+    bowling_card = [
+        {
+            "player": name,
+            "overs": overs_notation(figures["balls"]),
+            "maidens": maidens[name],
+            "runs": figures["runs"],
+            "wickets": figures["wickets"],
+            "economy_rate": round(figures["runs"] * 6 / figures["balls"], 2) if figures["balls"] else 0.0,
+            "dot_balls": figures["dot_balls"]
+        }
+        for name, figures in bowling.items()
+    ]
+
+    return InningsCard(
+        number=number,
+        batting_team=innings.team,
+        bowling_team=bowling_team,
+        totals={"total_runs": runs, "total_wickets": wickets, "total_overs": overs_notation(legal_balls), "extras": extras},
+        batting=list(batting.values()),
+        bowling=bowling_card,
+        deliveries=deliveries,
+        people=people
+    )
+
+def build_scorecard(match: CricsheetMatch) -> List[InningsCard]:
+    """
+    Cards of every regular innings of a match, from its deliveries
+
+    Super overs decide tied matches but aren't innings of the match, so they
+    are left out.
+
+    Args:
+        match: Cricsheet match record
+
+    Returns:
+        One card per innings, in batting order
+    """
+    cards = []
+    for innings in match.innings:
+        if innings.super_over:
+            continue
+        bowling_team = next((team for team in match.teams if team != innings.team), "")
+        cards.append(_innings_card(len(cards) + 1, innings, bowling_team, match.people))
+    return cards
+
+def match_totals(cards: List[InningsCard]) -> Dict[str, Any]:
+    """Score, wickets and overs of the first two innings, as Match columns"""
+    totals = {}
+    for prefix, card in zip(("first", "second"), cards):
+        totals[f"{prefix}_innings_score"] = card.totals["total_runs"]
+        totals[f"{prefix}_innings_wickets"] = card.totals["total_wickets"]
+        totals[f"{prefix}_innings_overs"] = card.totals["total_overs"]
+    return totals
+
+class PlayerDirectory:
+    """
+    IDs of players by Cricsheet person, creating the players first seen in Cricsheet data
+
+    A person is their Cricsheet name and registry identifier. Identifiers are
+    kept in cricsheet_people, so a person keeps the same player however their
+    name is written, and two people sharing a name stay apart. Names without
+    an identifier, from older files, fall back to matching on the exact name.
+
+    Loaded once per import with the existing players and identifiers, so cards
+    are written without a query per player. Historical appearances only go into
+    the cards; team memberships stay those of the current squads in the player feeds.
+    """
+
+    def __init__(self, players: Iterable[Tuple[int, str]], people: Iterable[Tuple[str, int]]):
+        self._by_name: Dict[str, int] = {}
+        for player_id, name in players:
+            self._by_name.setdefault(name, player_id)
+        self._by_identifier: Dict[str, int] = dict(people)
+        self._identified = set(self._by_identifier.values())
+
+    @classmethod
+    def load(cls, db: Session) -> "PlayerDirectory":
+        """Load every player and registry identifier with one query each"""
+        return cls(
+            db.query(models.Player.id, models.Player.name).order_by(models.Player.id).all(),
+            db.query(models.CricsheetPerson.identifier, models.CricsheetPerson.player_id).all()
+        )
+
+    def ensure(
+        self,
+        db: Session,
+        people: Iterable[Tuple[Optional[str], Optional[str]]]
+    ) -> Dict[Tuple[str, Optional[str]], int]:
+        """
+        IDs of the given people, inserting the players not known yet in one statement
+
+        A known identifier gives its player. Otherwise the person takes the player
+        of the same name, unless that player already belongs to another identifier,
+        and a new player is created when there is none.
+
+        Args:
+            db: Database session
+            people: Name and registry identifier (None without a registry) of each person
+
+        Returns:
+            Dictionary mapping each (name, identifier) to its player ID
+        """
+        ids: Dict[Tuple[str, Optional[str]], int] = {}
+        identified: List[Dict[str, Any]] = []
+        missing: Dict[str, Tuple[str, Optional[str]]] = {}
+        for name, identifier in sorted(set(people), key=lambda person: (person[0] or "", person[1] or "")):
+            if not name:
+                continue
+            if identifier in self._by_identifier:
+                ids[(name, identifier)] = self._by_identifier[identifier]
+                continue
+            player_id = self._by_name.get(name)
+            if player_id is not None and not (identifier and player_id in self._identified):
+                ids[(name, identifier)] = player_id
+                if identifier:
+                    self._by_identifier[identifier] = player_id
+                    self._identified.add(player_id)
+                    identified.append({"identifier": identifier, "name": name, "player_id": player_id})
+                continue
+            missing[f"{PLAYER_CODE_PREFIX}{identifier or name}"] = (name, identifier)
+
+        if missing:
+            insert_rows(db, models.Player.__table__, [
+                {"player_code": code, "name": name} for code, (name, _) in missing.items()
+            ])
+            for player_id, code in db.query(models.Player.id, models.Player.player_code).filter(
+                models.Player.player_code.in_(list(missing))
+            ):
+                name, identifier = missing[code]
+                ids[(name, identifier)] = player_id
+                self._by_name.setdefault(name, player_id)
+                if identifier:
+                    self._by_identifier[identifier] = player_id
+                    self._identified.add(player_id)
+                    identified.append({"identifier": identifier, "name": name, "player_id": player_id})
+
+        insert_rows(db, models.CricsheetPerson.__table__, identified)
+        return ids
+
+def remove_cricsheet_memberships(db: Session) -> int:
+    """
+    Delete the team memberships of players first seen in Cricsheet data
+
+    Earlier imports linked every historical player to every team they played
+    for, filling current squads with past players. Those players are never in
+    the feeds, so none of their memberships belong to a current squad.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of memberships deleted
+    """
+    association = models.player_team_association
+    cricsheet_players = db.query(models.Player.id).filter(models.Player.player_code.like(f"{PLAYER_CODE_PREFIX}%"))
+    return db.execute(
+        association.delete().where(association.c.player_id.in_(cricsheet_players.scalar_subquery()))
+    ).rowcount
+
+def write_scorecards(
+    db: Session,
+    scorecards: List[Tuple[int, Dict[str, int], List[InningsCard]]],
+    players: PlayerDirectory
+) -> int:
+    """
+    Write the innings, batting and bowling cards and deliveries of many matches
+
+    Innings are inserted first and their IDs read back with one query, then
+    every card and delivery row is loaded with copy_rows.
+
+    Args:
+        db: Database session
+        scorecards: Match ID, team IDs by Cricsheet team name, and innings cards of each match
+        players: Player directory of the import
+
+    Returns:
+        Number of deliveries written
+    """
+    if not scorecards:
+        return 0
+
+    people = set()
+    for _, _, cards in scorecards:
+        for card in cards:
+            people.update(card.person(row["player"]) for row in card.batting)
+            people.update(card.person(row["player"]) for row in card.bowling)
+            people.update(card.person(row["dismissal_fielder"]) for row in card.batting if row["dismissal_fielder"])
+    player_ids = players.ensure(db, people)
+
+    insert_rows(db, models.Innings.__table__, [
+        {
+            "match_id": match_id,
+            "innings_number": card.number,
+            "batting_team_id": team_ids.get(card.batting_team),
+            "bowling_team_id": team_ids.get(card.bowling_team),
+            **card.totals
+        }
+        for match_id, team_ids, cards in scorecards for card in cards
+    ])
+    match_ids = [match_id for match_id, _, _ in scorecards]
+    innings_ids = {
+        (match_id, number): innings_id
+        for innings_id, match_id, number in db.query(
+            models.Innings.id, models.Innings.match_id, models.Innings.innings_number
+        ).filter(models.Innings.match_id.in_(match_ids))
+    }
+
+    batting_rows, bowling_rows, delivery_rows = [], [], []
+    for match_id, team_ids, cards in scorecards:
+        for card in cards:
+            innings_id = innings_ids[(match_id, card.number)]
+            for row in card.batting:
+                if card.person(row["player"]) not in player_ids:
+                    continue
+                batting_rows.append({
+                    "innings_id": innings_id,
+                    "player_id": player_ids[card.person(row["player"])],
+                    "runs": row["runs"],
+                    "balls_faced": row["balls_faced"],
+                    "fours": row["fours"],
+                    "sixes": row["sixes"],
+                    "strike_rate": row["strike_rate"],
+                    "dismissal_type": row["dismissal_type"],
+                    "dismissal_bowler_id": player_ids.get(card.person(row["dismissal_bowler"])),
+                    "dismissal_fielder_id": player_ids.get(card.person(row["dismissal_fielder"])),
+                    "batting_position": row["batting_position"]
+                })
+            for row in card.bowling:
+                if card.person(row["player"]) not in player_ids:
+                    continue
+                bowling_rows.append({
+                    "innings_id": innings_id,
+                    "player_id": player_ids[card.person(row["player"])],
+                    **{column: row[column] for column in ("overs", "maidens", "runs", "wickets", "economy_rate", "dot_balls")}
+                })
+            for row in card.deliveries:
+                delivery_rows.append({
+                    "match_id": match_id,
+                    **{column: row[column] for column in (
+                        "innings_number", "over_number", "ball_number", "commentary_text",
+                        "runs_scored", "is_wicket", "is_boundary"
+                    )},
+                    "batsman_id": player_ids.get(card.person(row["batsman"])),
+                    "bowler_id": player_ids.get(card.person(row["bowler"]))
+                })
+
+    copy_rows(db, models.BattingPerformance.__table__, batting_rows)
+    copy_rows(db, models.BowlingPerformance.__table__, bowling_rows)
+    copy_rows(db, models.Commentary.__table__, delivery_rows)
+    return len(delivery_rows)
+
+def _name_key(name: Optional[str]) -> Optional[Tuple[str, str]]:
+    """First initial and surname of a name, the same for "V Kohli" and "Virat Kohli" """
+    parts = (name or "").replace(".", " ").split()
+    return (parts[0][0].lower(), parts[-1].lower()) if len(parts) > 1 else None
+
+def merge_players(db: Session, merges: Dict[int, int]) -> None:
+    """
+    Merge duplicate players into the players they stand for
+
+    Every card, delivery, key player and registry identifier of a duplicate is
+    repointed to its target, then the duplicate and its memberships are deleted.
+
+    Args:
+        db: Database session
+        merges: Target player ID of each duplicate player ID
+    """
+    if not merges:
+        return
+    pairs = [{"duplicate": duplicate, "target": target} for duplicate, target in merges.items()]
+    for table, column in PLAYER_REFERENCES:
+        db.execute(
+            table.update().where(table.c[column] == bindparam("duplicate")).values({column: bindparam("target")}),
+            pairs
+        )
+    association = models.player_team_association
+    db.execute(association.delete().where(association.c.player_id.in_(list(merges))))
+    db.execute(models.Player.__table__.delete().where(models.Player.__table__.c.id.in_(list(merges))))
+
+def reconcile_players(db: Session) -> int:
+    """
+    Merge players created from Cricsheet data into the feed players they turn out to be
+
+    Cricsheet writes names as initials and surname ("V Kohli") where the feeds
+    write them in full ("Virat Kohli"), so their players are first created apart.
+    A Cricsheet player is merged into a feed player with the same first initial
+    and surname who is in the squad of a team the Cricsheet player appeared for,
+    when exactly one feed player fits, no other Cricsheet player claims it, and
+    it isn't tied to another registry identifier already. This also cleans up
+    the duplicates earlier imports created by matching exact names only.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of players merged
+    """
+    association = models.player_team_association
+    from_cricsheet = models.Player.player_code.like(f"{PLAYER_CODE_PREFIX}%")
+
+    # Feed players by first initial and surname, with their current squads
+    candidates: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+    for player_id, name in db.query(models.Player.id, models.Player.name).filter(~from_cricsheet):
+        key = _name_key(name)
+        if key:
+            candidates[key].append(player_id)
+    squads: Dict[int, Set[int]] = defaultdict(set)
+    for player_id, team_id in db.query(association.c.player_id, association.c.team_id):
+        squads[player_id].add(team_id)
+    identified = {player_id for (player_id,) in db.query(models.CricsheetPerson.player_id).distinct()}
+
+    # Teams each Cricsheet player batted or bowled for
+    played_for: Dict[int, Set[int]] = defaultdict(set)
+    for performance, team_column in (
+        (models.BattingPerformance, models.Innings.batting_team_id),
+        (models.BowlingPerformance, models.Innings.bowling_team_id)
+    ):
+        for player_id, team_id in db.query(performance.player_id, team_column).join(
+            models.Innings, models.Innings.id == performance.innings_id
+        ).join(models.Player, models.Player.id == performance.player_id).filter(from_cricsheet).distinct():
+            played_for[player_id].add(team_id)
+
+    merges = {}
+    for player_id, name in db.query(models.Player.id, models.Player.name).filter(from_cricsheet):
+        matches = [
+            candidate for candidate in candidates.get(_name_key(name), [])
+            if squads[candidate] & played_for[player_id] and candidate not in identified
+        ]
+        if len(matches) == 1:
+            merges[player_id] = matches[0]
+
+    # A feed player claimed by several Cricsheet players is ambiguous, and left alone
+    claims = Counter(merges.values())
+    merges = {duplicate: target for duplicate, target in merges.items() if claims[target] == 1}
+    merge_players(db, merges)
+    return len(merges)
+
+def matches_with_deliveries(db: Session) -> Set[int]:
+    """IDs of the matches that already have innings or commentary rows"""
+    innings = db.query(models.Innings.match_id).distinct()
+    commentary = db.query(models.Commentary.match_id).distinct()
+    return {match_id for (match_id,) in innings.union(commentary)}
@@ -0,0 +1,696 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+import os
+import secrets
+import threading
+import numpy as np
+
+# Number of teams that qualify for the playoffs
+PLAYOFF_SPOTS = 4
+
+# Home advantage and clamp applied to league match win probabilities
+HOME_ADVANTAGE = 0.1
+MIN_HOME_WIN_PROBABILITY = 0.2
+MAX_HOME_WIN_PROBABILITY = 0.8
+
+# Innings length, and the defaults used when there is too little history to fit
+OVERS_PER_INNINGS = 20
+BALLS_PER_INNINGS = OVERS_PER_INNINGS * 6
+DEFAULT_FIRST_INNINGS_MEAN = 170.0
+DEFAULT_FIRST_INNINGS_SD = 25.0
+DEFAULT_RUN_MARGIN_MEAN = 25.0
+DEFAULT_BALLS_REMAINING_MEAN = 10.0
+MIN_FIRST_INNINGS_SCORE = 60
+MAX_FIRST_INNINGS_SCORE = 290
+
+# Pseudo-count that shrinks team and venue effects towards the league mean
+EFFECT_PRIOR_MATCHES = 5
+
+# Simulations processed per batch, bounds peak memory of the (sims x matches) arrays
+BATCH_SIZE = 20000
+
+# Simulations per independently seeded chunk. The chunk layout depends only on the
+# number of simulations, never on the number of workers, so seeded runs are reproducible.
+CHUNK_SIZE = 10000
+
+# Adaptive runs add this many simulations between convergence checks, and never
+# stop before MIN_ADAPTIVE_SIMULATIONS so that intervals around 0% and 100% are meaningful
+ADAPTIVE_BATCH_SIZE = 2000
+MIN_ADAPTIVE_SIMULATIONS = 2000
+
+# Normal quantile of the 95% confidence intervals
+WILSON_Z = 1.96
+
+# Worker processes shared by every parallel simulation, one per CPU, started on
+# first use and stopped with the app
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+class InningsModel(NamedTuple):
+    """First-innings totals and winning margins fitted to completed matches"""
+    mean: float                 # League mean first-innings total
+    sd: float                   # Residual standard deviation of first-innings totals
+    batting: np.ndarray         # Per-team effect on totals when batting first
+    bowling: np.ndarray         # Per-team effect on totals conceded when bowling first
+    venues: Dict[str, float]    # Per-venue effect on first-innings totals
+    run_margin_mean: float      # Mean margin of wins by the side batting first
+    balls_remaining_mean: float # Mean balls to spare in successful chases
+
+class Season(NamedTuple):
+    """Current league totals and the remaining fixtures, as arrays"""
+    points: np.ndarray          # Points per team
+    runs_for: np.ndarray        # Runs scored per team
+    overs_for: np.ndarray       # Overs faced per team
+    runs_against: np.ndarray    # Runs conceded per team
+    overs_against: np.ndarray   # Overs bowled per team
+    home_idx: np.ndarray        # Team index of the home side of each fixture, in schedule order
+    away_idx: np.ndarray        # Team index of the away side of each fixture, in schedule order
+    home_first_mean: np.ndarray # Expected first-innings total of each fixture if home bats first
+    away_first_mean: np.ndarray # Expected first-innings total of each fixture if away bats first
+    innings_sd: float
+    run_margin_mean: float
+    balls_remaining_mean: float
+
+    @property
+    def nrr(self) -> np.ndarray:
+        """Current net run rate per team"""
+        return net_run_rate(self.runs_for, self.overs_for, self.runs_against, self.overs_against)
+
+class SeasonSample(NamedTuple):
+    """Sampled outcomes of the remaining league matches and playoffs"""
+    home_wins: np.ndarray        # (sims, matches) True where the home team won
+    home_bats_first: np.ndarray  # (sims, matches) True where the home team batted first
+    first_total: np.ndarray      # (sims, matches) first-innings total
+    run_margin: np.ndarray       # (sims, matches) margin if the side batting first wins
+    balls_remaining: np.ndarray  # (sims, matches) balls to spare if the chase succeeds
+    playoff_draws: np.ndarray    # (sims, 4) uniforms for Q1, Eliminator, Q2 and Final
+
+def overs_to_decimal(overs: float) -> float:
+    """Convert overs in cricket notation (19.4 = 19 overs and 4 balls) to decimal overs"""
+    whole = int(overs)
+    return whole + round((overs - whole) * 10) / 6
+
+def net_run_rate(
+    runs_for: np.ndarray,
+    overs_for: np.ndarray,
+    runs_against: np.ndarray,
+    overs_against: np.ndarray
+) -> np.ndarray:
+    """Net run rate from cumulative runs and overs, zero where no overs have been bowled"""
+    scored = np.divide(runs_for, overs_for, out=np.zeros_like(runs_for, dtype=float), where=overs_for > 0)
+    conceded = np.divide(runs_against, overs_against, out=np.zeros_like(runs_against, dtype=float), where=overs_against > 0)
+    return scored - conceded
+
+def fit_innings_model(
+    n_teams: int,
+    batting_first: Sequence[int],
+    bowling_first: Sequence[int],
+    venues: Sequence[str],
+    first_scores: Sequence[float],
+    second_scores: Sequence[float],
+    second_overs: Sequence[float],
+    batting_first_won: Sequence[bool]
+) -> InningsModel:
+    """
+    Fit first-innings totals and winning margins to completed matches
+
+    Totals are modelled as league mean plus shrunken batting, bowling and venue
+    effects with normal residuals.
+
+    Args:
+        n_teams: Number of teams
+        batting_first: Team index of the side batting first in each match
+        bowling_first: Team index of the side bowling first in each match
+        venues: Venue of each match
+        first_scores: First-innings total of each match
+        second_scores: Second-innings total of each match
+        second_overs: Second-innings decimal overs of each match
+        batting_first_won: Whether the side batting first won each match
+
+    Returns:
+        Fitted innings model
+    """
+    batting_first = np.asarray(batting_first, dtype=int)
+    bowling_first = np.asarray(bowling_first, dtype=int)
+    first_scores = np.asarray(first_scores, dtype=float)
+    second_scores = np.asarray(second_scores, dtype=float)
+    second_overs = np.asarray(second_overs, dtype=float)
+    batting_first_won = np.asarray(batting_first_won, dtype=bool)
+
+    if len(first_scores) == 0:
+        return InningsModel(
+            DEFAULT_FIRST_INNINGS_MEAN, DEFAULT_FIRST_INNINGS_SD,
+            np.zeros(n_teams), np.zeros(n_teams), {},
+            DEFAULT_RUN_MARGIN_MEAN, DEFAULT_BALLS_REMAINING_MEAN
+        )
+
+    mean = first_scores.mean()
+    residual = first_scores - mean
+
+    def shrunken_effect(groups: np.ndarray, n_groups: int) -> np.ndarray:
+        totals = np.bincount(groups, weights=residual, minlength=n_groups)
+        counts = np.bincount(groups, minlength=n_groups)
+        return totals / (counts + EFFECT_PRIOR_MATCHES)
+
+    batting = shrunken_effect(batting_first, n_teams)
+    bowling = shrunken_effect(bowling_first, n_teams)
+    venue_names, venue_idx = np.unique(np.asarray(venues, dtype=str), return_inverse=True)
+    venue_effect = shrunken_effect(venue_idx, len(venue_names))
+
+    fitted = mean + batting[batting_first] + bowling[bowling_first] + venue_effect[venue_idx]
+    sd = float(np.sqrt(np.mean((first_scores - fitted) ** 2))) if len(first_scores) > 1 else DEFAULT_FIRST_INNINGS_SD
+
+    margins = (first_scores - second_scores)[batting_first_won]
+    balls_left = (BALLS_PER_INNINGS - second_overs * 6)[~batting_first_won]
+
+    return InningsModel(
+        mean=float(mean),
+        sd=sd if sd > 0 else DEFAULT_FIRST_INNINGS_SD,
+        batting=batting,
+        bowling=bowling,
+        venues=dict(zip(venue_names.tolist(), venue_effect.tolist())),
+        run_margin_mean=float(margins.mean()) if len(margins) else DEFAULT_RUN_MARGIN_MEAN,
+        balls_remaining_mean=float(balls_left.mean()) if len(balls_left) else DEFAULT_BALLS_REMAINING_MEAN
+    )
+
+def build_season(
+    points: np.ndarray,
+    nrr: np.ndarray,
+    matches_played: np.ndarray,
+    home_idx: np.ndarray,
+    away_idx: np.ndarray,
+    fixture_venues: Sequence[str],
+    model: InningsModel
+) -> Season:
+    """
+    Build the engine input from the league table, remaining fixtures and innings model
+
+    The table only stores net run rate, so cumulative totals are reconstructed from
+    it: every match played counts as a full innings each way at the league scoring
+    rate, with the team's own runs adjusted to reproduce its net run rate exactly.
+
+    Args:
+        points: Current points per team
+        nrr: Current net run rate per team
+        matches_played: Matches played per team
+        home_idx: Team index of the home side of each fixture, in schedule order
+        away_idx: Team index of the away side of each fixture, in schedule order
+        fixture_venues: Venue of each fixture
+        model: Fitted innings model
+
+    Returns:
+        Season ready for simulation
+    """
+    overs = np.asarray(matches_played, dtype=float) * OVERS_PER_INNINGS
+    runs_against = overs * model.mean / OVERS_PER_INNINGS
+    runs_for = runs_against + np.asarray(nrr, dtype=float) * overs
+
+    venue_effect = np.array([model.venues.get(venue, 0.0) for venue in fixture_venues])
+    home_first_mean = model.mean + model.batting[home_idx] + model.bowling[away_idx] + venue_effect
+    away_first_mean = model.mean + model.batting[away_idx] + model.bowling[home_idx] + venue_effect
+
+    return Season(
+        points=np.asarray(points, dtype=float),
+        runs_for=runs_for,
+        overs_for=overs,
+        runs_against=runs_against,
+        overs_against=overs.copy(),
+        home_idx=np.asarray(home_idx, dtype=int),
+        away_idx=np.asarray(away_idx, dtype=int),
+        home_first_mean=home_first_mean,
+        away_first_mean=away_first_mean,
+        innings_sd=model.sd,
+        run_margin_mean=model.run_margin_mean,
+        balls_remaining_mean=model.balls_remaining_mean
+    )
+
+def fixture_matrices(home_idx: np.ndarray, away_idx: np.ndarray, n_teams: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build one-hot (matches x teams) matrices for the home and away side of each fixture
+
+    Args:
+        home_idx: Team index of the home side of each fixture
+        away_idx: Team index of the away side of each fixture
+        n_teams: Number of teams
+
+    Returns:
+        Tuple of home and away one-hot matrices
+    """
+    n_matches = len(home_idx)
+    home = np.zeros((n_matches, n_teams))
+    away = np.zeros((n_matches, n_teams))
+    home[np.arange(n_matches), home_idx] = 1.0
+    away[np.arange(n_matches), away_idx] = 1.0
+    return home, away
+
+def head_to_head_probability(strength1: np.ndarray, strength2: np.ndarray) -> np.ndarray:
+    """Probability that side 1 wins, proportional to its share of the combined strength"""
+    total = strength1 + strength2
+    safe_total = np.where(total > 0, total, 1.0)
+    return np.where(total > 0, strength1 / safe_total, 0.5)
+
+def home_win_probability(home_strength: np.ndarray, away_strength: np.ndarray) -> np.ndarray:
+    """Probability that the home side wins a league match, including home advantage"""
+    probability = head_to_head_probability(home_strength, away_strength) + HOME_ADVANTAGE
+    return np.clip(probability, MIN_HOME_WIN_PROBABILITY, MAX_HOME_WIN_PROBABILITY)
+
+def resolve_innings(
+    home_wins: np.ndarray,
+    home_bats_first: np.ndarray,
+    first_total: np.ndarray,
+    run_margin: np.ndarray,
+    balls_remaining: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Turn sampled innings draws and a result into runs and overs for each side
+
+    A side batting first is credited with its full overs, as is a side bowled out
+    or failing to chase (the net run rate rule); a successful chase is credited
+    with the overs it actually used.
+
+    Returns:
+        Tuple of home runs, home overs, away runs and away overs
+    """
+    batting_first_won = home_wins == home_bats_first
+    second_total = np.where(batting_first_won, first_total - run_margin, first_total + 1)
+    second_overs = np.where(
+        batting_first_won, OVERS_PER_INNINGS, (BALLS_PER_INNINGS - balls_remaining) / 6
+    )
+
+    home_runs = np.where(home_bats_first, first_total, second_total)
+    away_runs = np.where(home_bats_first, second_total, first_total)
+    home_overs = np.where(home_bats_first, OVERS_PER_INNINGS, second_overs)
+    away_overs = np.where(home_bats_first, second_overs, OVERS_PER_INNINGS)
+    return home_runs, home_overs, away_runs, away_overs
+
+def sample_season(season: Season, simulations: int, rng: np.random.Generator) -> SeasonSample:
+    """
+    Sample the outcome of every remaining match for every simulation
+
+    All random draws are made up front: the result, who bats first, the first-innings
+    total, the winning margin and the balls a successful chase has to spare. Win
+    probabilities depend on the simulated standings at the time of each match, so
+    fixtures are resolved in order, each vectorized across all simulations, with
+    points and run totals kept running and net run rate refreshed only for the two
+    teams of the fixture.
+
+    Args:
+        season: Current league totals and remaining fixtures
+        simulations: Number of simulations to sample
+        rng: Random number generator
+
+    Returns:
+        Sampled season
+    """
+    home_idx, away_idx = season.home_idx, season.away_idx
+    n_matches = len(home_idx)
+
+    # Draws are laid out fixture-major, so each fixture below reads contiguous rows,
+    # and innings are drawn in single precision and transformed in place to limit memory traffic
+    shape = (n_matches, simulations)
+    outcome_draws = rng.random(shape, dtype=np.float32)
+    home_bats_first = rng.random(shape, dtype=np.float32) < 0.5
+
+    first_total = rng.standard_normal(shape, dtype=np.float32)
+    first_total *= np.float32(season.innings_sd)
+    first_total += np.where(
+        home_bats_first,
+        season.home_first_mean.astype(np.float32)[:, None],
+        season.away_first_mean.astype(np.float32)[:, None]
+    )
+    np.clip(np.rint(first_total, out=first_total), MIN_FIRST_INNINGS_SCORE, MAX_FIRST_INNINGS_SCORE, out=first_total)
+
+    run_margin = rng.standard_exponential(shape, dtype=np.float32)
+    run_margin *= np.float32(max(season.run_margin_mean - 1, 1))
+    np.floor(run_margin, out=run_margin)
+    run_margin += 1
+    np.minimum(run_margin, first_total - 1, out=run_margin)
+
+    balls_remaining = rng.standard_exponential(shape, dtype=np.float32)
+    balls_remaining *= np.float32(max(season.balls_remaining_mean, 1))
+    np.floor(balls_remaining, out=balls_remaining)
+    np.minimum(balls_remaining, BALLS_PER_INNINGS - 1, out=balls_remaining)
+    playoff_draws = rng.random((simulations, 4))
+
+    # Running league state, team-major; net run rate is only refreshed for the two sides of each fixture
+    def running(values: np.ndarray) -> np.ndarray:
+        return np.repeat(values.astype(np.float32)[:, None], simulations, axis=1)
+
+    sim_points = running(season.points)
+    runs_for = running(season.runs_for)
+    overs_for = running(season.overs_for)
+    runs_against = running(season.runs_against)
+    overs_against = running(season.overs_against)
+    nrr = running(season.nrr)
+    home_wins = np.empty(shape, dtype=bool)
+
+    for j in range(n_matches):
+        home, away = home_idx[j], away_idx[j]
+        won = outcome_draws[j] < home_win_probability(sim_points[home] + nrr[home], sim_points[away] + nrr[away])
+        home_wins[j] = won
+
+        home_runs, home_overs, away_runs, away_overs = resolve_innings(
+            won, home_bats_first[j], first_total[j], run_margin[j], balls_remaining[j]
+        )
+        sim_points[home] += 2 * won
+        sim_points[away] += 2 * ~won
+        runs_for[home] += home_runs
+        overs_for[home] += home_overs
+        runs_against[home] += away_runs
+        overs_against[home] += away_overs
+        runs_for[away] += away_runs
+        overs_for[away] += away_overs
+        runs_against[away] += home_runs
+        overs_against[away] += home_overs
+        for team in (home, away):
+            nrr[team] = net_run_rate(runs_for[team], overs_for[team], runs_against[team], overs_against[team])
+
+    # Samples are (sims, matches) views of the fixture-major arrays
+    return SeasonSample(home_wins.T, home_bats_first.T, first_total.T, run_margin.T, balls_remaining.T, playoff_draws)
+
+def tabulate_season(season: Season, sample: SeasonSample) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute final league standings for a sampled season
+
+    Net run rate is recomputed from cumulative runs and overs for and against.
+
+    Args:
+        season: Current league totals and remaining fixtures
+        sample: Sampled season
+
+    Returns:
+        Tuple of (sims x teams) final points and net run rates
+    """
+    home, away = fixture_matrices(season.home_idx, season.away_idx, len(season.points))
+    home_wins = sample.home_wins.astype(float)
+    home_runs, home_overs, away_runs, away_overs = resolve_innings(
+        sample.home_wins, sample.home_bats_first, sample.first_total,
+        sample.run_margin, sample.balls_remaining
+    )
+
+    final_points = season.points + 2 * (home_wins @ home + (1 - home_wins) @ away)
+    final_nrr = net_run_rate(
+        season.runs_for + home_runs @ home + away_runs @ away,
+        season.overs_for + home_overs @ home + away_overs @ away,
+        season.runs_against + away_runs @ home + home_runs @ away,
+        season.overs_against + away_overs @ home + home_overs @ away
+    )
+    return final_points, final_nrr
+
+def rank_teams(points: np.ndarray, nrr: np.ndarray) -> np.ndarray:
+    """Order team indices of each simulation by points, then net run rate, best first"""
+    return np.lexsort((-nrr, -points), axis=-1)
+
+def simulate_playoffs(
+    points: np.ndarray,
+    nrr: np.ndarray,
+    ranking: np.ndarray,
+    draws: np.ndarray
+) -> np.ndarray:
+    """
+    Play the Qualifier 1 / Eliminator / Qualifier 2 / Final bracket for every simulation
+
+    Args:
+        points: (sims x teams) final points
+        nrr: (sims x teams) final net run rates
+        ranking: (sims x teams) team indices ordered best first
+        draws: (sims x 4) uniforms for the four playoff matches
+
+    Returns:
+        Team index of the champion of each simulation
+    """
+    strength = points + nrr
+
+    def play(team1: np.ndarray, team2: np.ndarray, draw: np.ndarray) -> np.ndarray:
+        strength1 = np.take_along_axis(strength, team1[:, None], axis=1)[:, 0]
+        strength2 = np.take_along_axis(strength, team2[:, None], axis=1)[:, 0]
+        return np.where(draw < head_to_head_probability(strength1, strength2), team1, team2)
+
+    first, second, third, fourth = (ranking[:, i] for i in range(PLAYOFF_SPOTS))
+
+    # Qualifier 1: 1st vs 2nd
+    q1_winner = play(first, second, draws[:, 0])
+    q1_loser = np.where(q1_winner == first, second, first)
+
+    # Eliminator: 3rd vs 4th
+    eliminator_winner = play(third, fourth, draws[:, 1])
+
+    # Qualifier 2: Loser of Q1 vs Winner of Eliminator
+    q2_winner = play(q1_loser, eliminator_winner, draws[:, 2])
+
+    # Final: Winner of Q1 vs Winner of Q2
+    return play(q1_winner, q2_winner, draws[:, 3])
+
+def count_outcomes(season: Season, sample: SeasonSample) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Count playoff appearances and championships per team for a sampled season
+
+    Returns:
+        Tuple of playoff appearance and championship counts per team
+    """
+    n_teams = len(season.points)
+    final_points, final_nrr = tabulate_season(season, sample)
+    ranking = rank_teams(final_points, final_nrr)
+
+    playoff_counts = np.bincount(ranking[:, :PLAYOFF_SPOTS].ravel(), minlength=n_teams)
+    if n_teams < PLAYOFF_SPOTS:
+        return playoff_counts, np.zeros(n_teams, dtype=int)
+
+    champions = simulate_playoffs(final_points, final_nrr, ranking, sample.playoff_draws)
+    return playoff_counts, np.bincount(champions, minlength=n_teams)
+
+def force_outcomes(
+    sample: SeasonSample,
+    columns: np.ndarray,
+    home_won: np.ndarray,
+    run_margins: np.ndarray,
+    balls_remaining: np.ndarray
+) -> SeasonSample:
+    """
+    Copy a sampled season with some matches forced to a given result
+
+    All other sampled outcomes are re-used as they are. A known run margin means
+    the winner batted first; known balls to spare mean the winner chased.
+
+    Args:
+        sample: Sampled season
+        columns: Fixture column of each forced match
+        home_won: Whether the home side wins each forced match
+        run_margins: Winning run margin of each forced match, NaN if not given
+        balls_remaining: Balls to spare in each forced match, NaN if not given
+
+    Returns:
+        Sampled season with the forced results applied
+    """
+    forced = SeasonSample(
+        sample.home_wins.copy(),
+        sample.home_bats_first.copy(),
+        sample.first_total,
+        sample.run_margin.copy(),
+        sample.balls_remaining.copy(),
+        sample.playoff_draws
+    )
+
+    for column, won, margin, balls in zip(columns, home_won, run_margins, balls_remaining):
+        forced.home_wins[:, column] = won
+        if not np.isnan(margin):
+            forced.home_bats_first[:, column] = won
+            forced.run_margin[:, column] = np.minimum(margin, sample.first_total[:, column] - 1)
+        elif not np.isnan(balls):
+            forced.home_bats_first[:, column] = not won
+            forced.balls_remaining[:, column] = min(balls, BALLS_PER_INNINGS - 1)
+
+    return forced
+
+def run_simulations(
+    season: Season,
+    simulations: int,
+    rng: Optional[np.random.Generator] = None,
+    batch_size: int = BATCH_SIZE
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simulate the remainder of the season in batches
+
+    Args:
+        season: Current league totals and remaining fixtures
+        simulations: Number of simulations to run
+        rng: Random number generator, a fresh unseeded one if not given
+        batch_size: Maximum number of simulations held in memory at once
+
+    Returns:
+        Tuple of playoff appearance and championship counts per team
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    playoff_counts = np.zeros(len(season.points), dtype=int)
+    championship_counts = np.zeros(len(season.points), dtype=int)
+
+    for start in range(0, simulations, batch_size):
+        size = min(batch_size, simulations - start)
+        sample = sample_season(season, size, rng)
+        batch_playoffs, batch_championships = count_outcomes(season, sample)
+        playoff_counts += batch_playoffs
+        championship_counts += batch_championships
+
+    return playoff_counts, championship_counts
+
+def _simulate_chunk(args: Tuple[Season, int, np.random.SeedSequence]) -> Tuple[np.ndarray, np.ndarray]:
+    """Run one chunk of simulations with its own generator (process pool entry point)"""
+    season, simulations, seed_sequence = args
+    rng = np.random.default_rng(seed_sequence)
+    return run_simulations(season, simulations, rng)
+
+def _simulate_chunks(chunks: List[Tuple[Season, int, np.random.SeedSequence]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Run several chunks of simulations and add up their counts (process pool entry point)"""
+    results = [_simulate_chunk(chunk) for chunk in chunks]
+    return sum(playoffs for playoffs, _ in results), sum(championships for _, championships in results)
+
+def get_pool() -> ProcessPoolExecutor:
+    """Shared simulation process pool, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _pool
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a pool whose workers died, so the next run starts a fresh one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+
+def shutdown_pool() -> None:
+    """Stop the shared simulation process pool, if it was started"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+def run_parallel_simulations(
+    season: Season,
+    simulations: int,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Simulate the remainder of the season across the shared process pool
+
+    The simulations are split into fixed-size chunks, each with a generator spawned
+    from a single SeedSequence. Counts for a given seed are therefore identical
+    whatever the number of workers. Chunks are dealt out to one task per worker,
+    so a run keeps at most that many of the pool's processes busy.
+
+    Args:
+        season: Current league totals and remaining fixtures
+        simulations: Number of simulations to run
+        workers: Number of worker processes, 1 runs every chunk in-process
+        seed: Root seed, a random 32-bit seed if not given
+        chunk_size: Number of simulations per seeded chunk
+
+    Returns:
+        Tuple of playoff appearance counts, championship counts and the root seed used
+    """
+    if seed is None:
+        seed = secrets.randbits(32)
+    seed_sequence = np.random.SeedSequence(seed)
+    sizes = [min(chunk_size, simulations - start) for start in range(0, simulations, chunk_size)]
+    chunks = [(season, size, child) for size, child in zip(sizes, seed_sequence.spawn(len(sizes)))]
+
+    workers = max(1, min(workers, len(chunks), os.cpu_count() or 1))
+    if workers == 1:
+        results: List[Tuple[np.ndarray, np.ndarray]] = [_simulate_chunk(chunk) for chunk in chunks]
+    else:
+        pool = get_pool()
+        try:
+            results = list(pool.map(_simulate_chunks, [chunks[i::workers] for i in range(workers)]))
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            raise
+
+    playoff_counts = np.zeros(len(season.points), dtype=int)
+    championship_counts = np.zeros(len(season.points), dtype=int)
+    for chunk_playoffs, chunk_championships in results:
+        playoff_counts += chunk_playoffs
+        championship_counts += chunk_championships
+
+    return playoff_counts, championship_counts, seed
+
+def wilson_interval(
+    successes: np.ndarray,
+    trials: int,
+    z: float = WILSON_Z
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Wilson score confidence interval of a binomial proportion
+
+    Args:
+        successes: Number of successes per team
+        trials: Number of trials
+        z: Normal quantile of the confidence level
+
+    Returns:
+        Tuple of lower and upper bounds per team
+    """
+    p = successes / trials
+    denominator = 1 + z ** 2 / trials
+    centre = (p + z ** 2 / (2 * trials)) / denominator
+    half_width = z * np.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+    return centre - half_width, centre + half_width
+
+class AdaptiveProgress(NamedTuple):
+    """Running totals of an adaptive simulation after one batch"""
+    simulations: int
+    playoff_counts: np.ndarray
+    championship_counts: np.ndarray
+    converged: bool
+
+def iter_adaptive_simulations(
+    season: Season,
+    tolerance: float,
+    max_simulations: int,
+    seed: int,
+    batch_size: int = ADAPTIVE_BATCH_SIZE
+) -> Iterator[AdaptiveProgress]:
+    """
+    Simulate the remainder of the season in batches until the estimates are precise enough
+
+    After every batch the Wilson interval of each team's playoff and championship
+    probability is checked, and the run stops once all of them are narrower than
+    tolerance, or after max_simulations. Every batch gets its own generator spawned
+    from the seed, so a seeded run reproduces the same sequence of estimates.
+
+    Args:
+        season: Current league totals and remaining fixtures
+        tolerance: Largest acceptable interval width, as a probability
+        max_simulations: Upper bound on the number of simulations
+        seed: Root seed
+        batch_size: Simulations added between convergence checks
+
+    Yields:
+        Running totals after each batch, the last one marks whether the run converged
+    """
+    n_batches = -(-max_simulations // batch_size)
+    playoff_counts = np.zeros(len(season.points), dtype=int)
+    championship_counts = np.zeros(len(season.points), dtype=int)
+    simulations = 0
+
+    for child in np.random.SeedSequence(seed).spawn(n_batches):
+        size = min(batch_size, max_simulations - simulations)
+        batch_playoffs, batch_championships = run_simulations(season, size, np.random.default_rng(child))
+        playoff_counts += batch_playoffs
+        championship_counts += batch_championships
+        simulations += size
+
+        playoff_low, playoff_high = wilson_interval(playoff_counts, simulations)
+        championship_low, championship_high = wilson_interval(championship_counts, simulations)
+        width = max(
+            (playoff_high - playoff_low).max(initial=0.0),
+            (championship_high - championship_low).max(initial=0.0)
+        )
+        converged = bool(simulations >= MIN_ADAPTIVE_SIMULATIONS and width <= tolerance)
+        yield AdaptiveProgress(simulations, playoff_counts.copy(), championship_counts.copy(), converged)
+        if converged:
+            return
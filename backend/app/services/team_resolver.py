@@ -0,0 +1,76 @@
+from typing import Any, Dict, Iterable, NamedTuple, Optional
+import re
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+# Former names of franchises that were renamed, mapped to their current name.
+# Both resolve to the same team, whichever of the two names it is stored under.
+FRANCHISE_ALIASES = {
+    "Delhi Daredevils": "Delhi Capitals",
+    "Kings XI Punjab": "Punjab Kings",
+    "Royal Challengers Bangalore": "Royal Challengers Bengaluru",
+    "Rising Pune Supergiants": "Rising Pune Supergiant"
+}
+
+def normalize_name(name: str) -> str:
+    """Lower-case a team name and reduce it to words, so spelling variants compare equal"""
+    return " ".join(re.findall(r"[a-z0-9]+", name.replace("&", " and ").lower()))
+
+_CANONICAL_NAMES = {normalize_name(old): normalize_name(new) for old, new in FRANCHISE_ALIASES.items()}
+
+def team_key(name: str) -> str:
+    """Normalized current franchise name of a team name"""
+    key = normalize_name(name)
+    return _CANONICAL_NAMES.get(key, key)
+
+class ResolvedTeam(NamedTuple):
+    """Identity of a team, detached from the session so commits don't expire it"""
+    id: int
+    name: str
+    team_code: str
+
+class TeamResolver:
+    """
+    Every team of the database held in memory, looked up by name, alias or code
+
+    Loaded once per ingestion run and shared by its stages, so feed rows
+    resolve their teams without a query each. Teams created during the run
+    must be registered with add.
+    """
+
+    def __init__(self, teams: Iterable[Any]):
+        self._by_key: Dict[str, ResolvedTeam] = {}
+        self._by_code: Dict[str, ResolvedTeam] = {}
+        for team in teams:
+            self.add(team)
+
+    @classmethod
+    def load(cls, db: Session) -> "TeamResolver":
+        """Load every team with a single query"""
+        return cls(db.query(models.Team.id, models.Team.name, models.Team.team_code).order_by(models.Team.id).all())
+
+    def add(self, team: Any) -> None:
+        """Register a team, or a row with its id, name and team_code; an earlier team keeps a name or code both share"""
+        team = ResolvedTeam(team.id, team.name, team.team_code)
+        if team.name:
+            self._by_key.setdefault(team_key(team.name), team)
+        if team.team_code:
+            self._by_code.setdefault(team.team_code.upper(), team)
+
+    def resolve(self, name: Optional[str]) -> Optional[ResolvedTeam]:
+        """
+        Find a team by name, former franchise name or team code
+
+        Args:
+            name: Team name or code as written in a feed
+
+        Returns:
+            Matching team, None if there is none
+        """
+        if not name:
+            return None
+        team = self._by_key.get(team_key(name))
+        if team is None:
+            team = self._by_code.get(name.strip().upper()) or self._by_code.get(name.replace(" ", "").upper())
+        return team
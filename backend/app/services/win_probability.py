@@ -0,0 +1,274 @@
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Tuple
+from pathlib import Path
+import json
+import numpy as np
+
+from app.core.config import settings
+from app.utils.cricsheet import CricsheetDelivery, CricsheetMatch
+
+# Table dimensions: balls remaining, wickets lost and runs (scored or still needed)
+BALLS_PER_INNINGS = 120
+MAX_WICKETS = 10
+MAX_SCORE = 300
+MAX_RUNS_NEEDED = MAX_SCORE + 1
+
+# Runs off a single legal ball, including wides and no-balls bowled before it, are capped here
+MAX_BALL_RUNS = 8
+
+# Pseudo-counts that pull sparse ball-outcome cells towards the per-over average,
+# and venue effects towards zero
+OUTCOME_PRIOR_BALLS = 200
+VENUE_PRIOR_MATCHES = 10
+
+# Name of the table directory in the model registry
+TABLE_NAME = "win_probability"
+
+class WinProbabilityTable(NamedTuple):
+    """Dense in-play win probabilities of the batting side"""
+    first_innings: np.ndarray       # (balls remaining, wickets lost, score)
+    chase: np.ndarray               # (balls remaining, wickets lost, runs needed)
+    venue_offsets: Dict[str, float] # Per-venue first-innings par relative to the league, in runs
+
+# Table loaded once per worker at startup
+_table: Optional[WinProbabilityTable] = None
+
+def _ball_events(deliveries: Iterable[CricsheetDelivery]) -> List[Tuple[int, int]]:
+    """
+    Collapse deliveries into legal-ball events of (runs, wicket)
+
+    Runs from wides and no-balls are carried onto the next legal ball, so every
+    event consumes exactly one ball of the innings.
+    """
+    events = []
+    carried_runs = 0
+    for delivery in deliveries:
+        if not delivery.legal:
+            carried_runs += delivery.runs
+            continue
+        events.append((min(carried_runs + delivery.runs, MAX_BALL_RUNS), int(delivery.is_wicket)))
+        carried_runs = 0
+    return events
+
+def _count_outcomes(matches: Iterable[CricsheetMatch]) -> Tuple[np.ndarray, Dict[str, List[int]]]:
+    """Ball-outcome counts per (over, wickets lost, runs, wicket) and first-innings totals per venue"""
+    counts = np.zeros((BALLS_PER_INNINGS // 6, MAX_WICKETS, MAX_BALL_RUNS + 1, 2))
+    venue_totals: Dict[str, List[int]] = {}
+
+    for match in matches:
+        # Shortened and rain-affected matches would distort the full-length tables
+        if match.overs != 20 or match.method:
+            continue
+
+        for number, innings in enumerate(match.innings[:2]):
+            events = _ball_events(innings.deliveries)
+            total, wickets = 0, 0
+            for ball, (runs, wicket) in enumerate(events[:BALLS_PER_INNINGS]):
+                if wickets >= MAX_WICKETS:
+                    break
+                counts[ball // 6, wickets, runs, wicket] += 1
+                total += runs
+                wickets += wicket
+            if number == 0:
+                venue_totals.setdefault(match.venue, []).append(total)
+
+    return counts, venue_totals
+
+def _outcome_probabilities(counts: np.ndarray) -> np.ndarray:
+    """Smoothed ball-outcome distribution per (over, wickets lost)"""
+    per_over = counts.sum(axis=1, keepdims=True)
+    per_over_share = per_over / np.maximum(per_over.sum(axis=(2, 3), keepdims=True), 1)
+    smoothed = counts + OUTCOME_PRIOR_BALLS * per_over_share
+    return smoothed / np.maximum(smoothed.sum(axis=(2, 3), keepdims=True), 1e-12)
+
+def build_table(matches: Iterable[CricsheetMatch]) -> WinProbabilityTable:
+    """
+    Build the win-probability tables from historical Cricsheet matches
+
+    Ball outcomes are estimated per over and wickets lost, then win probabilities
+    for every state follow from a backward pass over the balls of the innings:
+    first the chase table, whose start-of-innings row gives the value of every
+    first-innings total, then the first-innings table.
+
+    Args:
+        matches: Historical Cricsheet match records
+
+    Returns:
+        Win-probability table
+    """
+    counts, venue_totals = _count_outcomes(matches)
+    if counts.sum() == 0:
+        raise ValueError("No usable deliveries to build the win-probability table from")
+    probabilities = _outcome_probabilities(counts)
+    outcomes = [(runs, wicket) for runs in range(MAX_BALL_RUNS + 1) for wicket in (0, 1)]
+
+    # Chase: runs needed 0 is a win, 1 at the end of the innings is a tie
+    chase_end = np.zeros(MAX_RUNS_NEEDED + 1)
+    chase_end[0], chase_end[1] = 1.0, 0.5
+    chase = np.empty((BALLS_PER_INNINGS + 1, MAX_WICKETS + 1, MAX_RUNS_NEEDED + 1))
+    chase[0] = chase_end
+    needed = np.arange(MAX_RUNS_NEEDED + 1)
+    for balls in range(1, BALLS_PER_INNINGS + 1):
+        over = (BALLS_PER_INNINGS - balls) // 6
+        previous = chase[balls - 1]
+        current = np.zeros_like(previous)
+        for runs, wicket in outcomes:
+            p = probabilities[over, :, runs, wicket][:, None]
+            current[:MAX_WICKETS] += p * previous[wicket:wicket + MAX_WICKETS][:, np.maximum(needed - runs, 0)]
+        current[MAX_WICKETS] = chase_end
+        current[:, 0] = 1.0
+        chase[balls] = current
+
+    # First innings: at the end, the side batting first wins unless the full chase succeeds
+    score = np.arange(MAX_SCORE + 1)
+    first_end = 1 - chase[BALLS_PER_INNINGS, 0, score + 1]
+    first_innings = np.empty((BALLS_PER_INNINGS + 1, MAX_WICKETS + 1, MAX_SCORE + 1))
+    first_innings[0] = first_end
+    for balls in range(1, BALLS_PER_INNINGS + 1):
+        over = (BALLS_PER_INNINGS - balls) // 6
+        previous = first_innings[balls - 1]
+        current = np.zeros_like(previous)
+        for runs, wicket in outcomes:
+            p = probabilities[over, :, runs, wicket][:, None]
+            current[:MAX_WICKETS] += p * previous[wicket:wicket + MAX_WICKETS][:, np.minimum(score + runs, MAX_SCORE)]
+        current[MAX_WICKETS] = first_end
+        first_innings[balls] = current
+
+    # Sparse cells (few wickets down late in an innings) can leave small inversions.
+    # Losing a wicket never helps, nor do extra runs needed or fewer runs scored.
+    chase = np.minimum.accumulate(np.minimum.accumulate(chase, axis=1), axis=2)
+    first_innings = np.maximum.accumulate(np.minimum.accumulate(first_innings, axis=1), axis=2)
+
+    all_totals = [total for totals in venue_totals.values() for total in totals]
+    league_mean = float(np.mean(all_totals)) if all_totals else 0.0
+    venue_offsets = {
+        venue: float(np.sum(np.asarray(totals) - league_mean) / (len(totals) + VENUE_PRIOR_MATCHES))
+        for venue, totals in venue_totals.items()
+    }
+
+    return WinProbabilityTable(first_innings.astype(np.float32), chase.astype(np.float32), venue_offsets)
+
+def _table_dir() -> Path:
+    return Path(settings.MODEL_REGISTRY_DIR) / TABLE_NAME
+
+def save_table(table: WinProbabilityTable) -> Path:
+    """
+    Write the table to the model registry as .npy arrays plus venue offsets
+
+    Args:
+        table: Win-probability table
+
+    Returns:
+        Directory the table was written to
+    """
+    directory = _table_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    np.save(directory / "first_innings.npy", table.first_innings)
+    np.save(directory / "chase.npy", table.chase)
+    (directory / "venues.json").write_text(json.dumps(table.venue_offsets, indent=2))
+    return directory
+
+def load_table() -> Optional[WinProbabilityTable]:
+    """Memory-map the table from the model registry for this worker, None if it was never built"""
+    global _table
+    directory = _table_dir()
+    if not (directory / "chase.npy").exists():
+        _table = None
+        return None
+    _table = WinProbabilityTable(
+        np.load(directory / "first_innings.npy", mmap_mode="r"),
+        np.load(directory / "chase.npy", mmap_mode="r"),
+        json.loads((directory / "venues.json").read_text())
+    )
+    return _table
+
+def get_table() -> Optional[WinProbabilityTable]:
+    """Table loaded at startup, None if it was never built"""
+    return _table
+
+def overs_to_balls(overs: float) -> int:
+    """Convert overs in cricket notation (12.3 = 12 overs and 3 balls) to balls"""
+    whole = int(overs)
+    return whole * 6 + int(round((overs - whole) * 10))
+
+def batting_side_probability(
+    table: WinProbabilityTable,
+    innings: int,
+    balls_remaining: int,
+    wickets: int,
+    runs: int,
+    venue: Optional[str] = None
+) -> float:
+    """
+    Win probability of the batting side from the table
+
+    At higher-scoring venues, runs already scored are worth less in the first
+    innings and runs still needed are easier to get in the chase.
+
+    Args:
+        table: Win-probability table
+        innings: 1 or 2
+        balls_remaining: Legal balls left in the innings
+        wickets: Wickets lost
+        runs: Current score in the first innings, runs needed to win in the second
+        venue: Venue of the match
+
+    Returns:
+        Probability that the batting side wins
+    """
+    balls = min(max(balls_remaining, 0), BALLS_PER_INNINGS)
+    wickets = min(max(wickets, 0), MAX_WICKETS)
+    offset = table.venue_offsets.get(venue or "", 0.0)
+
+    if innings == 1:
+        elapsed = (BALLS_PER_INNINGS - balls) / BALLS_PER_INNINGS
+        score = min(max(int(round(runs - offset * elapsed)), 0), MAX_SCORE)
+        return float(table.first_innings[balls, wickets, score])
+
+    if runs <= 0:
+        return 1.0
+    needed = min(max(int(round(runs - offset * balls / BALLS_PER_INNINGS)), 1), MAX_RUNS_NEEDED)
+    return float(table.chase[balls, wickets, needed])
+
+def batting_side_probabilities(
+    table: WinProbabilityTable,
+    innings: np.ndarray,
+    balls_remaining: np.ndarray,
+    wickets: np.ndarray,
+    runs: np.ndarray,
+    venue_offsets: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized batting_side_probability over many match states at once
+
+    Args:
+        table: Win-probability table
+        innings: 1 or 2 per state
+        balls_remaining: Legal balls left in the innings per state
+        wickets: Wickets lost per state
+        runs: Current score in the first innings, runs needed to win in the second, per state
+        venue_offsets: Venue offset of each state's match, in runs
+
+    Returns:
+        Probability that the batting side wins, per state
+    """
+    balls = np.clip(balls_remaining, 0, BALLS_PER_INNINGS).astype(np.intp)
+    wickets = np.clip(wickets, 0, MAX_WICKETS).astype(np.intp)
+    remaining = balls / BALLS_PER_INNINGS
+
+    score = np.clip(np.rint(runs - venue_offsets * (1 - remaining)), 0, MAX_SCORE).astype(np.intp)
+    needed = np.clip(np.rint(runs - venue_offsets * remaining), 1, MAX_RUNS_NEEDED).astype(np.intp)
+
+    first = np.asarray(table.first_innings[balls, wickets, score])
+    chase = np.where(runs <= 0, 1.0, table.chase[balls, wickets, needed])
+    return np.where(innings == 1, first, chase).astype(np.float64)
+
+def main() -> None:
+    """Build the table from the Cricsheet archive and write it to the registry"""
+    from app.utils.data_fetcher import download_cricsheet_data, run_with_session
+
+    matches = run_with_session(download_cricsheet_data())
+    directory = save_table(build_table(matches))
+    print(f"Saved {TABLE_NAME} table to {directory}")
+
+if __name__ == "__main__":
+    main()
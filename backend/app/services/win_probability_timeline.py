@@ -0,0 +1,280 @@
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+import sys
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.services import win_probability
+from app.services.match_service import batting_first_team_id
+
+# One packed record per delivery, 9 bytes each
+TIMELINE_DTYPE = np.dtype([
+    ("innings", "u1"),
+    ("balls", "u1"),        # Legal balls bowled in the innings
+    ("runs", "u2"),         # Batting side's score
+    ("wickets", "u1"),
+    ("home_probability", "<f4")
+])
+
+DELIVERY_COLUMNS = ["id", "match_id", "innings_number", "over_number", "ball_number", "runs_scored", "is_wicket"]
+
+class MatchContext(NamedTuple):
+    """What the timeline computation needs to know about a match besides its deliveries"""
+    home_bats_first: bool
+    venue_offset: float
+    first_innings_total: Optional[int]  # Known total, if the deliveries don't cover innings 1
+    start: Dict[int, Tuple[int, int]]   # Runs and wickets per innings before the deliveries
+
+def _match_context(
+    match: models.Match,
+    table: win_probability.WinProbabilityTable,
+    batting_first_id: Optional[int],
+    points: Optional[np.ndarray] = None
+) -> MatchContext:
+    """Context of a match, continuing from its stored timeline points if given"""
+    start: Dict[int, Tuple[int, int]] = {}
+    first_innings_total = match.first_innings_score
+    if points is not None:
+        for innings in (1, 2):
+            innings_points = points[points["innings"] == innings]
+            if len(innings_points):
+                start[innings] = (int(innings_points["runs"][-1]), int(innings_points["wickets"][-1]))
+        if 1 in start:
+            first_innings_total = start[1][0]
+    return MatchContext(
+        home_bats_first=(batting_first_id or batting_first_team_id(match)) == match.home_team_id,
+        venue_offset=table.venue_offsets.get(match.venue or "", 0.0),
+        first_innings_total=first_innings_total,
+        start=start
+    )
+
+def compute_points(
+    table: win_probability.WinProbabilityTable,
+    deliveries: pd.DataFrame,
+    contexts: Dict[int, MatchContext]
+) -> Dict[int, np.ndarray]:
+    """
+    Win probability after every delivery of many matches in one pass
+
+    Running scores and wickets come from grouped cumulative sums, and all the
+    probabilities from a single vectorized table lookup.
+
+    Args:
+        table: Win-probability table
+        deliveries: Commentary rows with DELIVERY_COLUMNS, in match and ball order
+        contexts: Context of every match in deliveries
+
+    Returns:
+        Dictionary mapping match ID to its TIMELINE_DTYPE records
+    """
+    deliveries = deliveries[deliveries["match_id"].isin(list(contexts)) & deliveries["innings_number"].isin([1, 2])]
+    if deliveries.empty:
+        return {}
+
+    match_ids = deliveries["match_id"].to_numpy()
+    innings = deliveries["innings_number"].to_numpy().astype(np.int64)
+    runs = deliveries["runs_scored"].fillna(0).to_numpy().astype(np.int64)
+    wicket = deliveries["is_wicket"].fillna(False).to_numpy().astype(np.int64)
+    balls = (
+        np.floor(deliveries["over_number"].fillna(0).to_numpy()).astype(np.int64) * 6
+        + np.clip(deliveries["ball_number"].fillna(0).to_numpy().astype(np.int64), 0, 6)
+    )
+
+    groups = [match_ids, innings]
+    total = pd.Series(runs).groupby(groups).cumsum().to_numpy()
+    wickets = pd.Series(wicket).groupby(groups).cumsum().to_numpy()
+
+    # Continue from stored points for incremental appends
+    if any(context.start for context in contexts.values()):
+        starts = np.array([contexts[m].start.get(i, (0, 0)) for m, i in zip(match_ids, innings)])
+        total, wickets = total + starts[:, 0], wickets + starts[:, 1]
+    wickets = np.minimum(wickets, win_probability.MAX_WICKETS)
+
+    # Chase targets, from the deliveries of the first innings where available
+    first_totals = {match_id: context.first_innings_total for match_id, context in contexts.items()}
+    first_innings = innings == 1
+    last_first = pd.Series(total[first_innings]).groupby(match_ids[first_innings]).last()
+    first_totals.update(last_first.to_dict())
+    target = np.array([first_totals.get(match_id) for match_id in match_ids], dtype=float)
+
+    # The chase can't be scored without knowing the target
+    known = first_innings | ~np.isnan(target)
+    needed = np.where(first_innings, total, np.nan_to_num(target) + 1 - total)
+
+    home_bats_first = np.array([contexts[match_id].home_bats_first for match_id in match_ids])
+    offsets = np.array([contexts[match_id].venue_offset for match_id in match_ids])
+    probability = win_probability.batting_side_probabilities(
+        table, innings, win_probability.BALLS_PER_INNINGS - balls, wickets, needed, offsets
+    )
+    home_bats = home_bats_first == first_innings
+
+    records = np.empty(len(match_ids), dtype=TIMELINE_DTYPE)
+    records["innings"] = innings
+    records["balls"] = np.clip(balls, 0, win_probability.BALLS_PER_INNINGS)
+    records["runs"] = total
+    records["wickets"] = wickets
+    records["home_probability"] = np.where(home_bats, probability, 1 - probability)
+
+    records, match_ids = records[known], match_ids[known]
+    boundaries = np.flatnonzero(match_ids[1:] != match_ids[:-1]) + 1
+    return {
+        int(chunk_ids[0]): chunk
+        for chunk_ids, chunk in zip(np.split(match_ids, boundaries), np.split(records, boundaries))
+        if len(chunk)
+    }
+
+def _load_deliveries(db: Session, *criteria: Any) -> pd.DataFrame:
+    """Commentary rows matching the criteria, in match and ball order"""
+    rows = db.query(*(getattr(models.Commentary, column) for column in DELIVERY_COLUMNS)).filter(*criteria).order_by(
+        models.Commentary.match_id,
+        models.Commentary.innings_number,
+        models.Commentary.over_number,
+        models.Commentary.ball_number,
+        models.Commentary.id
+    ).all()
+    return pd.DataFrame(rows, columns=DELIVERY_COLUMNS)
+
+def _batting_first_ids(db: Session, match_ids: List[int]) -> Dict[int, int]:
+    """Team batting first of each match, where its first innings is recorded"""
+    return dict(db.query(models.Innings.match_id, models.Innings.batting_team_id).filter(
+        models.Innings.match_id.in_(match_ids),
+        models.Innings.innings_number == 1
+    ).all())
+
+def build_timelines(db: Session, season: Optional[str] = None) -> int:
+    """
+    Recompute the timelines of every completed and live match of a season
+
+    Args:
+        db: Database session
+        season: Season to process, all seasons if not given
+
+    Returns:
+        Number of matches with a timeline
+    """
+    table = win_probability.get_table()
+    if table is None:
+        raise ValueError("The win-probability table has not been built")
+
+    query = db.query(models.Match).filter(models.Match.match_status.in_(["Completed", "Live"]))
+    if season is not None:
+        query = query.filter(models.Match.season == season)
+    matches = {match.id: match for match in query.all()}
+    if not matches:
+        return 0
+
+    batting_first = _batting_first_ids(db, list(matches))
+    contexts = {
+        match_id: _match_context(match, table, batting_first.get(match_id))
+        for match_id, match in matches.items()
+    }
+    deliveries = _load_deliveries(db, models.Commentary.match_id.in_(list(matches)))
+    points = compute_points(table, deliveries, contexts)
+    last_ids = deliveries.groupby("match_id")["id"].max().to_dict() if not deliveries.empty else {}
+
+    db.query(models.WinProbabilityTimeline).filter(
+        models.WinProbabilityTimeline.match_id.in_(list(matches))
+    ).delete(synchronize_session=False)
+    db.add_all(
+        models.WinProbabilityTimeline(
+            match_id=match_id,
+            points=records.tobytes(),
+            deliveries=len(records),
+            last_commentary_id=int(last_ids[match_id])
+        )
+        for match_id, records in points.items()
+    )
+    db.flush()
+    return len(points)
+
+def append_deliveries(db: Session, match: models.Match) -> int:
+    """
+    Extend a match's timeline with the deliveries recorded since it was last updated
+
+    Args:
+        db: Database session
+        match: Live or just completed match
+
+    Returns:
+        Number of points appended
+    """
+    table = win_probability.get_table()
+    if table is None:
+        return 0
+
+    timeline = db.get(models.WinProbabilityTimeline, match.id)
+    last_commentary_id = timeline.last_commentary_id if timeline else 0
+    deliveries = _load_deliveries(
+        db,
+        models.Commentary.match_id == match.id,
+        models.Commentary.id > last_commentary_id
+    )
+    if deliveries.empty:
+        return 0
+
+    stored = np.frombuffer(timeline.points, dtype=TIMELINE_DTYPE) if timeline else None
+    context = _match_context(match, table, _batting_first_ids(db, [match.id]).get(match.id), stored)
+    records = compute_points(table, deliveries, {match.id: context}).get(match.id)
+
+    if timeline is None:
+        timeline = models.WinProbabilityTimeline(match_id=match.id, points=b"", deliveries=0)
+        db.add(timeline)
+    if records is not None:
+        timeline.points = timeline.points + records.tobytes()
+        timeline.deliveries = len(timeline.points) // TIMELINE_DTYPE.itemsize
+    timeline.last_commentary_id = int(deliveries["id"].max())
+    db.flush()
+    return 0 if records is None else len(records)
+
+def timeline_to_dict(match: models.Match, timeline: Optional[models.WinProbabilityTimeline]) -> Dict[str, Any]:
+    """Convert a stored timeline to a dictionary"""
+    records = np.frombuffer(timeline.points, dtype=TIMELINE_DTYPE) if timeline else np.empty(0, dtype=TIMELINE_DTYPE)
+    home_probability = records["home_probability"].astype(float).round(4)
+    return {
+        "match_id": match.id,
+        "home_team_id": match.home_team_id,
+        "away_team_id": match.away_team_id,
+        "match_status": match.match_status,
+        "points": [
+            {
+                "innings": int(innings),
+                "over": balls // 6 + (balls % 6) / 10,
+                "runs": int(runs),
+                "wickets": int(wickets),
+                "home_team_probability": home,
+                "away_team_probability": round(1 - home, 4)
+            }
+            for innings, balls, runs, wickets, home in zip(
+                records["innings"].tolist(),
+                records["balls"].tolist(),
+                records["runs"].tolist(),
+                records["wickets"].tolist(),
+                home_probability.tolist()
+            )
+        ],
+        "updated_at": timeline.updated_at.isoformat() if timeline and timeline.updated_at else None
+    }
+
+def main() -> None:
+    """Rebuild the timelines of one season, or of every season one at a time"""
+    from app.db.database import SessionLocal
+
+    if win_probability.load_table() is None:
+        raise SystemExit("Build the win-probability table first: python -m app.services.win_probability")
+
+    db = SessionLocal()
+    try:
+        if len(sys.argv) > 1:
+            seasons = sys.argv[1:]
+        else:
+            seasons = [season for (season,) in db.query(models.Match.season).distinct().all()]
+        for season in seasons:
+            count = build_timelines(db, season)
+            db.commit()
+            print(f"Season {season}: {count} timelines")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Tuple
+import argparse
+import os
+import time
+import yaml
+import zipfile
+
+from app.utils.jsonp import loads
+
+# libyaml's loader when PyYAML was built with it, several times faster than the pure-Python one
+C_YAML_LOADER = getattr(yaml, "CSafeLoader", None)
+
+# Extensions of the match files in Cricsheet's YAML and JSON archives
+MATCH_FILE_SUFFIXES = (".yaml", ".json")
+
+# Match files sent to a worker process at a time, and batches in flight per worker.
+# Together they bound how much of the archive is held in memory at once.
+PARSE_BATCH_FILES = 32
+BATCHES_PER_WORKER = 2
+
+class CricsheetDelivery(NamedTuple):
+    """One ball bowled, legal or not"""
+    over: int                   # Over of the innings, from 0
+    ball: int                   # Delivery of the over, from 1, counting wides and no-balls
+    batter: str
+    non_striker: str
+    bowler: str
+    batter_runs: int
+    extras: int                 # All extras, including the wides and no-balls below
+    wides: int
+    noballs: int
+    wicket_kind: Optional[str]  # How the player out was dismissed, None without a wicket
+    player_out: Optional[str]
+    fielder: Optional[str]
+
+    @property
+    def runs(self) -> int:
+        """Runs added to the total"""
+        return self.batter_runs + self.extras
+
+    @property
+    def is_wicket(self) -> bool:
+        """Whether a player was out off the delivery"""
+        return self.wicket_kind is not None or self.player_out is not None
+
+    @property
+    def legal(self) -> bool:
+        """Whether the delivery counts as a ball of the over"""
+        return not (self.wides or self.noballs)
+
+class CricsheetInnings(NamedTuple):
+    """Batting team and deliveries of one innings"""
+    team: str
+    deliveries: Tuple[CricsheetDelivery, ...]
+    super_over: bool
+
+class CricsheetMatch(NamedTuple):
+    """Details, result and deliveries of one match, the same for YAML and JSON files"""
+    source: str                  # Name of the file in the archive
+    date: date                   # First day of the match
+    teams: Tuple[str, ...]
+    venue: str
+    city: str
+    overs: int                   # Scheduled overs per innings
+    toss_winner: Optional[str]
+    toss_decision: Optional[str]
+    winner: Optional[str]
+    win_type: Optional[str]      # runs or wickets
+    win_margin: Optional[int]
+    result: Optional[str]        # tie or no result, None when there is a winner
+    method: Optional[str]        # D/L when the result was decided by a method
+    innings: Tuple[CricsheetInnings, ...]
+    people: Dict[str, str]       # Registry identifier of each person named in the match, empty in older files
+
+def _delivery(over: int, ball: int, data: Dict[str, Any]) -> CricsheetDelivery:
+    """Delivery record from a YAML or JSON delivery"""
+    runs = data.get("runs", {})
+    extras = data.get("extras") or {}
+
+    # YAML holds a single "wicket" object, JSON a list of "wickets"
+    wicket = data.get("wicket") or data.get("wickets")
+    if isinstance(wicket, list):
+        wicket = wicket[0]
+    fielder = None
+    if wicket and wicket.get("fielders"):
+        fielder = wicket["fielders"][0]
+        if isinstance(fielder, dict):
+            fielder = fielder.get("name")
+
+    return CricsheetDelivery(
+        over=over,
+        ball=ball,
+        batter=data.get("batter") or data.get("batsman", ""),
+        non_striker=data.get("non_striker", ""),
+        bowler=data.get("bowler", ""),
+        batter_runs=int(runs.get("batter", runs.get("batsman", 0))),
+        extras=int(runs.get("extras", 0)),
+        wides=int(extras.get("wides", 0)),
+        noballs=int(extras.get("noballs", 0)),
+        wicket_kind=wicket.get("kind") if wicket else None,
+        player_out=wicket.get("player_out") if wicket else None,
+        fielder=fielder
+    )
+
+def _innings(data: Dict[str, Any]) -> CricsheetInnings:
+    """Innings record from a YAML or JSON innings"""
+    if "overs" in data or "team" in data:
+        # JSON format: {"team": ..., "overs": [{"over": 0, "deliveries": [...]}]}
+        deliveries = tuple(
+            _delivery(over["over"], ball, delivery)
+            for over in data.get("overs", [])
+            for ball, delivery in enumerate(over.get("deliveries", []), 1)
+        )
+        return CricsheetInnings(data.get("team", ""), deliveries, bool(data.get("super_over")))
+
+    # YAML format: {"1st innings": {"team": ..., "deliveries": [{0.1: {...}}, ...]}}
+    name, body = next(iter(data.items()), ("", {}))
+    deliveries = []
+    over, ball = None, 0
+    for entry in body.get("deliveries", []):
+        key, delivery = next(iter(entry.items()))
+        ball = ball + 1 if int(key) == over else 1
+        over = int(key)
+        deliveries.append(_delivery(over, ball, delivery))
+    return CricsheetInnings(body.get("team", ""), tuple(deliveries), "super over" in str(name).lower())
+
+def _match_date(value: Any) -> date:
+    """Date of a match from YAML, where it is already a date, or JSON, where it is a string"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+def parse_match(data: Dict[str, Any], source: str = "") -> CricsheetMatch:
+    """
+    Compact record of a decoded Cricsheet match, from either its YAML or JSON format
+
+    Args:
+        data: Decoded match file
+        source: Name of the file, kept on the record for error messages
+
+    Returns:
+        Match record
+
+    Raises:
+        ValueError: If the match has no date
+    """
+    info = data.get("info", {})
+    dates = info.get("dates") or []
+    if not dates:
+        raise ValueError("Match without a date")
+    toss = info.get("toss") or {}
+    outcome = info.get("outcome") or {}
+    margin = outcome.get("by") or {}
+    win_type = next((kind for kind in ("runs", "wickets") if kind in margin), None)
+
+    return CricsheetMatch(
+        source=source,
+        date=_match_date(dates[0]),
+        teams=tuple(info.get("teams", [])),
+        venue=info.get("venue", ""),
+        city=info.get("city", ""),
+        overs=int(info.get("overs", 20)),
+        toss_winner=toss.get("winner"),
+        toss_decision=toss.get("decision"),
+        winner=outcome.get("winner"),
+        win_type=win_type,
+        win_margin=int(margin[win_type]) if win_type else None,
+        result=outcome.get("result"),
+        method=outcome.get("method"),
+        innings=tuple(_innings(innings) for innings in data.get("innings", [])),
+        people=dict((info.get("registry") or {}).get("people") or {})
+    )
+
+def parse_file(name: str, payload: bytes, c_loader: bool = True) -> Optional[CricsheetMatch]:
+    """
+    Decode and parse one match file of a Cricsheet archive
+
+    Args:
+        name: File name, whose extension gives the format
+        payload: Raw file contents
+        c_loader: Parse YAML with libyaml when it is available
+
+    Returns:
+        Match record, None if the file can't be parsed
+    """
+    try:
+        if name.endswith(".json"):
+            data = loads(payload)
+        else:
+            loader = C_YAML_LOADER if c_loader and C_YAML_LOADER is not None else yaml.SafeLoader
+            data = yaml.load(payload, Loader=loader)
+        return parse_match(data, name)
+    except (yaml.YAMLError, ValueError, TypeError, KeyError, AttributeError) as e:
+        print(f"Error parsing {name}: {e}")
+        return None
+
+def _parse_batch(args: Tuple[List[Tuple[str, bytes]], bool]) -> List[CricsheetMatch]:
+    """Parse a batch of match files (process pool entry point)"""
+    files, c_loader = args
+    return [match for match in (parse_file(name, payload, c_loader) for name, payload in files) if match is not None]
+
+def _read_batches(archive: zipfile.ZipFile, batch_files: int) -> Iterator[List[Tuple[str, bytes]]]:
+    """Raw contents of the archive's match files, batch_files at a time"""
+    batch = []
+    for member in archive.infolist():
+        if member.filename.endswith(MATCH_FILE_SUFFIXES):
+            batch.append((member.filename, archive.read(member)))
+            if len(batch) == batch_files:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+def iter_archive(archive_path: str, workers: int = 1, c_loader: bool = True) -> Iterator[CricsheetMatch]:
+    """
+    Parse the matches of a Cricsheet YAML or JSON archive, fanning files out to worker processes
+
+    Files are read from the zip in batches and parsed by a pool of workers, with
+    a few batches in flight per worker, so memory stays bounded however large
+    the archive. Matches are yielded in archive order.
+
+    Args:
+        archive_path: Path of the zip file
+        workers: Number of worker processes, 1 parses every file in-process
+        c_loader: Parse YAML with libyaml when it is available
+
+    Returns:
+        Iterator over the record of each match that could be parsed
+    """
+    workers = max(1, min(workers, os.cpu_count() or 1))
+    with zipfile.ZipFile(archive_path) as archive:
+        batches = ((batch, c_loader) for batch in _read_batches(archive, PARSE_BATCH_FILES))
+        if workers == 1:
+            for batch in batches:
+                yield from _parse_batch(batch)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for batch in batches:
+                pending.append(pool.submit(_parse_batch, batch))
+                if len(pending) >= workers * BATCHES_PER_WORKER:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+def benchmark(archive_paths: List[str], workers: int) -> List[Dict[str, Any]]:
+    """
+    Time parsing of local archives with each parser mode
+
+    YAML archives are parsed with the pure-Python and the libyaml loader, JSON
+    archives with the JSON decoder, each in-process and with the worker pool.
+
+    Args:
+        archive_paths: Cricsheet archives in either format
+        workers: Number of worker processes of the pooled modes
+
+    Returns:
+        One result per archive and mode, with files parsed per second
+    """
+    workers = max(1, min(workers, os.cpu_count() or 1))
+    results = []
+    for path in archive_paths:
+        with zipfile.ZipFile(path) as archive:
+            names = [member.filename for member in archive.infolist() if member.filename.endswith(MATCH_FILE_SUFFIXES)]
+        json_archive = bool(names) and all(name.endswith(".json") for name in names)
+
+        if json_archive:
+            loaders = [("json", True)]
+        else:
+            loaders = [("yaml-python", False)] + ([("yaml-libyaml", True)] if C_YAML_LOADER is not None else [])
+        for loader, c_loader in loaders:
+            for pool_size in dict.fromkeys((1, workers)):
+                started = time.perf_counter()
+                parsed = sum(1 for _ in iter_archive(path, pool_size, c_loader))
+                elapsed = time.perf_counter() - started
+                results.append({
+                    "archive": path,
+                    "mode": loader,
+                    "workers": pool_size,
+                    "files": len(names),
+                    "parsed": parsed,
+                    "seconds": elapsed,
+                    "files_per_second": len(names) / elapsed if elapsed else None
+                })
+    return results
+
+def main() -> None:
+    """Benchmark the parser modes on local Cricsheet archives"""
+    parser = argparse.ArgumentParser(description="Report files/sec of each Cricsheet parser mode on local archives")
+    parser.add_argument("archives", nargs="+", help="Cricsheet zip archives, YAML or JSON")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    for result in benchmark(args.archives, args.workers):
+        print(
+            f"{Path(result['archive']).name}: {result['mode']}, {result['workers']} worker(s), "
+            f"{result['parsed']}/{result['files']} files in {result['seconds']:.2f} s, "
+            f"{result['files_per_second']:.1f} files/sec"
+        )
+
+if __name__ == "__main__":
+    main()
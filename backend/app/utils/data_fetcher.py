@@ -1,80 +1,244 @@
 import aiohttp
+import asyncio
+import hashlib
 import json
-import re
-import yaml
-import zipfile
-import io
 import os
-from typing import Dict, Any, List, Optional
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional, Awaitable, TypeVar
 
 from app.core.config import settings
+from app.utils.cricsheet import CricsheetMatch, iter_archive
+from app.utils.jsonp import MatchSummary, TeamStanding, RunScorer, WicketTaker, decode_jsonp, iter_records
 
-async def fetch_jsonp(url: str) -> Dict[Any, Any]:
-    """Fetch JSONP data and convert to JSON"""
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            jsonp = await response.text()
-            
-            # Extract JSON data from JSONP response
-            json_str = re.search(r'\((.*)\)', jsonp).group(1)
-            return json.loads(json_str)
-
-async def fetch_match_schedule() -> Dict[Any, Any]:
-    """Fetch match schedule data"""
-    data = await fetch_jsonp(settings.MATCH_SCHEDULE_URL)
-    return {"Matches": data.get("Matchsummary", [])}
-
-async def fetch_team_standings() -> Dict[Any, Any]:
-    """Fetch team standings data"""
-    data = await fetch_jsonp(settings.TEAM_STANDINGS_URL)
-    return {"Teams": data.get("points", [])}
-
-async def fetch_top_run_scorers() -> Dict[Any, Any]:
-    """Fetch top run scorers data"""
-    data = await fetch_jsonp(settings.TOP_SCORERS_URL)
-    return {"Batsmen": data.get("toprunsscorers", [])}
-
-async def fetch_most_wickets() -> Dict[Any, Any]:
-    """Fetch most wickets data"""
-    data = await fetch_jsonp(settings.MOST_WICKETS_URL)
-    return {"Bowlers": data.get("mostwickets", [])}
-
-async def download_cricsheet_data(output_dir: str = "data/cricsheet") -> List[Dict[str, Any]]:
+T = TypeVar("T")
+
+# Size of the chunks the Cricsheet archive is written to disk in
+DOWNLOAD_CHUNK_BYTES = 1 << 20
+
+# HTTP session shared by all fetches, so connections to the feed hosts are kept alive between refreshes
+_session: Optional[aiohttp.ClientSession] = None
+
+# Feed bodies fetched but not yet processed, saved to the on-disk feed cache by save_feeds
+_pending_feeds: Dict[str, Dict[str, Any]] = {}
+_feed_stats = {
+    "requests": 0, "changed": 0, "not_modified": 0, "unchanged": 0, "skipped": 0,
+    "bytes_downloaded": 0, "bytes_saved": 0
+}
+
+async def open_session() -> aiohttp.ClientSession:
+    """Open the shared HTTP session if it isn't open yet, and return it"""
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.HTTP_MAX_CONNECTIONS,
+            limit_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS
+        )
+        timeout = aiohttp.ClientTimeout(
+            connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+            sock_read=settings.HTTP_READ_TIMEOUT_SECONDS
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    return _session
+
+async def close_session() -> None:
+    """Close the shared HTTP session and its pooled connections"""
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+def run_with_session(coro: Awaitable[T]) -> T:
+    """Run a coroutine from a script, closing the shared HTTP session when it is done"""
+    async def run() -> T:
+        try:
+            return await coro
+        finally:
+            await close_session()
+    return asyncio.run(run())
+
+def _feed_cache_paths(url: str) -> Dict[str, Path]:
+    """Paths of the cached body and metadata of a feed"""
+    directory = Path(settings.FEED_CACHE_DIR)
+    key = hashlib.sha256(url.encode()).hexdigest()[:16]
+    return {"body": directory / f"{key}.js", "meta": directory / f"{key}.json"}
+
+def _read_feed_cache(url: str) -> Optional[Dict[str, Any]]:
+    """Cached metadata and body of a feed, None if missing or damaged"""
+    paths = _feed_cache_paths(url)
+    try:
+        meta = json.loads(paths["meta"].read_text())
+        body = paths["body"].read_bytes()
+    except (OSError, ValueError):
+        return None
+    if hashlib.sha256(body).hexdigest() != meta.get("sha256"):
+        return None
+    return {**meta, "body": body}
+
+def _write_feed_cache(url: str, entry: Dict[str, Any]) -> None:
+    """Write a feed's body and metadata, replacing the files atomically"""
+    paths = _feed_cache_paths(url)
+    paths["body"].parent.mkdir(parents=True, exist_ok=True)
+    meta = {key: value for key, value in entry.items() if key != "body"}
+    for path, content in ((paths["body"], entry["body"]), (paths["meta"], json.dumps(meta).encode())):
+        temporary = path.with_suffix(path.suffix + ".tmp")
+        temporary.write_bytes(content)
+        os.replace(temporary, path)
+
+async def fetch_jsonp(url: str, only_if_changed: bool = False) -> Optional[Dict[Any, Any]]:
     """
-    Download and extract IPL match data from Cricsheet
+    Fetch JSONP data and convert to JSON
+    
+    Requests are conditional on the ETag and Last-Modified of the copy in the
+    on-disk feed cache, and the body's hash is compared with the cached one
+    when the server sends the whole feed anyway. The cache is only updated by
+    save_feeds, once the data has been processed, so a failed refresh is
+    retried in full next time.
     
     Args:
-        output_dir: Directory to save extracted YAML files
+        url: Feed URL
+        only_if_changed: Return None instead of the data when the feed is unchanged
         
     Returns:
-        List of parsed YAML data for all matches
+        Feed data, or None if only_if_changed and the feed is unchanged
+    """
+    cached = _read_feed_cache(url)
+    headers = {}
+    if cached is not None:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    
+    session = await open_session()
+    _feed_stats["requests"] += 1
+    async with session.get(url, headers=headers) as response:
+        if response.status == 304 and cached is not None:
+            _feed_stats["not_modified"] += 1
+            _feed_stats["bytes_saved"] += len(cached["body"])
+            if only_if_changed:
+                _feed_stats["skipped"] += 1
+                return None
+            return decode_jsonp(cached["body"], cached["encoding"])
+        response.raise_for_status()
+        body = await response.read()
+        entry = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "encoding": response.get_encoding(),
+            "sha256": hashlib.sha256(body).hexdigest(),
+            "body": body
+        }
+    _feed_stats["bytes_downloaded"] += len(body)
+    
+    if cached is not None and cached["sha256"] == entry["sha256"]:
+        _feed_stats["unchanged"] += 1
+        _pending_feeds.pop(url, None)
+        # Keep the server's latest validators so the next request can be answered with a 304
+        _write_feed_cache(url, entry)
+        if only_if_changed:
+            _feed_stats["skipped"] += 1
+            return None
+        return decode_jsonp(body, entry["encoding"])
+    
+    _feed_stats["changed"] += 1
+    _pending_feeds[url] = entry
+    return decode_jsonp(body, entry["encoding"])
+
+def save_feeds(*urls: str) -> None:
+    """
+    Save feeds fetched since their last save to the feed cache, once their data is in the database
+    
+    Args:
+        *urls: Feed URLs
+    """
+    for url in urls:
+        entry = _pending_feeds.pop(url, None)
+        if entry is not None:
+            _write_feed_cache(url, entry)
+
+def get_feed_stats() -> Dict[str, Any]:
     """
-    # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
+    Request counts of this worker's feed cache
     
-    async with aiohttp.ClientSession() as session:
-        async with session.get(settings.CRICSHEET_IPL_URL) as response:
-            if response.status != 200:
-                raise Exception(f"Failed to download Cricsheet data: {response.status}")
-            
-            # Read zip file content
-            content = await response.read()
-            
-            # Extract zip file
-            with zipfile.ZipFile(io.BytesIO(content)) as zip_ref:
-                zip_ref.extractall(output_dir)
-            
-            # Parse all YAML files
-            yaml_files = [f for f in os.listdir(output_dir) if f.endswith('.yaml')]
-            match_data = []
-            
-            for yaml_file in yaml_files:
-                file_path = os.path.join(output_dir, yaml_file)
-                with open(file_path, 'r') as f:
-                    try:
-                        data = yaml.safe_load(f)
-                        match_data.append(data)
-                    except yaml.YAMLError as e:
-                        print(f"Error parsing {yaml_file}: {e}")
-            
-            return match_data
\ No newline at end of file
+    Returns:
+        Dictionary with counts of changed, unchanged and skipped feeds, and bytes
+        downloaded and saved by 304 responses
+    """
+    return dict(_feed_stats)
+
+async def fetch_match_schedule(only_if_changed: bool = False) -> Optional[Dict[str, Iterator[MatchSummary]]]:
+    """Fetch match schedule data, None if only_if_changed and the feed is unchanged"""
+    data = await fetch_jsonp(settings.MATCH_SCHEDULE_URL, only_if_changed)
+    return {"Matches": iter_records(data, "Matchsummary")} if data is not None else None
+
+async def fetch_team_standings(only_if_changed: bool = False) -> Optional[Dict[str, Iterator[TeamStanding]]]:
+    """Fetch team standings data, None if only_if_changed and the feed is unchanged"""
+    data = await fetch_jsonp(settings.TEAM_STANDINGS_URL, only_if_changed)
+    return {"Teams": iter_records(data, "points")} if data is not None else None
+
+async def fetch_top_run_scorers(only_if_changed: bool = False) -> Optional[Dict[str, Iterator[RunScorer]]]:
+    """Fetch top run scorers data, None if only_if_changed and the feed is unchanged"""
+    data = await fetch_jsonp(settings.TOP_SCORERS_URL, only_if_changed)
+    return {"Batsmen": iter_records(data, "toprunsscorers")} if data is not None else None
+
+async def fetch_most_wickets(only_if_changed: bool = False) -> Optional[Dict[str, Iterator[WicketTaker]]]:
+    """Fetch most wickets data, None if only_if_changed and the feed is unchanged"""
+    data = await fetch_jsonp(settings.MOST_WICKETS_URL, only_if_changed)
+    return {"Bowlers": iter_records(data, "mostwickets")} if data is not None else None
+
+async def download_cricsheet_archive() -> str:
+    """
+    Stream the Cricsheet IPL archive to a temporary file, one chunk at a time
+    
+    Returns:
+        Path of the downloaded zip file, for the caller to remove
+    """
+    session = await open_session()
+    async with session.get(settings.CRICSHEET_IPL_URL) as response:
+        if response.status != 200:
+            raise Exception(f"Failed to download Cricsheet data: {response.status}")
+        
+        handle, path = tempfile.mkstemp(prefix="cricsheet-", suffix=".zip")
+        try:
+            with os.fdopen(handle, "wb") as archive:
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_BYTES):
+                    archive.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+    return path
+
+def iter_cricsheet_matches(archive_path: str, remove: bool = False) -> Iterator[CricsheetMatch]:
+    """
+    Parse the matches of a Cricsheet YAML or JSON archive, reading members straight from the zip
+    
+    Files are parsed by CRICSHEET_PARSE_WORKERS processes, a few batches at a
+    time, so memory stays bounded however large the archive.
+    
+    Args:
+        archive_path: Path of the zip file
+        remove: Delete the zip file once iteration finishes or is abandoned
+        
+    Returns:
+        Iterator over the record of each match
+    """
+    try:
+        yield from iter_archive(archive_path, settings.CRICSHEET_PARSE_WORKERS or os.cpu_count() or 1)
+    finally:
+        if remove:
+            os.remove(archive_path)
+
+async def download_cricsheet_data() -> Iterator[CricsheetMatch]:
+    """
+    Download IPL match data from Cricsheet
+    
+    The archive is streamed to a temporary file and removed once the matches
+    have been iterated.
+    
+    Returns:
+        Iterator over the record of each match
+    """
+    return iter_cricsheet_matches(await download_cricsheet_archive(), remove=True)
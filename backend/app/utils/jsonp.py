@@ -0,0 +1,193 @@
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, TypedDict, Union
+
+try:
+    import orjson
+except ImportError:  # Optional, falls back to the standard library
+    orjson = None
+
+# Feed values that hold numbers are usually strings, and "-" when there is no value
+Stat = Union[str, int, float]
+
+class MatchSummary(TypedDict, total=False):
+    """Entry of the match schedule feed"""
+    MatchID: Union[str, int]
+    CompetitionID: Union[str, int]
+    MatchDate: str
+    MatchTime: str
+    MatchStatus: str
+    HomeTeamName: str
+    AwayTeamName: str
+    GroundName: str
+    Comments: str
+    FirstBattingSummary: str
+    SecondBattingSummary: str
+
+class TeamStanding(TypedDict, total=False):
+    """Entry of the team standings feed"""
+    TeamCode: str
+    TeamName: str
+    TeamLogo: str
+    Matches: Stat
+    Wins: Stat
+    Loss: Stat
+    Tied: Stat
+    NetRunRate: Stat
+    Points: Stat
+
+class RunScorer(TypedDict, total=False):
+    """Entry of the top run scorers feed"""
+    StrikerID: str
+    StrikerName: str
+    TeamName: str
+    Matches: Stat
+    TotalRuns: Stat
+    HighestScore: Stat
+    FiftyPlusRuns: Stat
+    Centuries: Stat
+    Fours: Stat
+    Sixes: Stat
+    BattingAverage: Stat
+    StrikeRate: Stat
+
+class WicketTaker(TypedDict, total=False):
+    """Entry of the most wickets feed"""
+    BowlerID: str
+    BowlerName: str
+    TeamName: str
+    Matches: Stat
+    Wickets: Stat
+    BBIW: str
+    EconomyRate: Stat
+    BowlingAverage: Stat
+    BowlingSR: Stat
+
+def strip_callback(body: bytes) -> memoryview:
+    """
+    The JSON payload of a JSONP body, without copying it
+
+    The callback wrapper is found from its delimiters: everything up to the first
+    opening parenthesis and from the last closing one. Plain JSON is returned as is.
+
+    Args:
+        body: Raw JSONP response body
+
+    Returns:
+        View of the JSON payload
+
+    Raises:
+        ValueError: If the body is neither JSONP nor JSON
+    """
+    view = memoryview(body)
+    start = 0
+    while start < len(body) and body[start] in b" \t\r\n":
+        start += 1
+    if body[start:start + 1] in (b"{", b"["):
+        return view[start:]
+
+    opening = body.find(b"(")
+    closing = body.rfind(b")")
+    if opening < 0 or closing < opening:
+        raise ValueError("Not a JSONP response")
+    return view[opening + 1:closing]
+
+def loads(payload: Union[bytes, memoryview]) -> Any:
+    """Decode UTF-8 JSON with orjson when installed, the json module otherwise"""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(bytes(payload))
+
+def decode_jsonp(body: bytes, encoding: str = "utf-8") -> Dict[str, Any]:
+    """
+    Decode a JSONP response body straight from its bytes
+
+    Args:
+        body: Raw response body
+        encoding: Charset of the response, transcoded to UTF-8 first if different
+
+    Returns:
+        Decoded JSON data
+    """
+    if encoding.lower().replace("_", "-") not in ("utf-8", "utf8", "ascii", "us-ascii"):
+        body = body.decode(encoding).encode()
+    return loads(strip_callback(body))
+
+def iter_records(data: Dict[str, Any], key: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the entries of one list in a decoded feed as they are consumed
+
+    Args:
+        data: Decoded feed
+        key: Key of the list of entries, e.g. Matchsummary
+
+    Returns:
+        Iterator over the entries, skipping any that are not objects
+    """
+    for record in data.get(key) or []:
+        if isinstance(record, dict):
+            yield record
+
+def _legacy_decode(body: bytes) -> Dict[str, Any]:
+    """The text and regular expression decoding fetch_jsonp used before decode_jsonp"""
+    json_str = re.search(r'\((.*)\)', body.decode("utf-8")).group(1)
+    return json.loads(json_str)
+
+def _time_per_call(function: Any, body: bytes, min_seconds: float = 0.5) -> Optional[float]:
+    """Mean seconds per call of a decoder on one body, None if it fails"""
+    try:
+        function(body)
+    except (AttributeError, ValueError):
+        return None
+    calls, started = 0, time.perf_counter()
+    while True:
+        function(body)
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+def benchmark(paths: List[Path]) -> List[Dict[str, Any]]:
+    """
+    Time decode_jsonp against the previous decoding on stored feed bodies
+
+    Args:
+        paths: Files holding raw JSONP bodies
+
+    Returns:
+        One result per file, with milliseconds per decode of each implementation
+    """
+    results = []
+    for path in paths:
+        body = path.read_bytes()
+        legacy = _time_per_call(_legacy_decode, body)
+        current = _time_per_call(decode_jsonp, body)
+        results.append({
+            "file": str(path),
+            "bytes": len(body),
+            "legacy_ms": legacy * 1000 if legacy is not None else None,
+            "decode_jsonp_ms": current * 1000 if current is not None else None,
+            "speedup": legacy / current if legacy and current else None
+        })
+    return results
+
+def main() -> None:
+    """Benchmark the decoders on the given feed files, or on every feed in the feed cache"""
+    from app.core.config import settings
+
+    paths = [Path(arg) for arg in sys.argv[1:]] or sorted(Path(settings.FEED_CACHE_DIR).glob("*.js"))
+    if not paths:
+        raise SystemExit(f"No stored feeds in {settings.FEED_CACHE_DIR}, pass JSONP files to benchmark")
+
+    print(f"JSON library: {'orjson' if orjson is not None else 'json'}")
+    for result in benchmark(paths):
+        legacy = f"{result['legacy_ms']:.3f} ms" if result["legacy_ms"] is not None else "failed"
+        current = f"{result['decode_jsonp_ms']:.3f} ms" if result["decode_jsonp_ms"] is not None else "failed"
+        speedup = f"{result['speedup']:.1f}x" if result["speedup"] else "-"
+        print(f"{result['file']}: {result['bytes']} bytes, legacy {legacy}, decode_jsonp {current}, speedup {speedup}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from app.services.playoff_odds import PLAYOFF_SPOTS, TOP_TWO, qualification_probabilities, tiebreak_order
+
+def brute_force(points, nrr, home_idx, away_idx, home_probs):
+    """Qualification and top-two probabilities by enumerating every combination of results"""
+    n_teams = len(points)
+    tiebreak = tiebreak_order(nrr)
+    qualify = np.zeros(n_teams)
+    top_two = np.zeros(n_teams)
+    for home_wins in itertools.product((True, False), repeat=len(home_idx)):
+        home_wins = np.array(home_wins)
+        probability = np.prod(np.where(home_wins, home_probs, 1 - home_probs))
+        final_points = points.copy()
+        np.add.at(final_points, home_idx[home_wins], 2)
+        np.add.at(final_points, away_idx[~home_wins], 2)
+        ranking = np.argsort(-(final_points * n_teams + tiebreak))
+        qualify[ranking[:PLAYOFF_SPOTS]] += probability
+        top_two[ranking[:TOP_TWO]] += probability
+    return qualify, top_two
+
+def random_schedule(rng, n_teams, n_matches):
+    """Fixtures between distinct random teams, with random home win probabilities"""
+    home_idx = rng.integers(0, n_teams, n_matches)
+    away_idx = (home_idx + rng.integers(1, n_teams, n_matches)) % n_teams
+    return home_idx, away_idx, rng.uniform(0.2, 0.8, n_matches)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_exact_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n_teams = 6
+    points = 2 * rng.integers(0, 6, n_teams).astype(float)
+    nrr = rng.normal(0, 0.5, n_teams)
+    home_idx, away_idx, home_probs = random_schedule(rng, n_teams, 12)
+
+    qualify, top_two, method = qualification_probabilities(points, nrr, home_idx, away_idx, home_probs)
+
+    expected_qualify, expected_top_two = brute_force(points, nrr, home_idx, away_idx, home_probs)
+    assert method == "exact"
+    np.testing.assert_allclose(qualify, expected_qualify, atol=1e-12)
+    np.testing.assert_allclose(top_two, expected_top_two, atol=1e-12)
+
+def test_exact_matches_brute_force_with_eliminated_teams():
+    rng = np.random.default_rng(7)
+    points = np.array([16, 14, 14, 12, 10, 2, 0, 0], dtype=float)
+    nrr = rng.normal(0, 0.5, len(points))
+    home_idx, away_idx, home_probs = random_schedule(rng, len(points), 14)
+
+    qualify, top_two, method = qualification_probabilities(points, nrr, home_idx, away_idx, home_probs)
+
+    expected_qualify, expected_top_two = brute_force(points, nrr, home_idx, away_idx, home_probs)
+    assert method == "exact"
+    np.testing.assert_allclose(qualify, expected_qualify, atol=1e-12)
+    np.testing.assert_allclose(top_two, expected_top_two, atol=1e-12)
+    assert qualify[5:].max() == 0
+
+def test_eliminated_teams_merge_states():
+    # Teams 5-7 can't reach the top four, so their results among themselves must not split states
+    points = np.array([16, 14, 14, 12, 10, 2, 0, 0], dtype=float)
+    nrr = np.linspace(0.4, -0.4, len(points))
+    fixtures = [(0, 1), (5, 6), (2, 3), (6, 7), (4, 0), (7, 5), (1, 2), (5, 6), (3, 4), (6, 7), (0, 2), (7, 5), (5, 7), (6, 5)]
+    home_idx = np.array([home for home, _ in fixtures])
+    away_idx = np.array([away for _, away in fixtures])
+    home_probs = np.full(len(fixtures), 0.5)
+
+    qualify, top_two, method = qualification_probabilities(points, nrr, home_idx, away_idx, home_probs, max_states=100)
+
+    expected_qualify, expected_top_two = brute_force(points, nrr, home_idx, away_idx, home_probs)
+    assert method == "exact"
+    np.testing.assert_allclose(qualify, expected_qualify, atol=1e-12)
+    np.testing.assert_allclose(top_two, expected_top_two, atol=1e-12)
@@ -6,9 +6,10 @@ import './SeasonSimulator.scss';
 
 interface SeasonSimulatorProps {
   simulation: SeasonSimulation;
+  running?: boolean;
 }
 
-const SeasonSimulator: React.FC<SeasonSimulatorProps> = ({ simulation }) => {
+const SeasonSimulator: React.FC<SeasonSimulatorProps> = ({ simulation, running = false }) => {
   const chartRef = useRef<SVGSVGElement>(null);
   
   useEffect(() => {
@@ -76,13 +77,26 @@ const SeasonSimulator: React.FC<SeasonSimulatorProps> = ({ simulation }) => {
       .attr('height', y.bandwidth())
       .attr('fill', '#4CAF50');
     
+    // Add 95% confidence interval whiskers when available
+    g.selectAll('.championship-interval')
+      .data(sortedTeams.filter(d => d.championship_interval))
+      .enter()
+      .append('line')
+      .attr('class', 'championship-interval')
+      .attr('x1', d => x(d.championship_interval![0]))
+      .attr('x2', d => x(d.championship_interval![1]))
+      .attr('y1', d => (y(d.team.name) || 0) + y.bandwidth() / 2)
+      .attr('y2', d => (y(d.team.name) || 0) + y.bandwidth() / 2)
+      .attr('stroke', '#2d3748')
+      .attr('stroke-width', 1.5);
+    
     // Add labels for championship percentage
     g.selectAll('.championship-label')
       .data(sortedTeams)
       .enter()
       .append('text')
       .attr('class', 'championship-label')
-      .attr('x', d => x(d.championship_percentage) + 5)
+      .attr('x', d => x(d.championship_interval ? d.championship_interval[1] : d.championship_percentage) + 5)
       .attr('y', d => (y(d.team.name) || 0) + y.bandwidth() / 2)
       .attr('dy', '0.35em')
       .attr('font-size', '12px')
@@ -98,6 +112,10 @@ const SeasonSimulator: React.FC<SeasonSimulatorProps> = ({ simulation }) => {
       .text(`Championship Probability (${simulation.simulations.toLocaleString()} simulations)`);
   };
   
+  const formatInterval = (interval?: [number, number]) => (
+    interval ? ` \u00b1${((interval[1] - interval[0]) / 2).toFixed(1)}` : ''
+  );
+  
   return (
     <Card title="Season Simulator" className="season-simulator">
       <div className="season-simulator__info">
@@ -105,6 +123,16 @@ const SeasonSimulator: React.FC<SeasonSimulatorProps> = ({ simulation }) => {
           Based on {simulation.simulations.toLocaleString()} simulated seasons, 
           taking into account team strength, remaining schedule, and historical performance.
         </p>
+        {running && (
+          <p className="season-simulator__status">
+            Refining estimates&hellip; {simulation.simulations.toLocaleString()} seasons simulated so far.
+          </p>
+        )}
+        {!running && simulation.done && !simulation.converged && (
+          <p className="season-simulator__status">
+            Stopped at the simulation limit before reaching the requested precision.
+          </p>
+        )}
       </div>
       
       <div className="season-simulator__chart">
@@ -134,7 +162,7 @@ const SeasonSimulator: React.FC<SeasonSimulatorProps> = ({ simulation }) => {
                       ></div>
                     </div>
                     <span className="season-simulator__percentage-value">
-                      {team.playoff_percentage.toFixed(1)}%
+                      {team.playoff_percentage.toFixed(1)}%{formatInterval(team.playoff_interval)}
                     </span>
                   </td>
                   <td className="season-simulator__percentage">
@@ -145,7 +173,7 @@ const SeasonSimulator: React.FC<SeasonSimulatorProps> = ({ simulation }) => {
                       ></div>
                     </div>
                     <span className="season-simulator__percentage-value">
-                      {team.championship_percentage.toFixed(1)}%
+                      {team.championship_percentage.toFixed(1)}%{formatInterval(team.championship_interval)}
                     </span>
                   </td>
                 </tr>
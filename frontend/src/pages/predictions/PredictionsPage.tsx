@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { matchesApi, predictionsApi } from '../../services/api';
 import { Match, PlayoffPrediction, SeasonSimulation, MatchPrediction } from '../../types';
 import LoadingSpinner from '../../components/common/LoadingSpinner';
@@ -17,7 +17,8 @@ const PredictionsPage: React.FC = () => {
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
   const [simulationLoading, setSimulationLoading] = useState<boolean>(false);
-  const [simulationCount, setSimulationCount] = useState<number>(1000);
+  const [simulationTolerance, setSimulationTolerance] = useState<number>(0.02);
+  const simulationSource = useRef<EventSource | null>(null);
   
   useEffect(() => {
     const fetchPredictions = async () => {
@@ -29,19 +30,19 @@ const PredictionsPage: React.FC = () => {
         const playoffResponse = await predictionsApi.getPlayoffChances();
         setPlayoffPrediction(playoffResponse.data);
         
-        // Fetch season simulation
-        const simulationResponse = await predictionsApi.simulateSeason(simulationCount);
-        setSeasonSimulation(simulationResponse.data);
-        
         // Fetch upcoming matches
         const matchesResponse = await matchesApi.getUpcoming(7); // Next 7 days
         setUpcomingMatches(matchesResponse.data);
         
-        // Fetch match predictions for upcoming matches
+        // Fetch match predictions for upcoming matches in one batch
         const predictions: { [key: number]: MatchPrediction } = {};
-        for (const match of matchesResponse.data) {
-          const predictionResponse = await predictionsApi.getMatchPrediction(match.id);
-          predictions[match.id] = predictionResponse.data;
+        if (matchesResponse.data.length > 0) {
+          const predictionResponse = await predictionsApi.getMatchPredictions(
+            matchesResponse.data.map((match: Match) => match.id)
+          );
+          for (const prediction of predictionResponse.data.predictions as MatchPrediction[]) {
+            predictions[prediction.match.id] = prediction;
+          }
         }
         setMatchPredictions(predictions);
         
@@ -54,24 +55,31 @@ const PredictionsPage: React.FC = () => {
     };
     
     fetchPredictions();
+    runSimulation();
+    
+    return () => simulationSource.current?.close();
   }, []);
   
-  const handleSimulationCountChange = (e: React.ChangeEvent<HTMLSelectElement>) => {
-    setSimulationCount(parseInt(e.target.value));
+  const handleSimulationToleranceChange = (e: React.ChangeEvent<HTMLSelectElement>) => {
+    setSimulationTolerance(parseFloat(e.target.value));
   };
   
-  const runSimulation = async () => {
-    try {
-      setSimulationLoading(true);
-      
-      const simulationResponse = await predictionsApi.simulateSeason(simulationCount);
-      setSeasonSimulation(simulationResponse.data);
-      
-      setSimulationLoading(false);
-    } catch (err) {
-      console.error('Error running simulation:', err);
-      setSimulationLoading(false);
-    }
+  // Stream the season simulation, rendering each batch of estimates as it arrives
+  const runSimulation = () => {
+    simulationSource.current?.close();
+    setSimulationLoading(true);
+    
+    simulationSource.current = predictionsApi.streamSeasonSimulation(
+      simulation => {
+        setSeasonSimulation(simulation);
+        if (simulation.done) setSimulationLoading(false);
+      },
+      { tolerance: simulationTolerance },
+      () => {
+        console.error('Error running simulation');
+        setSimulationLoading(false);
+      }
+    );
   };
   
   if (loading) {
@@ -97,22 +105,23 @@ const PredictionsPage: React.FC = () => {
           <div className="predictions-page__simulator-info">
             <p>
               Run simulations of the remaining IPL 2025 season to predict playoff chances and the eventual champion.
-              More simulations provide more accurate results but take longer to process.
+              Simulations run in batches until every probability is known to within the chosen precision,
+              and results update as each batch completes.
             </p>
           </div>
           
           <div className="predictions-page__simulator-actions">
             <div className="predictions-page__simulator-select">
-              <label htmlFor="simulation-count">Number of Simulations:</label>
+              <label htmlFor="simulation-tolerance">Precision:</label>
               <select 
-                id="simulation-count"
-                value={simulationCount} 
-                onChange={handleSimulationCountChange}
+                id="simulation-tolerance"
+                value={simulationTolerance} 
+                onChange={handleSimulationToleranceChange}
                 disabled={simulationLoading}
               >
-                <option value="100">100 (Fast)</option>
-                <option value="1000">1,000 (Standard)</option>
-                <option value="10000">10,000 (Accurate)</option>
+                <option value="0.05">&plusmn;2.5% (Fast)</option>
+                <option value="0.02">&plusmn;1% (Standard)</option>
+                <option value="0.01">&plusmn;0.5% (Accurate)</option>
               </select>
             </div>
             
@@ -126,7 +135,7 @@ const PredictionsPage: React.FC = () => {
           </div>
         </Card>
         
-        {seasonSimulation && <SeasonSimulator simulation={seasonSimulation} />}
+        {seasonSimulation && <SeasonSimulator simulation={seasonSimulation} running={simulationLoading} />}
       </div>
       
       <div className="predictions-page__section">
@@ -1,4 +1,5 @@
 import axios from 'axios';
+import { SeasonSimulation } from '../types';
 
 const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
 
@@ -45,15 +46,45 @@ export const matchesApi = {
   getById: (id: number) => api.get(`/matches/${id}`),
   getCommentary: (id: number) => api.get(`/matches/${id}/commentary`),
   getWinProbability: (id: number) => api.get(`/matches/${id}/win-probability`),
+  getWinProbabilityTimeline: (id: number) => api.get(`/matches/${id}/win-probability/timeline`),
 };
 
 // Predictions API
 export const predictionsApi = {
   getMatchPrediction: (matchId: number) => api.get(`/predictions/match/${matchId}`),
+  getMatchPredictions: (matchIds?: number[]) => api.get('/predictions/matches', {
+    params: { match_ids: matchIds },
+    paramsSerializer: { indexes: null },
+  }),
   getPlayoffChances: () => api.get('/predictions/playoffs'),
   simulateSeason: (simulations?: number) => api.get('/predictions/simulate-season', { params: { simulations } }),
-  getPlayerPerformance: (playerId: number, matchId?: number) => 
-    api.get(`/predictions/player-performance/${playerId}`, { params: { match_id: matchId } }),
+  // Streams running estimates until every confidence interval is narrower than tolerance.
+  // Returns the EventSource so callers can close it early.
+  streamSeasonSimulation: (
+    onUpdate: (simulation: SeasonSimulation) => void,
+    params?: { tolerance?: number; max_simulations?: number; seed?: number },
+    onError?: () => void
+  ) => {
+    const query = new URLSearchParams();
+    Object.entries(params || {}).forEach(([key, value]) => {
+      if (value !== undefined) query.append(key, String(value));
+    });
+    const source = new EventSource(`${API_URL}/predictions/simulate-season/stream?${query.toString()}`);
+    source.onmessage = (event) => {
+      const simulation: SeasonSimulation = JSON.parse(event.data);
+      onUpdate(simulation);
+      if (simulation.done) source.close();
+    };
+    source.onerror = () => {
+      source.close();
+      if (onError) onError();
+    };
+    return source;
+  },
+  getPlayerPerformance: (playerId: number, matchId?: number, noise?: boolean, seed?: number) => 
+    api.get(`/predictions/player-performance/${playerId}`, { params: { match_id: matchId, noise, seed } }),
+  getSquadPredictions: (matchId: number, noise?: boolean, seed?: number) =>
+    api.get(`/predictions/match/${matchId}/squads`, { params: { noise, seed } }),
 };
 
 export default api;
\ No newline at end of file
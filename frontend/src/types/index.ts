@@ -343,7 +343,49 @@ export interface Team {
     message: string;
   }
   
+  export interface WinProbabilityPoint {
+    innings: number;
+    over: number;
+    runs: number;
+    wickets: number;
+    home_team_probability: number;
+    away_team_probability: number;
+  }
+  
+  export interface WinProbabilityTimeline {
+    match_id: number;
+    home_team_id: number;
+    away_team_id: number;
+    match_status: string;
+    points: WinProbabilityPoint[];
+    updated_at: string | null;
+  }
+  
   // Prediction types
+  export interface ProjectedTotal {
+    mean_total: number;
+    percentiles: Record<string, number>;
+  }
+  
+  export interface MatchProjection {
+    simulations: number;
+    home_win_probability: number;
+    home: ProjectedTotal;
+    away: ProjectedTotal;
+  }
+  
+  export interface SimulatedDistribution {
+    mean: number;
+    percentiles: Record<string, number>;
+  }
+  
+  export interface PlayerProjection {
+    simulations: number;
+    team_total: SimulatedDistribution;
+    runs: SimulatedDistribution;
+    wickets: SimulatedDistribution;
+  }
+  
   export interface MatchPrediction {
     match: {
       id: number;
@@ -365,6 +407,7 @@ export interface Team {
         win_probability: number;
       };
     };
+    projection?: MatchProjection | null;
     factors: {
       head_to_head: {
         total_matches: number;
@@ -447,6 +490,11 @@ export interface Team {
   
   export interface SeasonSimulation {
     simulations: number;
+    seed?: number;
+    // Set on streamed adaptive simulations
+    tolerance?: number;
+    converged?: boolean;
+    done?: boolean;
     teams: {
       team: {
         id: number;
@@ -455,6 +503,8 @@ export interface Team {
       };
       playoff_percentage: number;
       championship_percentage: number;
+      playoff_interval?: [number, number];
+      championship_interval?: [number, number];
     }[];
   }
   
@@ -483,8 +533,22 @@ export interface Team {
         dot_ball_percentage: number;
       };
     };
+    projection?: PlayerProjection | null;
     confidence: {
       batting: number;
       bowling: number;
     };
+    seed?: number | null;
+  }
+  
+  export interface SquadPredictions {
+    match: {
+      id: number;
+      venue: string;
+      date: string | null;
+    };
+    home: PlayerPrediction[];
+    away: PlayerPrediction[];
+    noise: boolean;
+    seed: number | null;
   }
\ No newline at end of file